@@ -1,5 +1,14 @@
-from .api import app
 from .config import settings
 
 
+def __getattr__(name):
+    # Importing the app builds the processor; `from app import settings`
+    # (main.py, the uvicorn supervisor) should not pay for that
+    if name == "app":
+        from .api import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = ["app", "settings"]
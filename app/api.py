@@ -1,15 +1,44 @@
+import asyncio
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Union
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 
+from app import metrics, responses, rpc
 from app.config import settings
 from app.models import (
     JSONRPCRequest,
 )
 from app.processor import PostProcessor
+from app.scheduler import SchedulerFull
+from app.telemetry import (
+    configure_logging,
+    request_id_var,
+    shutdown_logging,
+    span,
+    stage_timings,
+)
 
+configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="POST CRAFT AGENT")
 processor = PostProcessor()
+metrics.watch_processor(processor)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await processor.start()
+    yield
+    await processor.aclose()
+    shutdown_logging()
+
+
+app = FastAPI(title="POST CRAFT AGENT", lifespan=lifespan)
 
 
 @app.get("/.well-known/agent.json")
@@ -22,7 +51,7 @@ async def agent_info():
         "version": "1.0.0",
         "provider": {"organization": "PostCraft", "url": settings.AGENT_URL},
         "capabilities": {
-            "streaming": False,
+            "streaming": True,
             "pushNotifications": False,
             "stateTransitionHistory": True,
         },
@@ -52,54 +81,220 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
+        "state": processor.state,
+        # Everything below is this worker process's own view
+        "worker": {"pid": os.getpid(), "workers": settings.worker_count()},
         "agent": "POST CRAFT AGENT",
         "gemini_available": bool(settings.GEMINI_API_KEY),
         "groq_available": bool(settings.GROQ_API_KEY),
+        "cache": {
+            "blog": processor.extractor.cache_stats.as_dict(),
+            "generation": processor.generator.cache_stats.as_dict(),
+        },
+        "repair": processor.generator.repair_stats.as_dict(),
+        "coalescing": processor.inflight.stats(),
+        "http_pool": processor.http.stats(),
+        "scheduler": processor.scheduler.stats(),
+        "providers": processor.generator.router.stats(),
+        "tasks": {"stored": len(processor.tasks), "pending": processor.workers.pending},
+        "stages": stage_timings.stats(),
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until startup and warmup finish, and once shutting down"""
+    status_code = 200 if processor.state == "ready" else 503
+    return responses.json_response({"status": processor.state}, status_code=status_code)
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+ADMITTED_METHODS = ("message/send", "message/stream", "batch/send", "batch/stream")
+STREAMING_METHODS = ("message/stream", "batch/stream")
+BATCH_METHODS = ("batch/send", "batch/stream")
+KNOWN_METHODS = ADMITTED_METHODS + ("tasks/get",)
+
+
+def rpc_error(request_id, code: int, message: str) -> dict:
+    """JSON-RPC error response body"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {"code": code, "message": message},
     }
 
 
+def json_response(request: Request, content: Union[list, dict], **kwargs) -> Response:
+    """Serialize (and compress) a JSON-RPC result, timed as its own stage"""
+    with span("serialize"):
+        return responses.json_response(
+            content, request.headers.get("accept-encoding", ""), **kwargs
+        )
+
+
+async def dispatch(rpc_request: JSONRPCRequest) -> dict:
+    """Run a non-streaming JSON-RPC method"""
+    if rpc_request.method == "message/send":
+        return await processor.handle_message_send(rpc_request)
+
+    elif rpc_request.method == "batch/send":
+        return await processor.handle_batch_send(rpc_request)
+
+    elif rpc_request.method == "tasks/get":
+        return await processor.handle_tasks_get(rpc_request)
+
+    return rpc_error(
+        rpc_request.id, -32601, f"Method not found: {rpc_request.method}"
+    )
+
+
+async def handle_batch_array(body: list) -> Union[list, dict]:
+    """
+    Run a JSON-RPC batch array, converting its entries with bounded parallelism
+
+    Streaming and batch methods are not allowed in a batch array, so an
+    array cannot multiply BATCH_MAX_URLS or the batch fan-out. Each entry
+    is answered independently, so one failure does not fail the others;
+    notifications (entries without an id) run but get no response. An
+    empty or oversized array gets a single error response.
+
+    Returns:
+        The responses, an empty list if every entry was a notification,
+        or a single error response
+    """
+    if not body:
+        return rpc_error(None, -32600, "Invalid Request: empty batch")
+    if len(body) > settings.BATCH_MAX_URLS:
+        return rpc_error(
+            None,
+            -32600,
+            f"Invalid Request: batch of {len(body)} exceeds {settings.BATCH_MAX_URLS}",
+        )
+
+    slots = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(item) -> dict:
+        try:
+            rpc_request = JSONRPCRequest.model_validate(item)
+        except Exception:
+            return rpc_error(None, -32600, "Invalid Request")
+
+        if rpc_request.method in STREAMING_METHODS + BATCH_METHODS:
+            return rpc_error(
+                rpc_request.id,
+                -32600,
+                "Streaming and batch methods cannot be used in a batch array",
+            )
+        if rpc_request.method in ADMITTED_METHODS:
+            try:
+                processor.scheduler.check_admission()
+            except SchedulerFull as e:
+                return rpc_error(rpc_request.id, -32000, str(e))
+
+        async with slots:
+            try:
+                return await dispatch(rpc_request)
+            except Exception as e:
+                return rpc_error(rpc_request.id, -32603, f"Internal error: {str(e)}")
+
+    results = await asyncio.gather(*(run(item) for item in body))
+    return [
+        result
+        for item, result in zip(body, results)
+        if not (isinstance(item, dict) and "id" not in item)
+    ]
+
+
 @app.post("/")
 async def handle_request(request: Request):
     """Main A2A endpoint"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    request_id_var.set(request_id)
+
+    timer = metrics.RequestTimer()
+    try:
+        with span("request"):
+            response = await _handle_request(request, timer)
+    except asyncio.CancelledError:
+        timer.finish("cancelled")
+        raise
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+async def _handle_request(request: Request, timer: metrics.RequestTimer) -> Response:
     try:
-        body = await request.json()
-        print(body)
-        rpc_request = JSONRPCRequest(**body)
-
-        if rpc_request.method == "message/send":
-            return await processor.handle_message_send(rpc_request)
-
-        elif rpc_request.method == "tasks/get":
-            return JSONResponse(
-                content={
-                    "jsonrpc": "2.0",
-                    "id": rpc_request.id,
-                    "error": {
-                        "code": -32601,
-                        "message": "Task polling not implemented",
-                    },
-                }
+        raw = await request.body()
+        try:
+            with span("decode"):
+                body = rpc.decode(raw)
+        except rpc.RPCDecodeError as e:
+            timer.finish("error")
+            return json_response(
+                request, rpc_error(None, e.code, str(e)), status_code=400
             )
 
+        if isinstance(body, list):
+            logger.debug("Batch array received", extra={"size": len(body)})
+            timer.method = "batch_array"
+            result = await handle_batch_array(body)
+            timer.finish("ok")
+            if result == []:
+                # Only notifications: nothing to answer
+                return Response(status_code=204)
+            return json_response(request, result)
+
+        rpc_request = body
+        if rpc_request.method in KNOWN_METHODS:
+            timer.method = rpc_request.method
         else:
-            return JSONResponse(
-                content={
-                    "jsonrpc": "2.0",
-                    "id": rpc_request.id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {rpc_request.method}",
-                    },
-                }
+            timer.method = "unknown"
+        logger.debug(
+            "Request received",
+            extra={"method": rpc_request.method, "rpc_id": rpc_request.id},
+        )
+
+        if rpc_request.method in ADMITTED_METHODS:
+            try:
+                processor.scheduler.check_admission()
+            except SchedulerFull as e:
+                timer.finish("rejected")
+                return json_response(
+                    request,
+                    rpc_error(rpc_request.id, -32000, str(e)),
+                    status_code=429,
+                    headers={"Retry-After": "1"},
+                )
+
+        if rpc_request.method == "message/stream":
+            return StreamingResponse(
+                timer.wrap_stream(processor.handle_message_stream(rpc_request)),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
 
+        elif rpc_request.method == "batch/stream":
+            return StreamingResponse(
+                timer.wrap_stream(processor.handle_batch_stream(rpc_request)),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        result = await dispatch(rpc_request)
+        timer.finish("error" if "error" in result else "ok")
+        return json_response(request, result)
+
     except Exception as e:
-        print(f"❌ Request handling error: {e}")
-        return JSONResponse(
+        logger.exception("Request handling error")
+        metrics.errors.inc("request", type(e).__name__)
+        timer.finish("error")
+        return json_response(
+            request,
+            rpc_error(None, -32603, f"Internal error: {str(e)}"),
             status_code=500,
-            content={
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -32603, "message": f"Internal error: {str(e)}"},
-            },
         )
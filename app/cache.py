@@ -0,0 +1,297 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.sqlite_writer import SQLiteWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cached value with its expiry time.
+
+    Expired entries are still returned by backends so callers can
+    revalidate them instead of starting from scratch.
+    """
+
+    value: Dict[str, Any]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class CacheBackend:
+    """Interface for key/value stores with TTL and LRU eviction"""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend"""
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, expires_at=time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk LRU cache that survives restarts.
+
+    Each namespace gets its own table so several caches can share one
+    database file. Only reads run on the caller's thread: sets, deletes and
+    the access times that drive LRU eviction are written in batches on a
+    writer thread (see SQLiteWriter), and pending sets and deletes are
+    served from memory until then. Access times are flushed with the next
+    write or once `touch_batch` entries or `touch_interval` seconds have
+    built up. The cache is best-effort: a failed read is a miss and a
+    failed write is logged and dropped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        max_entries: int = 10_000,
+        touch_batch: int = 256,
+        touch_interval: float = 5.0,
+    ):
+        self.path = path
+        self.table = f"cache_{namespace}"
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+        # Key -> (JSON value, expiry) waiting to be written, or None for a delete
+        self._pending: Dict[str, Optional[Tuple[str, float]]] = {}
+        self._touched: Dict[str, float] = {}
+        self._flush_queued = False
+        self._flushed_at = time.monotonic()
+        self._db = SQLiteWriter(path, name=f"cache-{namespace}")
+        with self._db.lock:
+            self._db.conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._db.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)"
+            )
+            self._db.conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with self._db.lock:
+                if key in self._pending:
+                    row = self._pending[key]
+                else:
+                    row = self._db.conn.execute(
+                        f"SELECT value, expires_at FROM {self.table} WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                if row is None:
+                    return None
+                self._touched[key] = time.time()
+                if (
+                    len(self._touched) >= self.touch_batch
+                    or time.monotonic() - self._flushed_at >= self.touch_interval
+                ):
+                    self._queue_flush()
+        except sqlite3.Error as e:
+            logger.warning(
+                "Cache read failed", extra={"table": self.table, "error": str(e)}
+            )
+            return None
+        return CacheEntry(value=json.loads(row[0]), expires_at=row[1])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        data = json.dumps(value)
+        with self._db.lock:
+            self._pending[key] = (data, time.time() + ttl)
+            self._touched.pop(key, None)
+            self._queue_flush()
+
+    def delete(self, key: str) -> None:
+        with self._db.lock:
+            self._pending[key] = None
+            self._touched.pop(key, None)
+            self._queue_flush()
+
+    def _queue_flush(self) -> None:
+        """Schedule one write of everything pending; the caller holds the lock"""
+        if not self._flush_queued:
+            self._flush_queued = True
+            self._db.submit(self._flush)
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        """Write pending sets, deletes and access times (writer thread)"""
+        with self._db.lock:
+            batch = dict(self._pending)
+            touched = self._touched
+            self._touched = {}
+            self._flush_queued = False
+            self._flushed_at = time.monotonic()
+
+        now = time.time()
+        try:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(k, row[0], row[1], now) for k, row in batch.items() if row is not None],
+            )
+            conn.executemany(
+                f"DELETE FROM {self.table} WHERE key = ?",
+                [(k,) for k, row in batch.items() if row is None],
+            )
+            conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, k) for k, accessed_at in touched.items() if k not in batch],
+            )
+            conn.execute(
+                f"""DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM {self.table}
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+        finally:
+            # Written or failed, these no longer need serving from memory,
+            # unless they changed again meanwhile
+            with self._db.lock:
+                for k, row in batch.items():
+                    if k in self._pending and self._pending[k] is row:
+                        del self._pending[k]
+
+    def clear(self) -> None:
+        with self._db.lock:
+            self._pending.clear()
+            self._touched.clear()
+        # Queued behind any flush already snapshotted, and waited for
+        self._db.submit(
+            lambda conn: conn.execute(f"DELETE FROM {self.table}")
+        ).result()
+
+    def __len__(self) -> int:
+        with self._db.lock:
+            return self._db.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self) -> None:
+        with self._db.lock:
+            self._queue_flush()
+        self._db.close()
+
+
+class CacheStats:
+    """Hit/miss counters for a cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+
+def create_cache_backend(
+    backend: str, namespace: str, max_entries: int, path: str = ""
+) -> Optional[CacheBackend]:
+    """
+    Build a cache backend from configuration.
+
+    Args:
+        backend: "memory", "sqlite" or "none"
+        namespace: Name separating this cache from others in shared stores
+        max_entries: LRU capacity
+        path: SQLite database path
+
+    Returns:
+        Cache backend, or None when caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries)
+    if backend == "sqlite":
+        return SQLiteCache(path, namespace=namespace, max_entries=max_entries)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so equivalent links share a cache key"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (
+        (scheme == "http" and parts.port == 80)
+        or (scheme == "https" and parts.port == 443)
+    ):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith("utm_") or k.lower() in TRACKING_PARAMS)
+    )
+    # "/post/" and "/post" are the same article on every blog platform
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
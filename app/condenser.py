@@ -0,0 +1,141 @@
+import re
+from collections import Counter
+from typing import Collection, List, Set
+
+from app.models import BlogContent
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each few for from further had has have having he her here hers him
+    his how i if in into is it its itself just me more most my no nor not now
+    of off on once only or other our ours out over own same she should so some
+    such than that the their theirs them then there these they this those
+    through to too under until up very was we were what when where which while
+    who whom why will with would you your yours
+    """.split()
+)
+
+
+class ContentCondenser:
+    """Extractive condensation of long articles to a prompt token budget.
+
+    Works on the cleaned text produced by BlogExtractor, which puts each
+    block-level element (paragraph, list item, heading) on its own line:
+    every line is a candidate chunk. The lead paragraph and the page's h1-h6
+    headings (up to a quarter of the budget) are always kept; the remaining
+    budget goes to the most salient chunks, scored by how many frequent,
+    non-stopword terms (and title terms) they contain. Kept chunks are
+    emitted in their original order.
+    """
+
+    # Rough characters per token, matching the scheduler's estimate
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, max_tokens: int = 4000):
+        self.max_tokens = max_tokens
+
+    def condense(self, blog_content: BlogContent) -> BlogContent:
+        """
+        Shrink the article content to fit the token budget.
+
+        Args:
+            blog_content: Extracted blog content
+
+        Returns:
+            The same content if it already fits, otherwise a copy with
+            condensed content
+        """
+        if not self.needs_condensing(blog_content):
+            return blog_content
+
+        condensed = self.condense_text(
+            blog_content.content,
+            blog_content.title,
+            self.max_tokens * self.CHARS_PER_TOKEN,
+            blog_content.headings,
+        )
+        return blog_content.model_copy(update={"content": condensed})
+
+    def needs_condensing(self, blog_content: BlogContent) -> bool:
+        """Whether the content exceeds the budget"""
+        return bool(self.max_tokens) and (
+            len(blog_content.content) > self.max_tokens * self.CHARS_PER_TOKEN
+        )
+
+    def condense_text(
+        self, text: str, title: str, budget: int, headings: Collection[str] = ()
+    ) -> str:
+        """Select chunks of `text` totalling at most `budget` characters
+
+        `headings` are the lines of `text` that are headings in the page.
+        """
+        chunks = [line.strip() for line in text.split("\n")]
+        chunks = [chunk for chunk in chunks if chunk]
+        if not chunks:
+            return ""
+        headings = set(headings)
+
+        keep: Set[int] = set()
+        used = 0
+
+        def take(index: int) -> bool:
+            nonlocal used
+            cost = len(chunks[index]) + 1
+            if used + cost > budget:
+                return False
+            keep.add(index)
+            used += cost
+            return True
+
+        lead = next(
+            (i for i, chunk in enumerate(chunks) if chunk not in headings), None
+        )
+        if lead is not None and not take(lead):
+            # Even the lead paragraph is over budget; truncate it
+            return chunks[lead][: budget - 3].rstrip() + "..."
+
+        # Headings keep the article's structure but may not crowd out the body
+        heading_budget = budget // 4
+        for index, chunk in enumerate(chunks):
+            if used >= heading_budget:
+                break
+            if chunk in headings:
+                take(index)
+
+        tokenized = [WORD_PATTERN.findall(chunk.lower()) for chunk in chunks]
+        frequencies = Counter(
+            word for words in tokenized for word in words if word not in STOPWORDS
+        )
+        title_words = set(WORD_PATTERN.findall(title.lower())) - STOPWORDS
+        top = max(frequencies.values(), default=1)
+
+        ranked = sorted(
+            (i for i in range(len(chunks)) if i not in keep),
+            key=lambda i: self._score(tokenized[i], frequencies, top, title_words),
+            reverse=True,
+        )
+        for index in ranked:
+            take(index)
+            if budget - used < 40:
+                break
+
+        return "\n".join(chunks[i] for i in sorted(keep))
+
+    def _score(
+        self,
+        words: List[str],
+        frequencies: Counter,
+        top: int,
+        title_words: Set[str],
+    ) -> float:
+        """Average term salience, boosted for title terms"""
+        terms = [word for word in words if word not in STOPWORDS]
+        if len(terms) < 3:
+            return 0.0
+        score = sum(frequencies[word] / top for word in terms)
+        score += sum(1.0 for word in terms if word in title_words)
+        return score / len(terms) ** 0.5
@@ -1,5 +1,6 @@
+import os
 from typing import List
-from decouple import config
+from decouple import Csv, config
 
 
 class Settings:
@@ -8,18 +9,149 @@ class Settings:
     # Server Configuration
     AGENT_URL: str = str(config("AGENT_URL", default="http://localhost:8000"))
     PORT: int = int(config("PORT", default=8000))
+    # "development" runs one auto-reloading process; "production" runs
+    # WORKERS processes (0 = one per CPU core) without reload
+    SERVER_MODE: str = str(config("SERVER_MODE", default="development"))
+    WORKERS: int = int(config("WORKERS", default=0))
+    # Seconds given to in-flight requests, then to background conversions,
+    # to finish after SIGTERM
+    GRACEFUL_SHUTDOWN_TIMEOUT: float = float(config("GRACEFUL_SHUTDOWN_TIMEOUT", default=20))
+    # Prime the parsers and open provider connections in the background at
+    # startup; /ready answers 503 until it finishes
+    WARMUP: bool = config("WARMUP", default=False, cast=bool)
+
+    # Logging: level for the app's loggers (DEBUG adds per-stage spans) and
+    # "json" (one object per line) or "text"
+    LOG_LEVEL: str = str(config("LOG_LEVEL", default="INFO"))
+    LOG_FORMAT: str = str(config("LOG_FORMAT", default="json"))
+    # Metrics: fetch metrics are labelled with these domains (and their
+    # subdomains); every other host is counted as "other" so user-supplied
+    # URLs cannot grow the number of series without bound
+    METRICS_FETCH_HOSTS: List[str] = config(
+        "METRICS_FETCH_HOSTS",
+        default="medium.com,substack.com,dev.to,hashnode.dev,wordpress.com,blogspot.com,ghost.io",
+        cast=Csv(),
+    )
+
+    # Responses: "full" echoes the conversation history in message/send and
+    # batch/send results, "compact" leaves it out (the posts are in the
+    # artifacts) unless the client asks with configuration.historyLength.
+    # JSON bodies of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are sent
+    # gzip or br compressed when the client accepts it (0 = never)
+    RESPONSE_MODE: str = str(config("RESPONSE_MODE", default="full"))
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(config("RESPONSE_COMPRESSION_MIN_SIZE", default=1024))
 
     # AI API Keys (at least one required)
     GEMINI_API_KEY: str = str(config("GEMINI_API_KEY", default=""))
     GROQ_API_KEY: str = str(config("GROQ_API_KEY", default=""))
 
+    # Providers, tried in this order until latency data says otherwise.
+    # Providers without an API key are skipped; "fake" is a local stand-in.
+    LLM_PROVIDERS: List[str] = config("LLM_PROVIDERS", default="gemini,groq", cast=Csv())
+    GEMINI_MODEL: str = str(config("GEMINI_MODEL", default="gemini-2.0-flash-exp"))
+    # Empty uses Google's endpoint; benchmarks point this at a local stand-in
+    GEMINI_BASE_URL: str = str(config("GEMINI_BASE_URL", default=""))
+    GROQ_MODEL: str = str(config("GROQ_MODEL", default="llama-3.3-70b-versatile"))
+    GROQ_BASE_URL: str = str(config("GROQ_BASE_URL", default="https://api.groq.com/openai/v1"))
+    FAKE_LLM_LATENCY: float = float(config("FAKE_LLM_LATENCY", default=0))
+    # Routing: rolling window per provider, error rate that benches a
+    # provider for LLM_PROVIDER_COOLDOWN seconds, and hedged requests
+    LLM_ROUTER_WINDOW: int = int(config("LLM_ROUTER_WINDOW", default=100))
+    LLM_MAX_ERROR_RATE: float = float(config("LLM_MAX_ERROR_RATE", default=0.5))
+    LLM_PROVIDER_COOLDOWN: float = float(config("LLM_PROVIDER_COOLDOWN", default=30))
+    LLM_HEDGE: bool = config("LLM_HEDGE", default=False, cast=bool)
+    LLM_HEDGE_MIN_SAMPLES: int = int(config("LLM_HEDGE_MIN_SAMPLES", default=20))
+
     # Platform Configuration (always generates for these platforms)
     DEFAULT_PLATFORMS = ["linkedin", "twitter"]
     SUPPORTED_PLATFORMS: List[str] = ["twitter", "linkedin", "facebook", "instagram"]
 
+    # Generation Configuration
+    PLATFORM_TIMEOUT: float = float(config("PLATFORM_TIMEOUT", default=60))
+    # Fetching: bodies are read incrementally and capped at this many bytes
+    FETCH_MAX_BYTES: int = int(config("FETCH_MAX_BYTES", default=5 * 1024 * 1024))
+
+    # Shared HTTP pool for blog fetching
+    HTTP_MAX_CONNECTIONS: int = int(config("HTTP_MAX_CONNECTIONS", default=100))
+    HTTP_MAX_KEEPALIVE: int = int(config("HTTP_MAX_KEEPALIVE", default=20))
+    HTTP_KEEPALIVE_EXPIRY: float = float(config("HTTP_KEEPALIVE_EXPIRY", default=30))
+    HTTP_PER_HOST_LIMIT: int = int(config("HTTP_PER_HOST_LIMIT", default=10))
+    HTTP_CONNECT_TIMEOUT: float = float(config("HTTP_CONNECT_TIMEOUT", default=5))
+    HTTP_READ_TIMEOUT: float = float(config("HTTP_READ_TIMEOUT", default=30))
+    HTTP2: bool = config("HTTP2", default=True, cast=bool)
+    DNS_CACHE_TTL: float = float(config("DNS_CACHE_TTL", default=300))
+
+    # HTML extraction engine: "lxml" (fast single pass) or "bs4" (reference)
+    EXTRACTION_ENGINE: str = str(config("EXTRACTION_ENGINE", default="lxml"))
+    # Article content above this many tokens is condensed before prompting (0 = off)
+    PROMPT_TOKEN_BUDGET: int = int(config("PROMPT_TOKEN_BUDGET", default=4000))
+    # "per_platform" sends one prompt per platform, "combined" sends the
+    # article once and asks for every platform as structured JSON
+    GENERATION_MODE: str = str(config("GENERATION_MODE", default="per_platform"))
+    # Provider-side caching of the article prefix shared by every prompt for
+    # an article: seconds a cache lives (0 = off, the default; only enable it
+    # for a model that supports explicit caching) and the shortest prefix
+    # worth caching, in estimated tokens
+    CONTEXT_CACHE_TTL: float = float(config("CONTEXT_CACHE_TTL", default=0))
+    CONTEXT_CACHE_MIN_TOKENS: int = int(config("CONTEXT_CACHE_MIN_TOKENS", default=1024))
+    # Validate generated posts (tweet length and numbering, hashtags, URL,
+    # truncation) and re-request only the parts that fail
+    POST_REPAIR: bool = config("POST_REPAIR", default=True, cast=bool)
+
+    # LLM Scheduling: concurrent calls, callers allowed to wait before new
+    # requests are rejected, provider quotas (0 = unlimited) and retries
+    LLM_MAX_CONCURRENCY: int = int(config("LLM_MAX_CONCURRENCY", default=8))
+    LLM_MAX_QUEUE: int = int(config("LLM_MAX_QUEUE", default=64))
+    LLM_RPM: int = int(config("LLM_RPM", default=0))
+    LLM_TPM: int = int(config("LLM_TPM", default=0))
+    LLM_MAX_RETRIES: int = int(config("LLM_MAX_RETRIES", default=3))
+
+    # Batch conversion: most URLs accepted per batch (or JSON-RPC batch
+    # array) and how many of them are converted at once
+    BATCH_MAX_URLS: int = int(config("BATCH_MAX_URLS", default=100))
+    BATCH_CONCURRENCY: int = int(config("BATCH_CONCURRENCY", default=8))
+
+    # Feed ingestion state (see ingest.py)
+    INGEST_DB_PATH: str = str(config("INGEST_DB_PATH", default="postcraft_ingest.sqlite3"))
+
+    # Cache Configuration ("memory", "sqlite" or "none")
+    CACHE_DB_PATH: str = str(config("CACHE_DB_PATH", default="postcraft_cache.sqlite3"))
+    BLOG_CACHE_BACKEND: str = str(config("BLOG_CACHE_BACKEND", default="memory"))
+    BLOG_CACHE_TTL: float = float(config("BLOG_CACHE_TTL", default=3600))
+    BLOG_CACHE_MAX_ENTRIES: int = int(config("BLOG_CACHE_MAX_ENTRIES", default=1024))
+    GENERATION_CACHE_BACKEND: str = str(config("GENERATION_CACHE_BACKEND", default="memory"))
+    GENERATION_CACHE_TTL: float = float(config("GENERATION_CACHE_TTL", default=86400))
+    GENERATION_CACHE_MAX_ENTRIES: int = int(config("GENERATION_CACHE_MAX_ENTRIES", default=1024))
+    # Distinct posts kept per key; repeat requests rotate between them
+    GENERATION_CACHE_VARIANTS: int = int(config("GENERATION_CACHE_VARIANTS", default=1))
+
+    # Task Configuration
+    # "blocking" answers message/send when the conversion finishes, "async"
+    # returns a submitted task immediately to be polled with tasks/get
+    TASK_MODE: str = str(config("TASK_MODE", default="blocking"))
+    TASK_WORKERS: int = int(config("TASK_WORKERS", default=4))
+    TASK_QUEUE_SIZE: int = int(config("TASK_QUEUE_SIZE", default=100))
+    TASK_STORE_BACKEND: str = str(config("TASK_STORE_BACKEND", default="memory"))
+    TASK_STORE_MAX_TASKS: int = int(config("TASK_STORE_MAX_TASKS", default=1000))
+    TASK_DB_PATH: str = str(config("TASK_DB_PATH", default="postcraft_tasks.sqlite3"))
+
+    @classmethod
+    def worker_count(cls) -> int:
+        """Number of server processes sharing the provider quotas"""
+        if cls.SERVER_MODE != "production":
+            return 1
+        return cls.WORKERS or os.cpu_count() or 1
+
     @classmethod
     def validate(cls) -> None:
         """Validate required settings"""
+        if cls.worker_count() > 1 and cls.TASK_STORE_BACKEND == "memory":
+            # tasks/get would only find tasks created by the worker it hits
+            raise ValueError(
+                "TASK_STORE_BACKEND=sqlite is required with more than one worker"
+            )
+        if "fake" in cls.LLM_PROVIDERS:
+            return
         if not cls.GEMINI_API_KEY and not cls.GROQ_API_KEY:
             raise ValueError("At least one AI API key (GEMINI or GROQ) must be set")
 
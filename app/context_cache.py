@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Entries are dropped this long before the provider expires them, so a call
+# never references a cache that disappears while the request is in flight
+EXPIRY_MARGIN = 30.0
+
+
+class ContextCache:
+    """Provider-side caches of shared prompt prefixes.
+
+    Every platform prompt for an article starts with the same prefix (the
+    instructions and the article). Providers that support context caching
+    store it once and later calls reference it by name, so its tokens are
+    billed at the cached rate and skip prefill.
+
+    A cache is created once per prefix (concurrent callers share the
+    creation) and reused by every call until shortly before its TTL runs
+    out; the provider deletes it after the TTL. Prefixes shorter than
+    `min_tokens` are not cached, since providers reject or do not discount
+    them. Each provider has its own ContextCache for its model, and a
+    failed creation turns caching off for that model for the TTL, so a
+    model without caching support does not cost every new article a
+    failed round trip.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[str, float], Awaitable[str]],
+        delete: Callable[[str], Awaitable[None]],
+        ttl: float = 0,
+        min_tokens: int = 1024,
+        model: str = "",
+    ):
+        """
+        Args:
+            create: Creates a cache holding the prefix for `ttl` seconds and
+                returns its name
+            delete: Deletes a cache by name
+            ttl: Seconds a cache lives (0 disables caching)
+            min_tokens: Shortest prefix worth caching, estimated at ~4
+                characters per token
+            model: The model caches are created for, for logging
+        """
+        self._create = create
+        self._delete = delete
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.model = model
+        # Prefix digest -> (cache name, local expiry)
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        # Caching is off for the model until then after a failed creation
+        self._disabled_until = 0.0
+        self._creating = SingleFlight()
+        self.created = 0
+        self.failed = 0
+        self.uses = 0
+
+    def worth_caching(self, prefix: str) -> bool:
+        return (
+            bool(self.ttl)
+            and len(prefix) // 4 >= self.min_tokens
+            and time.monotonic() >= self._disabled_until
+        )
+
+    async def get(self, prefix: str) -> Optional[str]:
+        """
+        Name of the cache holding `prefix`, creating it on first use
+
+        Returns:
+            The cache name, or None when the prefix is not cached and
+            should be sent in full
+        """
+        if not self.worth_caching(prefix):
+            return None
+
+        self._prune()
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = await self._creating.do(key, lambda: self._create_entry(key, prefix))
+
+        name = entry[0]
+        if name is not None:
+            self.uses += 1
+        return name
+
+    async def _create_entry(self, key: str, prefix: str) -> Tuple[Optional[str], float]:
+        expires_at = time.monotonic() + self.ttl - min(EXPIRY_MARGIN, self.ttl / 2)
+        try:
+            name = await self._create(prefix, self.ttl)
+        except Exception as e:
+            logger.warning(
+                "Context cache creation failed, caching off for the model",
+                extra={"model": self.model, "error": str(e), "seconds": self.ttl},
+            )
+            self.failed += 1
+            self._disabled_until = time.monotonic() + self.ttl
+            return (None, expires_at)
+
+        self.created += 1
+        logger.debug(
+            "Context cache created",
+            extra={"cache": name, "prefix_tokens": len(prefix) // 4},
+        )
+        entry = (name, expires_at)
+        self._entries[key] = entry
+        return entry
+
+    def forget(self, name: str):
+        """Drop a cache the provider no longer recognises"""
+        for key, (entry_name, _) in list(self._entries.items()):
+            if entry_name == name:
+                del self._entries[key]
+
+    def _prune(self):
+        now = time.monotonic()
+        for key, (_, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[key]
+
+    async def aclose(self):
+        """Delete the caches still alive instead of paying for their storage"""
+        self._prune()
+        for name, _ in self._entries.values():
+            try:
+                await self._delete(name)
+            except Exception as e:
+                logger.warning(
+                    "Context cache deletion failed", extra={"cache": name, "error": str(e)}
+                )
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "live": len(self._entries),
+            "created": self.created,
+            "failed": self.failed,
+            "uses": self.uses,
+        }
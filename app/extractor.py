@@ -1,20 +1,205 @@
+import asyncio
+import codecs
+import logging
 import re
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
+from app import metrics
+from app.cache import CacheBackend, CacheStats, normalize_url
+from app.http_pool import HTTPPool
 from app.models import BlogContent
+from app.telemetry import span
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Selectors are tried in priority order; the first match wins
+TITLE_SELECTORS = [
+    "h1",
+    "title",
+    '[property="og:title"]',
+    '[name="twitter:title"]',
+    ".post-title",
+    ".entry-title",
+    ".blog-title",
+]
+CONTENT_SELECTORS = [
+    "article",
+    ".post-content",
+    ".entry-content",
+    ".blog-content",
+    ".content",
+    "main",
+    ".post-body",
+    ".entry-body",
+]
+STRIP_TAGS = ["script", "style", "nav", "footer", "header", "aside", "ads"]
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Content types that might still be HTML served with a lazy header
+SNIFFABLE_CONTENT_TYPES = ("", "text/plain", "application/octet-stream")
+HTML_SIGNATURE = re.compile(rb"^\s*(?:<!doctype html|<html|<head|<body|<!--|<\?xml|<meta|<title)", re.I)
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_.:-]+)""", re.I)
+
+# Parsed once at warmup so the first real page skips one-time setup
+WARMUP_PAGE = (
+    "<html><head><title>Warmup</title></head><body><article><h1>Warmup</h1>"
+    "<p>A short page to prime the parser. It has two sentences.</p>"
+    "</article></body></html>"
+)
+
+# Elements that start a new line of extracted text; everything else (links,
+# emphasis, code, ...) is inline and stays part of the surrounding paragraph
+BLOCK_TAGS = frozenset(
+    """
+    address article aside blockquote br caption dd details div dl dt figcaption
+    figure footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section
+    summary table td th tr ul
+    """.split()
+)
+HEADING_TAGS = frozenset(("h1", "h2", "h3", "h4", "h5", "h6"))
+WHITESPACE = re.compile(r"\s+")
+
+TITLE_KEYS = frozenset(TITLE_SELECTORS)
+CONTENT_KEYS = frozenset(CONTENT_SELECTORS)
+STRIP_KEYS = frozenset(STRIP_TAGS)
+
+
+def _selector_keys(element) -> Iterator[str]:
+    """Selectors from the lists above that an element matches"""
+    yield element.tag
+    classes = element.get("class")
+    if classes:
+        for name in classes.split():
+            yield f".{name}"
+    for attribute in ("property", "name"):
+        value = element.get(attribute)
+        if value:
+            yield f'[{attribute}="{value}"]'
+
+
+class _TextBlocks:
+    """Builds extracted text with one line per block-level element"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.headings: List[str] = []
+        self._parts: List[str] = []
+        self._pre = 0
+
+    def open(self, tag: str):
+        if tag in BLOCK_TAGS:
+            self._break()
+        if tag == "pre":
+            self._pre += 1
+
+    def close(self, tag: str):
+        if tag == "pre":
+            self._pre -= 1
+        if tag in BLOCK_TAGS:
+            line = self._break()
+            if line and tag in HEADING_TAGS:
+                self.headings.append(line)
+
+    def text(self, value: str):
+        if not self._pre:
+            self._parts.append(value)
+            return
+        # Preformatted blocks keep their line breaks
+        first, *rest = value.split("\n")
+        self._parts.append(first)
+        for line in rest:
+            self._break()
+            self._parts.append(line)
+
+    def result(self) -> Tuple[str, List[str]]:
+        self._break()
+        return "\n".join(self.lines), self.headings
+
+    def _break(self) -> str:
+        line = WHITESPACE.sub(" ", "".join(self._parts)).strip()
+        self._parts.clear()
+        if line:
+            self.lines.append(line)
+        return line
+
+
+def _lxml_text(element) -> Tuple[str, List[str]]:
+    """Block-level text and headings of an lxml element"""
+    blocks = _TextBlocks()
+    for event, node in etree.iterwalk(element, events=("start", "end")):
+        # Comments and processing instructions only contribute their tail
+        if isinstance(node.tag, str):
+            if event == "start":
+                blocks.open(node.tag)
+                if node.text:
+                    blocks.text(node.text)
+                continue
+            blocks.close(node.tag)
+        if event == "end" and node is not element and node.tail:
+            blocks.text(node.tail)
+    return blocks.result()
+
+
+def _soup_text(element) -> Tuple[str, List[str]]:
+    """Block-level text and headings of a BeautifulSoup element"""
+    from bs4.element import CData, NavigableString, Tag
+
+    blocks = _TextBlocks()
+    blocks.open(element.name)
+    stack = [(element, iter(element.children))]
+    while stack:
+        tag, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            blocks.close(tag.name)
+        elif isinstance(child, Tag):
+            blocks.open(child.name)
+            stack.append((child, iter(child.children)))
+        elif type(child) in (NavigableString, CData):
+            blocks.text(str(child))
+    return blocks.result()
 
 
 class BlogExtractor:
-    def __init__(self, timeout: int = 30):
-        self.client = httpx.Client(timeout=timeout)
+    ENGINES = ("lxml", "bs4")
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        cache: Optional[CacheBackend] = None,
+        cache_ttl: float = 3600,
+        engine: str = "lxml",
+        max_bytes: int = 5 * 1024 * 1024,
+        http: Optional[HTTPPool] = None,
+    ):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown extraction engine: {engine}")
+        self.engine = engine
+        self.max_bytes = max_bytes
+        # A shared pool is owned (and closed) by whoever passed it in
+        self._owns_http = http is None
+        self.http = http if http is not None else HTTPPool(read_timeout=timeout)
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_stats = CacheStats()
 
-    def extract(self, url: str) -> BlogContent:
+    async def extract(self, url: str, revalidate: bool = False) -> BlogContent:
         """
         Extract blog post content from URL
 
         Args:
             url: Blog post URL
+            revalidate: Check a fresh cache entry with the origin instead of
+                trusting it until it expires
 
         Returns:
             BlogContent with title, content, and excerpt
@@ -22,43 +207,250 @@ class BlogExtractor:
         Raises:
             Exception: If extraction fails
         """
-        try:
-            # Fetch the webpage
-            response = self.client.get(url, follow_redirects=True)
-            response.raise_for_status()
+        key = normalize_url(url)
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry and "headings" not in entry.value["blog"]:
+            # Cached before text was split into block-level lines
+            entry = None
 
-            # Parse HTML
-            soup = BeautifulSoup(response.text, "lxml")
+        if entry and entry.fresh and not revalidate:
+            self.cache_stats.hits += 1
+            return BlogContent(**{**entry.value["blog"], "url": url})
 
-            # Extract title
-            title = self._extract_title(soup)
+        try:
+            # Fetch the webpage, revalidating a stale cache entry if we have one
+            headers: Dict[str, str] = {}
+            if entry:
+                if entry.value.get("etag"):
+                    headers["If-None-Match"] = entry.value["etag"]
+                if entry.value.get("last_modified"):
+                    headers["If-Modified-Since"] = entry.value["last_modified"]
 
-            # Extract main content
-            content = self._extract_content(soup)
+            headers["Accept"] = "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1"
 
-            # Generate excerpt
-            excerpt = self._generate_excerpt(content)
+            host = metrics.host_label(httpx.URL(url).host)
+            response: Optional[httpx.Response] = None
+            started = time.perf_counter()
+            with span("fetch", url=url) as fetch:
+                try:
+                    async with self.http.stream(
+                        "GET", url, headers=headers, follow_redirects=True
+                    ) as response:
+                        fetch["status_code"] = response.status_code
+                        if entry and response.status_code == 304:
+                            self.cache_stats.revalidated += 1
+                            self.cache.set(key, entry.value, self.cache_ttl)
+                            return BlogContent(**{**entry.value["blog"], "url": url})
 
-            return BlogContent(
-                url=url, title=title, content=content, excerpt=excerpt
-            )
+                        response.raise_for_status()
+                        self.cache_stats.misses += 1
+                        html = await self._read_html(response)
+                        fetch["chars"] = len(html)
+                finally:
+                    self._record_fetch(host, response, time.perf_counter() - started)
+
+            # Parsing is CPU-bound, keep it off the event loop
+            with span("parse_html", engine=self.engine, chars=len(html)):
+                blog = await asyncio.to_thread(self._parse, url, html)
 
         except Exception as e:
+            metrics.errors.inc("extract", type(e).__name__)
             raise Exception(f"Failed to extract content from {url}: {str(e)}")
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+        if self.cache is not None:
+            self.cache.set(
+                key,
+                {
+                    "blog": blog.model_dump(),
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                },
+                self.cache_ttl,
+            )
+
+        return blog
+
+    @staticmethod
+    def _record_fetch(host: str, response: Optional[httpx.Response], seconds: float):
+        status = str(response.status_code) if response is not None else "error"
+        metrics.fetches.inc(host, status)
+        metrics.fetch_duration.observe(seconds, host)
+        if response is not None:
+            metrics.fetch_bytes.inc(host, amount=response.num_bytes_downloaded)
+
+    async def _read_html(self, response: httpx.Response) -> str:
+        """
+        Read an HTML body incrementally.
+
+        Rejects non-HTML content before downloading it, decodes as bytes
+        arrive and stops at `max_bytes`. The whole page is read otherwise:
+        the first <article> may be a promo inside stripped chrome, and the
+        title can come from anywhere in the document.
+
+        Raises:
+            Exception: If the response is not HTML
+        """
+        content_type = (
+            response.headers.get("content-type", "").split(";")[0].strip().lower()
+        )
+        if not content_type.startswith(HTML_CONTENT_TYPES) and (
+            content_type not in SNIFFABLE_CONTENT_TYPES
+        ):
+            raise Exception(f"Unsupported content type: {content_type}")
+
+        decoder = None
+        parts: List[str] = []
+        received = 0
+
+        async for chunk in response.aiter_bytes():
+            if decoder is None:
+                if not content_type.startswith(HTML_CONTENT_TYPES) and (
+                    not HTML_SIGNATURE.match(chunk)
+                ):
+                    raise Exception(
+                        f"Unsupported content type: {content_type or 'unknown'}"
+                    )
+                decoder = codecs.getincrementaldecoder(
+                    self._detect_encoding(response, chunk)
+                )(errors="replace")
+
+            chunk = chunk[: self.max_bytes - received]
+            received += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+
+            if received >= self.max_bytes:
+                logger.warning(
+                    "Stopped reading at size limit",
+                    extra={"url": str(response.url), "max_bytes": self.max_bytes},
+                )
+                break
+
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+
+        return "".join(parts)
+
+    def _detect_encoding(self, response: httpx.Response, head: bytes) -> str:
+        """Charset from the Content-Type header, then <meta charset>, else UTF-8"""
+        candidates = [response.charset_encoding]
+        match = META_CHARSET.search(head[:4096])
+        if match:
+            candidates.append(match.group(1).decode("ascii"))
+
+        for encoding in candidates:
+            if not encoding:
+                continue
+            try:
+                return codecs.lookup(encoding).name
+            except LookupError:
+                continue
+        return "utf-8"
+
+    def _parse(self, url: str, html: str) -> BlogContent:
+        """Parse fetched HTML into BlogContent"""
+        if self.engine == "lxml":
+            title, content, headings = self._parse_with_lxml(html)
+        else:
+            title, content, headings = self._parse_with_soup(html)
+
+        # Generate excerpt
+        excerpt = self._generate_excerpt(content)
+
+        return BlogContent(
+            url=url, title=title, content=content, excerpt=excerpt, headings=headings
+        )
+
+    def _parse_with_soup(self, html: str) -> Tuple[str, str, List[str]]:
+        """Reference engine: BeautifulSoup tree with CSS selector lookups"""
+        # Imported here: bs4 adds noticeably to startup and the default
+        # engine does not need it
+        from bs4 import BeautifulSoup
+
+        # Parse HTML
+        soup = BeautifulSoup(html, "lxml")
+
+        # Extract title
+        title = self._extract_title(soup)
+
+        # Extract main content
+        content, headings = self._extract_content(soup)
+
+        return title, content, headings
+
+    def _parse_with_lxml(self, html: str) -> Tuple[str, str, List[str]]:
+        """
+        Fast engine: lxml tree with a single candidate traversal.
+
+        Produces the same title, content and headings as the BeautifulSoup engine
+        but collects every title, content and strip candidate in one walk
+        over the tree instead of a select_one call per selector.
+        """
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # Documents declaring an XML encoding must be parsed from bytes
+            root = lxml.html.document_fromstring(
+                html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8")
+            )
+        except etree.ParserError:
+            return "Untitled", "", []
+
+        strip: List = []
+        titles: Dict[str, object] = {}
+        contents: Dict[str, List] = {selector: [] for selector in CONTENT_SELECTORS}
+        for element in root.iter(etree.Element):
+            if element.tag in STRIP_KEYS:
+                strip.append(element)
+            for key in _selector_keys(element):
+                if key in TITLE_KEYS and key not in titles:
+                    titles[key] = element
+                if key in CONTENT_KEYS:
+                    contents[key].append(element)
+
+        title = "Untitled"
+        for selector in TITLE_SELECTORS:
+            element = titles.get(selector)
+            if element is not None:
+                text = "".join(t.strip() for t in element.itertext()) or element.get(
+                    "content", ""
+                )
+                if text:
+                    title = text
+                    break
+
+        # Content is chosen as if stripped tags were already removed, as in
+        # the soup engine, so skip candidates inside them
+        stripped = set(strip)
+        content_element = None
+        for selector in CONTENT_SELECTORS:
+            content_element = next(
+                (
+                    element
+                    for element in contents[selector]
+                    if element not in stripped
+                    and not any(a in stripped for a in element.iterancestors())
+                ),
+                None,
+            )
+            if content_element is not None:
+                break
+
+        for element in strip:
+            element.drop_tree()
+
+        if content_element is None:
+            content_element = root.find("body")
+            if content_element is None:
+                content_element = root
+
+        text, headings = _lxml_text(content_element)
+
+        return title, self._clean_text(text), headings
+
+    def _extract_title(self, soup: "BeautifulSoup") -> str:
         """Extract title from HTML"""
-        title_selectors = [
-            "h1",
-            "title",
-            '[property="og:title"]',
-            '[name="twitter:title"]',
-            ".post-title",
-            ".entry-title",
-            ".blog-title",
-        ]
-
-        for selector in title_selectors:
+        for selector in TITLE_SELECTORS:
             element = soup.select_one(selector)
             if element:
                 title = element.get_text(strip=True) or element.get("content", "")
@@ -67,26 +459,13 @@ class BlogExtractor:
 
         return "Untitled"
 
-    def _extract_content(self, soup: BeautifulSoup) -> str:
-        """Extract main content from HTML"""
-        for element in soup(
-            ["script", "style", "nav", "footer", "header", "aside", "ads"]
-        ):
+    def _extract_content(self, soup: "BeautifulSoup") -> Tuple[str, List[str]]:
+        """Extract main content and its headings from HTML"""
+        for element in soup(STRIP_TAGS):
             element.decompose()
 
-        content_selectors = [
-            "article",
-            ".post-content",
-            ".entry-content",
-            ".blog-content",
-            ".content",
-            "main",
-            ".post-body",
-            ".entry-body",
-        ]
-
         content_element = None
-        for selector in content_selectors:
+        for selector in CONTENT_SELECTORS:
             content_element = soup.select_one(selector)
             if content_element:
                 break
@@ -94,9 +473,9 @@ class BlogExtractor:
         if not content_element:
             content_element = soup.find("body") or soup
 
-        text = content_element.get_text(separator="\n", strip=True)
+        text, headings = _soup_text(content_element)
 
-        return self._clean_text(text)
+        return self._clean_text(text), headings
 
     def _clean_text(self, text: str) -> str:
         """Clean extracted text"""
@@ -130,5 +509,13 @@ class BlogExtractor:
 
         return excerpt.strip()
 
-    def __del__(self):
-        self.client.close()
+    def warmup(self):
+        """Run the configured engine once on a tiny page"""
+        self._parse("about:warmup", WARMUP_PAGE)
+
+    async def aclose(self):
+        """Close the HTTP pool (if this extractor created it) and cache"""
+        if self._owns_http:
+            await self.http.aclose()
+        if self.cache is not None:
+            self.cache.close()
@@ -1,9 +1,30 @@
-from typing import List, Optional
-
-from google.genai import Client, types
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
+from app.cache import CacheBackend, CacheEntry, CacheStats, normalize_url
 from app.config import settings
 from app.models import BlogContent, SocialPost
+from app.providers import ProviderRouter, create_providers
+from app.scheduler import LLMScheduler, SchedulerFull
+from app.telemetry import span
+from app.validation import (
+    HASHTAGS,
+    TWEET_MARKER,
+    TWEET_MAX_CHARS,
+    Issue,
+    RepairStats,
+    hashtags,
+    parse_thread,
+    split_hashtag_line,
+    tweet_length,
+    validate_post,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class AIGenerator:
@@ -12,21 +33,54 @@ class AIGenerator:
     Always generates Twitter threads and comprehensive LinkedIn posts
     from blog content regardless of input platform specifications.
     """
-    
-    def __init__(self):
-        self.gemini_client: Optional[Client] = None
-        self._initialize_gemini()
 
-    def _initialize_gemini(self):
-        """Initialize Gemini AI client if API key is available"""
-        if settings.GEMINI_API_KEY:
-            try:
-                self.gemini_client = Client(api_key=settings.GEMINI_API_KEY)
-            except Exception as e:
-                print(f"Failed to initialize Gemini: {e}")
-                self.gemini_client = None
+    TEMPERATURE = 0.7
+    MAX_OUTPUT_TOKENS = 500
+    # Output limits per platform: up to five 280-character tweets, and a
+    # LinkedIn post of up to 800 words (~1100 tokens) plus hashtags
+    PLATFORM_MAX_OUTPUT_TOKENS = {"twitter": 600, "linkedin": 1400}
+    # Output limits of targeted repairs
+    REPAIR_TWEET_TOKENS = 120
+    REPAIR_HASHTAG_TOKENS = 40
+    # Bump whenever prompt wording changes so cached posts are not reused
+    PROMPT_VERSION = "3"
+    # Keys whose variant rotation position is remembered (in memory)
+    ROTATION_MAX_KEYS = 10_000
+
+    def __init__(
+        self,
+        cache: Optional[CacheBackend] = None,
+        cache_ttl: float = 86400,
+        cache_variants: int = 1,
+        scheduler: Optional[LLMScheduler] = None,
+        router: Optional[ProviderRouter] = None,
+    ):
+        self.scheduler = scheduler or LLMScheduler()
+        self.router = router or ProviderRouter(
+            create_providers(settings.LLM_PROVIDERS),
+            self.scheduler,
+            hedge=settings.LLM_HEDGE,
+            hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+            window=settings.LLM_ROUTER_WINDOW,
+            max_error_rate=settings.LLM_MAX_ERROR_RATE,
+            cooldown=settings.LLM_PROVIDER_COOLDOWN,
+        )
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_variants = max(1, cache_variants)
+        # Cache key -> next variant to serve; kept in memory so a hit never
+        # writes to the cache
+        self._rotation: "OrderedDict[str, int]" = OrderedDict()
+        self.cache_stats = CacheStats()
+        self.repair_stats = RepairStats()
+
+    async def aclose(self):
+        """Close provider clients and the cache"""
+        await self.router.aclose()
+        if self.cache is not None:
+            self.cache.close()
 
-    def generate_posts(
+    async def generate_posts(
         self, blog_content: BlogContent, platforms: List[str] | str
     ) -> List[SocialPost]:
         """
@@ -40,69 +94,678 @@ class AIGenerator:
             List of SocialPost objects with Twitter threads and LinkedIn posts
         """
 
-        posts: List[SocialPost] = []
         if not isinstance(platforms, List):
             platforms = [platforms]
 
         # Always generate for LinkedIn and Twitter
-        target_platforms = ["linkedin", "twitter"]
+        target_platforms = settings.DEFAULT_PLATFORMS
 
+        cached: Dict[str, str] = {}
         for platform in target_platforms:
+            content = self._cached_post(blog_content, platform)
+            if content is not None:
+                cached[platform] = content
+        pending = [p for p in target_platforms if p not in cached]
+
+        # In combined mode the article is sent once for every platform;
+        # anything missing or malformed is regenerated per platform below
+        combined: Dict[str, str] = {}
+        if settings.GENERATION_MODE == "combined" and len(pending) > 1:
+            combined = await self._generate_combined(blog_content, pending)
+
+        # Platforms are generated concurrently; one failing or timing out
+        # falls back to a placeholder without affecting the others
+        generated = await asyncio.gather(
+            *(
+                self._generate_post(blog_content, platform, combined.get(platform))
+                for platform in pending
+            )
+        )
+        posts = {post.platform: post for post in generated}
+        posts.update(
+            {p: SocialPost(platform=p, content=c) for p, c in cached.items()}
+        )
+
+        return [posts[platform] for platform in target_platforms]
+
+    async def stream_posts(
+        self, blog_content: BlogContent, platforms: List[str] | str
+    ) -> AsyncIterator[Tuple[str, str, bool]]:
+        """
+        Stream posts for every platform as the model produces them.
+
+        Platforms are generated concurrently and their chunks interleave.
+
+        Args:
+            blog_content: Extracted blog content
+            platforms: List of platforms (always generates for LinkedIn and Twitter)
+
+        Yields:
+            (platform, text chunk, done) tuples; a platform's last tuple has
+            an empty chunk and done set
+        """
+        target_platforms = settings.DEFAULT_PLATFORMS
+        queue: "asyncio.Queue[Tuple[str, Optional[str]]]" = asyncio.Queue()
+
+        async def run(platform: str):
             try:
-                content = self._generate_platform_content(blog_content, platform)
-                posts.append(SocialPost(platform=platform, content=content))
-            except Exception as e:
-                print(f"Failed to generate post for {platform}: {e}")
-                posts.append(
-                    SocialPost(
-                        platform=platform,
-                        content=f"Failed to generate content for {platform}",
-                    )
+                await self._stream_post(blog_content, platform, queue)
+            finally:
+                await queue.put((platform, None))
+
+        tasks = [asyncio.create_task(run(platform)) for platform in target_platforms]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                platform, chunk = await queue.get()
+                if chunk is None:
+                    remaining -= 1
+                    yield platform, "", True
+                else:
+                    yield platform, chunk, False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_post(
+        self,
+        blog_content: BlogContent,
+        platform: str,
+        queue: "asyncio.Queue[Tuple[str, Optional[str]]]",
+    ):
+        """Push one platform's chunks onto the queue, never raising"""
+        cached = self._cached_post(blog_content, platform)
+        if cached is not None:
+            await queue.put((platform, cached))
+            return
+
+        chunks: List[str] = []
+        try:
+            with span("llm_call", platform=platform, mode="stream"):
+                async with asyncio.timeout(settings.PLATFORM_TIMEOUT):
+                    async for chunk in self._stream_platform_content(
+                        blog_content, platform
+                    ):
+                        chunks.append(chunk)
+                        await queue.put((platform, chunk))
+        except TimeoutError:
+            logger.warning("Timed out generating post", extra={"platform": platform})
+        except Exception as e:
+            logger.warning(
+                "Failed to generate post", extra={"platform": platform, "error": str(e)}
+            )
+        else:
+            content = "".join(chunks).strip()
+            if content:
+                # Streamed text has already reached the client and cannot be
+                # repaired, so only a post that passes validation is cached
+                # for later requests
+                if not validate_post(
+                    SocialPost(platform=platform, content=content),
+                    blog_content.url,
+                    self._max_output_tokens(platform),
+                ):
+                    self._store_post(blog_content, platform, content)
+                return
+
+        if not chunks:
+            await queue.put((platform, f"Failed to generate content for {platform}"))
+
+    async def _generate_post(
+        self,
+        blog_content: BlogContent,
+        platform: str,
+        pregenerated: Optional[str] = None,
+    ) -> SocialPost:
+        """Generate a single platform post, never raising"""
+        if pregenerated is not None:
+            post = SocialPost(platform=platform, content=pregenerated.strip())
+            if not any(issue.kind == "format" for issue in validate_post(post)):
+                content = await self._checked_post(blog_content, platform, post.content)
+                self._store_post(blog_content, platform, content)
+                return SocialPost(platform=platform, content=content)
+            self.repair_stats.regenerated += 1
+            logger.warning(
+                "Combined output is invalid, regenerating", extra={"platform": platform}
+            )
+
+        try:
+            with span("llm_call", platform=platform, mode="single"):
+                content = await asyncio.wait_for(
+                    self._generate_platform_content(blog_content, platform),
+                    timeout=settings.PLATFORM_TIMEOUT,
+                )
+            content = await self._checked_post(blog_content, platform, content)
+            self._store_post(blog_content, platform, content)
+            return SocialPost(platform=platform, content=content)
+        except SchedulerFull:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("Timed out generating post", extra={"platform": platform})
+        except Exception as e:
+            logger.warning(
+                "Failed to generate post", extra={"platform": platform, "error": str(e)}
+            )
+
+        return SocialPost(
+            platform=platform,
+            content=f"Failed to generate content for {platform}",
+        )
+
+    async def _generate_combined(
+        self, blog_content: BlogContent, platforms: List[str]
+    ) -> Dict[str, str]:
+        """
+        Generate every platform from a single structured-output call.
+
+        Returns:
+            Mapping of platform to raw post text; empty if the call failed
+        """
+        if not self.router.providers:
+            return {}
+
+        with span("prompt_build", mode="combined"):
+            prefix = self._prompt_prefix(blog_content)
+            prompt = self._create_combined_prompt(platforms)
+        schema = {
+            "type": "OBJECT",
+            "properties": {platform: {"type": "STRING"} for platform in platforms},
+            "required": platforms,
+        }
+
+        try:
+            with span("llm_call", platform=",".join(platforms), mode="combined"):
+                raw = await asyncio.wait_for(
+                    self._generate_text(
+                        prompt,
+                        max_output_tokens=sum(map(self._max_output_tokens, platforms)),
+                        json_schema=schema,
+                        platform="combined",
+                        prefix=prefix,
+                    ),
+                    timeout=settings.PLATFORM_TIMEOUT,
                 )
+            data = json.loads(raw)
+        except SchedulerFull:
+            raise
+        except Exception as e:
+            logger.warning(
+                "Combined generation failed, falling back per platform",
+                extra={"error": str(e)},
+            )
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+        return {
+            platform: data[platform]
+            for platform in platforms
+            if isinstance(data.get(platform), str)
+        }
+
+    def _cache_key(self, blog_content: BlogContent, platform: str) -> str:
+        """Key generated posts on everything that shapes the model output"""
+        digest = hashlib.sha256()
+        for part in (
+            blog_content.title,
+            blog_content.content,
+            # Shared by links to the same article with tracking params etc.
+            normalize_url(blog_content.url),
+            platform,
+            self.PROMPT_VERSION,
+            self.router.signature,
+            str(self.TEMPERATURE),
+            str(self._max_output_tokens(platform)),
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
 
-        return posts
+    def cache_keys(self, blog_content: BlogContent) -> List[str]:
+        """Generation cache keys of an article's posts, one per platform"""
+        return [
+            self._cache_key(blog_content, platform)
+            for platform in settings.DEFAULT_PLATFORMS
+        ]
 
-    def _generat_with_gemini(self, prompt):
-        if not self.gemini_client:
-            raise Exception("Gemini client not initialized")
+    def is_cached(self, blog_content: BlogContent, platform: str) -> bool:
+        """Whether a request for this article and platform would be a cache hit"""
+        return self.is_cached_key(self._cache_key(blog_content, platform))
 
-        response = self.gemini_client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.7, max_output_tokens=500
-            ),
+    def is_cached_key(self, key: str) -> bool:
+        """Whether a cache key holds fresh posts in every variant the cache keeps"""
+        if self.cache is None:
+            return False
+        entry = self._cache_get(key)
+        return (
+            entry is not None
+            and entry.fresh
+            and len(entry.value["variants"]) >= self.cache_variants
         )
-        if response is None or not response.text:
-            raise Exception("No response from Gemini API")
-        return response.text.strip()
 
-    def _generate_platform_content(
-        self, blog_content: BlogContent, platform: str
+    def _cache_get(self, key: str) -> Optional[CacheEntry]:
+        """Read a cache entry; the cache is best-effort, so errors are misses"""
+        try:
+            return self.cache.get(key)
+        except Exception as e:
+            logger.warning("Generation cache read failed", extra={"error": str(e)})
+            return None
+
+    def _cached_post(self, blog_content: BlogContent, platform: str) -> Optional[str]:
+        """
+        Return a cached post, rotating through stored variants.
+
+        Until `cache_variants` distinct variants exist for a key the lookup
+        counts as a miss so a new variant gets generated.
+        """
+        if self.cache is None:
+            return None
+
+        key = self._cache_key(blog_content, platform)
+        entry = self._cache_get(key)
+        if entry is None or not entry.fresh:
+            self.cache_stats.misses += 1
+            return None
+
+        variants: List[str] = entry.value["variants"]
+        if len(variants) < self.cache_variants:
+            self.cache_stats.misses += 1
+            return None
+
+        self.cache_stats.hits += 1
+        if len(variants) < 2:
+            return variants[0]
+
+        index = self._rotation.pop(key, 0) % len(variants)
+        self._rotation[key] = index + 1
+        if len(self._rotation) > self.ROTATION_MAX_KEYS:
+            self._rotation.popitem(last=False)
+        return variants[index]
+
+    def _store_post(self, blog_content: BlogContent, platform: str, content: str):
+        """Add a freshly generated post to the cache, never raising"""
+        if self.cache is None:
+            return
+
+        key = self._cache_key(blog_content, platform)
+        entry = self._cache_get(key)
+        variants: List[str] = []
+        if entry is not None and entry.fresh:
+            variants = entry.value["variants"]
+        if content not in variants:
+            variants = (variants + [content])[-self.cache_variants :]
+
+        # The post is already generated and paid for; losing the cache
+        # write only costs a later regeneration
+        try:
+            self.cache.set(key, {"variants": variants}, self.cache_ttl)
+        except Exception as e:
+            logger.warning(
+                "Generation cache write failed",
+                extra={"platform": platform, "error": str(e)},
+            )
+
+    def _max_output_tokens(self, platform: str) -> int:
+        return self.PLATFORM_MAX_OUTPUT_TOKENS.get(platform, self.MAX_OUTPUT_TOKENS)
+
+    async def _checked_post(
+        self, blog_content: BlogContent, platform: str, content: str
     ) -> str:
-        prompt = self._create_prompt(blog_content, platform)
-        if self.gemini_client:
-            try:
-                return self._generat_with_gemini(prompt)
-            except Exception as e:
-                print(f"⚠️ Gemini failed, trying Groq: {e}")
+        """
+        Validate a generated post and repair what fails, never raising.
+
+        Only the offending tweet or section is re-requested (or fixed
+        locally, e.g. numbering or a missing URL); the saving is measured
+        against regenerating the whole post.
+
+        Returns:
+            The repaired post, or the post as generated if it passed or
+            could not be repaired
+        """
+        if not settings.POST_REPAIR:
+            return content
+
+        self.repair_stats.checked += 1
+        issues = validate_post(
+            SocialPost(platform=platform, content=content),
+            blog_content.url,
+            self._max_output_tokens(platform),
+        )
+        if not issues:
+            return content
+        self.repair_stats.flagged += 1
+
+        try:
+            with span("repair", platform=platform):
+                repaired, tokens_used = await asyncio.wait_for(
+                    self._repair(blog_content, platform, content, issues),
+                    timeout=settings.PLATFORM_TIMEOUT,
+                )
+        except Exception as e:
+            logger.warning(
+                "Failed to repair post",
+                extra={
+                    "platform": platform,
+                    "issues": [issue.kind for issue in issues],
+                    "error": str(e) or type(e).__name__,
+                },
+            )
+            return content
+
+        # Checked against the same limits as the original, and kept only if
+        # it fixed something without ending up with more issues
+        remaining = validate_post(
+            SocialPost(platform=platform, content=repaired),
+            blog_content.url,
+            self._max_output_tokens(platform),
+        )
+        fixed = {i.kind for i in issues} - {i.kind for i in remaining}
+        if not fixed or len(remaining) > len(issues):
+            logger.info(
+                "Post left with issues",
+                extra={
+                    "platform": platform,
+                    "issues": [i.kind for i in issues],
+                    "after_repair": [i.kind for i in remaining],
+                },
+            )
+            return content
+
+        # A full retry would resend the prompt and regenerate the whole post
+        prefix, prompt = self._create_prompt(blog_content, platform)
+        full_retry = (len(prefix) + len(prompt) + len(repaired)) // 4
+        tokens_saved = max(0, full_retry - tokens_used)
+        self.repair_stats.repaired += 1
+        self.repair_stats.tokens_used += tokens_used
+        self.repair_stats.tokens_saved += tokens_saved
+        logger.info(
+            "Post repaired",
+            extra={
+                "platform": platform,
+                "fixed": sorted(fixed),
+                "remaining": [issue.kind for issue in remaining],
+                "tokens_used": tokens_used,
+                "tokens_saved": tokens_saved,
+            },
+        )
+        return repaired
 
-        raise Exception("No AI client available for content generation")
+    async def _repair(
+        self,
+        blog_content: BlogContent,
+        platform: str,
+        content: str,
+        issues: List[Issue],
+    ) -> Tuple[str, int]:
+        """
+        Fix the issues of a post with targeted requests
+
+        Returns:
+            (repaired post, estimated tokens the repair requests cost)
+        """
+        tokens_used = 0
+        if any(issue.kind == "truncated" for issue in issues):
+            content, tokens_used = await self._continue_post(
+                blog_content, platform, content
+            )
+            issues = validate_post(
+                SocialPost(platform=platform, content=content),
+                blog_content.url,
+                self._max_output_tokens(platform),
+            )
 
-    def _create_prompt(self, blog_content: BlogContent, platform: str) -> str:
-        """Create platform-specific prompts for social media content generation."""
-        
+        kinds = {issue.kind for issue in issues}
         if platform == "twitter":
-            prompt = f"""
-            Create a Twitter thread based on the following blog content. The thread should tell a complete story and provide value to the reader.
+            content, tokens = await self._repair_thread(content, kinds)
+        elif platform == "linkedin":
+            content, tokens = await self._repair_linkedin(
+                content, kinds, blog_content.url
+            )
+        else:
+            tokens = 0
+        return content, tokens_used + tokens
+
+    async def _repair_thread(self, content: str, kinds: Set[str]) -> Tuple[str, int]:
+        """Add missing hashtags and shorten over-long tweets; renumbers the thread"""
+        thread = parse_thread(content)
+        tokens_used = 0
+        if "hashtags" in kinds:
+            tags, tokens_used = await self._request_hashtags(
+                "twitter", content, HASHTAGS["twitter"][0]
+            )
+            last = thread.tweets[-1]
+            last.text = f"{last.text} {' '.join(tags)}"
+
+        total = len(thread.tweets)
+        long_tweets = [
+            position
+            for position, tweet in enumerate(thread.tweets, 1)
+            if tweet_length(tweet.text, position, total) > TWEET_MAX_CHARS
+        ]
+        rendered = thread.render()
+        rewrites = await asyncio.gather(
+            *(self._rewrite_tweet(rendered, position, total) for position in long_tweets)
+        )
+        for position, (text, tokens) in zip(long_tweets, rewrites):
+            tokens_used += tokens
+            tweet = thread.tweets[position - 1]
+            if text and len(text) < len(tweet.text):
+                tweet.text = text
+        return thread.render(), tokens_used
+
+    async def _repair_linkedin(
+        self, content: str, kinds: Set[str], url: str
+    ) -> Tuple[str, int]:
+        """Fix the hashtag line and add the blog URL ahead of it"""
+        body, tags = split_hashtag_line(content)
+        low, high = HASHTAGS["linkedin"]
+        tokens_used = 0
+        if "hashtags" in kinds:
+            inline = len(hashtags(body))
+            if inline + len(tags) > high:
+                # Dropping some from the closing line needs no request
+                tags = tags[: max(0, high - inline)]
+            else:
+                extra, tokens_used = await self._request_hashtags(
+                    "linkedin", content, low - inline - len(tags)
+                )
+                tags += [tag for tag in extra if tag not in tags]
+        if "missing_url" in kinds and url:
+            body = f"{body}\n\nRead the full post: {url}"
+        if tags:
+            body = f"{body}\n\n{' '.join(tags)}"
+        return body, tokens_used
+
+    async def _continue_post(
+        self, blog_content: BlogContent, platform: str, content: str
+    ) -> Tuple[str, int]:
+        """Ask for the rest of a post that was cut off at the token limit"""
+        numbering = ""
+        if platform == "twitter":
+            numbering = (
+                " Finish the thread, numbering any further tweets in the same"
+                " k/n format, and put the hashtags in the final tweet."
+            )
+        prompt = f"""
+            Below is a {platform} post written from the blog post above. It was cut off before the end.
+
+            {content}
+
+            Continue it from exactly where it stops.{numbering} Respond with only the continuation, without repeating any of the text above.
+            """
+        continuation, tokens = await self._repair_call(
+            prompt,
+            self._max_output_tokens(platform) // 2,
+            platform,
+            prefix=self._prompt_prefix(blog_content),
+        )
+        separator = "\n\n" if TWEET_MARKER.match(continuation) else " "
+        return content.rstrip() + separator + continuation, tokens
+
+    async def _rewrite_tweet(
+        self, thread: str, position: int, total: int
+    ) -> Tuple[str, int]:
+        """A shorter version of one tweet of a thread, without its numbering"""
+        limit = TWEET_MAX_CHARS - len(f"{position}/{total} ")
+        prompt = f"""
+            Below is a Twitter thread.
+
+            {thread}
+
+            Tweet {position}/{total} is too long. Rewrite it in at most {limit} characters, keeping its point, its place in the thread and any hashtags. Respond with only the new text of that tweet, without its numbering.
+            """
+        text, tokens = await self._repair_call(
+            prompt, self.REPAIR_TWEET_TOKENS, "twitter"
+        )
+        return TWEET_MARKER.sub("", text, count=1).strip(), tokens
+
+    async def _request_hashtags(
+        self, platform: str, content: str, count: int
+    ) -> Tuple[List[str], int]:
+        """`count` relevant hashtags for a post"""
+        prompt = f"""
+            Suggest {count} relevant hashtags for this {platform} post. Respond with only the hashtags, separated by spaces.
+
+            {content}
+            """
+        text, tokens = await self._repair_call(
+            prompt, self.REPAIR_HASHTAG_TOKENS, platform
+        )
+        return hashtags(text)[:count], tokens
+
+    async def _repair_call(
+        self, prompt: str, max_output_tokens: int, platform: str, prefix: str = ""
+    ) -> Tuple[str, int]:
+        """One repair request: (response text, estimated tokens it cost)"""
+        self.repair_stats.repair_calls += 1
+        text = await self._generate_text(
+            prompt, max_output_tokens, platform=f"{platform}_repair", prefix=prefix
+        )
+        return text.strip(), (len(prefix) + len(prompt) + len(text)) // 4
+
+    async def _generate_text(
+        self,
+        prompt: str,
+        max_output_tokens: int = MAX_OUTPUT_TOKENS,
+        json_schema: Optional[Dict] = None,
+        platform: str = "",
+        prefix: str = "",
+    ) -> str:
+        return await self.router.generate(
+            prompt,
+            max_output_tokens,
+            self.TEMPERATURE,
+            json_schema=json_schema,
+            tokens=self._estimate_tokens(prefix + prompt, max_output_tokens),
+            platform=platform,
+            prefix=prefix,
+        )
+
+    async def _stream_text(
+        self, prompt: str, platform: str = "", prefix: str = ""
+    ) -> AsyncIterator[str]:
+        max_output_tokens = self._max_output_tokens(platform)
+        async for chunk in self.router.stream(
+            prompt,
+            max_output_tokens,
+            self.TEMPERATURE,
+            tokens=self._estimate_tokens(prefix + prompt, max_output_tokens),
+            platform=platform,
+            prefix=prefix,
+        ):
+            yield chunk
+
+    def _estimate_tokens(self, prompt: str, max_output_tokens: int) -> int:
+        """Rough token cost of a call for TPM pacing (~4 characters per token)"""
+        return len(prompt) // 4 + max_output_tokens
+
+    async def _stream_platform_content(
+        self, blog_content: BlogContent, platform: str
+    ) -> AsyncIterator[str]:
+        with span("prompt_build", platform=platform):
+            prefix, prompt = self._create_prompt(blog_content, platform)
+        async for chunk in self._stream_text(prompt, platform, prefix):
+            yield chunk
+
+    async def _generate_platform_content(
+        self, blog_content: BlogContent, platform: str
+    ) -> str:
+        with span("prompt_build", platform=platform):
+            prefix, prompt = self._create_prompt(blog_content, platform)
+        return await self._generate_text(
+            prompt, self._max_output_tokens(platform), platform=platform, prefix=prefix
+        )
+
+    def _prompt_prefix(self, blog_content: BlogContent) -> str:
+        """
+        Start of every prompt for an article: the article itself.
 
-            Blog Title: {blog_content.title}
+        It is identical for every platform, for combined mode and for
+        regenerations, so providers can cache it once per article; anything
+        platform-specific belongs after it.
+        """
+        return f"""You write social media posts from blog posts. The blog post comes first; the instructions for the post to write follow it.
+
+            {self._article_block(blog_content)}
+            """
+
+    def _create_prompt(self, blog_content: BlogContent, platform: str) -> Tuple[str, str]:
+        """
+        Create platform-specific prompts for social media content generation.
+
+        Returns:
+            (shared prefix, platform-specific rest of the prompt)
+        """
+
+        return self._prompt_prefix(blog_content), f"""
+            {self._platform_task(platform)}
+
+            {self._platform_requirements(platform)}
+            """
+
+    def _create_combined_prompt(self, platforms: List[str]) -> str:
+        """Create the rest of one prompt that requests every platform from the shared prefix."""
+
+        sections = "\n\n".join(
+            f"""
+            === {platform} ===
+            {self._platform_task(platform)}
+
+            {self._platform_requirements(platform)}
+            """
+            for platform in platforms
+        )
+
+        return f"""
+            Create social media posts for each of the following platforms based on the blog content above.
+
+            {sections}
+
+            Respond with a JSON object that has one key per platform ({", ".join(platforms)}).
+            Each value must be the complete post for that platform as plain text, following its requirements.
+            """
+
+    def _article_block(self, blog_content: BlogContent) -> str:
+        """Blog details shared by every platform prompt"""
+        return f"""Blog Title: {blog_content.title}
             Blog Content: {blog_content.content}
-            Blog URL: {blog_content.url}
+            Blog URL: {blog_content.url}"""
+
+    def _platform_task(self, platform: str) -> str:
+        """Opening instruction for a platform"""
+        if platform == "twitter":
+            return "Create a Twitter thread based on the blog content above. The thread should tell a complete story and provide value to the reader."
+        if platform == "linkedin":
+            return "Create a comprehensive LinkedIn post based on the blog content above. This should be a full social media version that provides substantial value to professionals."
+        return f"Create an engaging social media post for {platform} based on the blog content above."
 
-            Requirements:
+    def _platform_requirements(self, platform: str) -> str:
+        """Platform-specific requirements and output format"""
+        if platform == "twitter":
+            return """Requirements:
             - Create a multi-tweet thread (3-5 tweets)
             - Each tweet should be numbered as "1/n", "2/n", etc.
+            - Each tweet must be at most 280 characters, including its number
             - First tweet should hook the reader and introduce the topic
             - Middle tweets should develop the main points and insights
             - Final tweet should provide a call-to-action or key takeaway
@@ -117,17 +780,9 @@ class AIGenerator:
             Tweet 3/n: [content]
             ...
 
-            Generate only the thread content without any additional text or explanations.
-            """
-        elif platform == "linkedin":
-            prompt = f"""
-            Create a comprehensive LinkedIn post based on the following blog content. This should be a full social media version that provides substantial value to professionals.
-
-            Blog Title: {blog_content.title}
-            Blog Content: {blog_content.content}
-            Blog URL: {blog_content.url}
-
-            Requirements:
+            Generate only the thread content without any additional text or explanations."""
+        if platform == "linkedin":
+            return """Requirements:
             - Write a detailed, professional post (300-800 words)
             - Start with a strong hook that grabs attention
             - Include 3-5 key insights or takeaways from the blog
@@ -139,17 +794,5 @@ class AIGenerator:
             - Maintain a professional but conversational tone
             - Include the original blog URL for reference
 
-            Generate only the LinkedIn post content without any additional text or explanations.
-            """
-        else:
-            prompt = f"""
-            Create an engaging social media post for {platform} based on the following blog content.
-
-            Blog Title: {blog_content.title}
-            Blog Content: {blog_content.content}
-            Blog URL: {blog_content.url}
-
-            Generate appropriate content for the platform that provides value and engagement.
-            """
-
-        return prompt
+            Generate only the LinkedIn post content without any additional text or explanations."""
+        return "Generate appropriate content for the platform that provides value and engagement."
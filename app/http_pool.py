@@ -0,0 +1,260 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# httpx has no public option for httpcore's network backend, so the DNS
+# cache is installed on the transport's private pool. That attribute is
+# only relied on for the httpcore major versions it was checked against.
+NETWORK_BACKEND_HTTPCORE_MAJORS = (1,)
+
+
+def _can_set_network_backend(transport: httpx.AsyncHTTPTransport) -> bool:
+    major = httpcore.__version__.split(".", 1)[0]
+    if not major.isdigit() or int(major) not in NETWORK_BACKEND_HTTPCORE_MAJORS:
+        return False
+    return hasattr(getattr(transport, "_pool", None), "_network_backend")
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches DNS lookups for `ttl` seconds.
+
+    Connections are opened to the cached addresses in the order the
+    resolver returned them, falling back to the next one when a connect
+    fails; TLS still uses the original hostname for SNI and certificate
+    checks because httpcore passes it separately when starting TLS.
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        addresses = await self._resolve(host, port) if self.ttl else [host]
+        for index, address in enumerate(addresses):
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                if index + 1 < len(addresses):
+                    continue
+                # Every address failed: resolve again next time
+                self._cache.pop((host, port), None)
+                raise
+        raise httpcore.ConnectError(f"No addresses found for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class HTTPPool:
+    """Process-wide async connection pool for fetching blogs.
+
+    Wraps a single httpx.AsyncClient tuned for a few hot hosts: optional
+    HTTP/2, keep-alive limits, per-host concurrency caps, cached DNS and
+    separate connect/read timeouts. Start and close it from the
+    application lifespan; it is also created lazily on first use.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 30,
+        per_host_limit: int = 10,
+        connect_timeout: float = 5,
+        read_timeout: float = 30,
+        http2: bool = True,
+        dns_ttl: float = 300,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.per_host_limit = per_host_limit
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http2 = http2 and self._http2_available()
+        self.dns = CachingDNSBackend(ttl=dns_ttl)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_active: Dict[str, int] = defaultdict(int)
+        self._host_waiting: Dict[str, int] = defaultdict(int)
+        self.requests = 0
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 is not installed, blog fetching falls back to HTTP/1.1")
+            return False
+        return True
+
+    async def start(self):
+        """Create the client ahead of the first request; safe to call more than once"""
+        if self._client is None:
+            self._client = self._build_client()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        transport = self._transport
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            if _can_set_network_backend(transport):
+                transport._pool._network_backend = self.dns
+            elif self.dns.ttl:
+                logger.warning(
+                    "DNS caching is not supported with this httpcore version",
+                    extra={"httpcore": httpcore.__version__},
+                )
+        return httpx.AsyncClient(transport=transport, timeout=self.timeout)
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, follow_redirects: bool = False, **kwargs: Any
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Stream a request while holding one of the host's connection slots
+
+        Redirects are followed here rather than by httpx so that every hop
+        holds a slot for its own host: the per-host limit also covers
+        requests that land on another host after a redirect.
+        """
+        request = self.client.build_request(method, url, **kwargs)
+        history: List[httpx.Response] = []
+        while True:
+            if len(history) > self.client.max_redirects:
+                raise httpx.TooManyRedirects(
+                    "Exceeded maximum allowed redirects.", request=request
+                )
+            async with self._host_slot(request.url.host):
+                self.requests += 1
+                response = await self.client.send(
+                    request, stream=True, follow_redirects=False
+                )
+                try:
+                    response.history = list(history)
+                    if not follow_redirects or response.next_request is None:
+                        yield response
+                        return
+                    request = response.next_request
+                    history.append(response)
+                finally:
+                    await response.aclose()
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        """Hold one of the host's connection slots"""
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        self._host_waiting[host] += 1
+        try:
+            await slots.acquire()
+        except BaseException:
+            # Cancelled while waiting
+            self._host_waiting[host] -= 1
+            self._forget_if_idle(host)
+            raise
+        self._host_waiting[host] -= 1
+
+        self._host_active[host] += 1
+        try:
+            yield
+        finally:
+            slots.release()
+            self._host_active[host] -= 1
+            self._forget_if_idle(host)
+
+    def _forget_if_idle(self, host: str):
+        """Drop an idle host's entries so the tables do not grow without bound"""
+        if not self._host_active[host] and not self._host_waiting[host]:
+            self._host_slots.pop(host, None)
+            self._host_active.pop(host, None)
+            self._host_waiting.pop(host, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation for sizing the limits"""
+        connections = []
+        if self._client is not None:
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+
+        return {
+            "http2": self.http2,
+            "requests": self.requests,
+            "connections": len(connections),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "max_connections": self.max_connections,
+            "active_per_host": {h: n for h, n in self._host_active.items() if n},
+            "waiting_per_host": {h: n for h, n in self._host_waiting.items() if n},
+            "dns_cache": {"hits": self.dns.hits, "misses": self.dns.misses},
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
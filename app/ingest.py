@@ -0,0 +1,374 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional, Set, Tuple
+
+import httpx
+from lxml import etree
+
+from app.cache import normalize_url
+from app.config import settings
+from app.models import BlogContent
+from app.processor import PostProcessor
+
+FEED_ACCEPT = (
+    "application/rss+xml, application/atom+xml, application/xml;q=0.9, "
+    "text/xml;q=0.9, */*;q=0.1"
+)
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Nested sitemap indexes are followed at most this deep
+MAX_SITEMAP_DEPTH = 3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedEntry:
+    """One article listed by an RSS/Atom feed or a sitemap"""
+
+    url: str
+    guid: str = ""
+    lastmod: str = ""
+
+    @property
+    def marker(self) -> str:
+        """Change marker from the feed itself; empty when the feed gives none"""
+        if not (self.guid or self.lastmod):
+            return ""
+        return f"{self.guid}|{self.lastmod}"
+
+
+def _local_name(element) -> str:
+    return etree.QName(element).localname
+
+
+def _child_text(element, *names: str) -> str:
+    """Text of the first child with one of `names`, in priority order"""
+    children = {}
+    for child in element:
+        if isinstance(child.tag, str):
+            children.setdefault(_local_name(child), child)
+    for name in names:
+        child = children.get(name)
+        if child is not None and child.text:
+            return child.text.strip()
+    return ""
+
+
+def _atom_link(entry) -> str:
+    """href of the entry's alternate link"""
+    for child in entry:
+        if isinstance(child.tag, str) and _local_name(child) == "link":
+            if child.get("rel", "alternate") == "alternate" and child.get("href"):
+                return child.get("href").strip()
+    return ""
+
+
+class FeedParser:
+    """Incremental parser for RSS, Atom and sitemap documents.
+
+    Bytes are fed as they arrive and entries are yielded as soon as their
+    closing tag is parsed. Parsed entries are removed from the tree so
+    memory stays flat however long the feed is.
+    """
+
+    def __init__(self):
+        self._parser = etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True
+        )
+
+    def feed(self, data: bytes) -> Iterator[Tuple[str, FeedEntry]]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> Iterator[Tuple[str, FeedEntry]]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> Iterator[Tuple[str, FeedEntry]]:
+        for _, element in self._parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            parsed = self._parse_element(element)
+            if parsed is None:
+                continue
+
+            yield parsed
+
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    def _parse_element(self, element) -> Optional[Tuple[str, FeedEntry]]:
+        tag = _local_name(element)
+        parent = element.getparent()
+        parent_tag = _local_name(parent) if parent is not None else ""
+
+        if tag == "item":
+            entry = FeedEntry(
+                url=_child_text(element, "link") or _child_text(element, "guid"),
+                guid=_child_text(element, "guid"),
+                lastmod=_child_text(element, "updated", "pubDate", "date"),
+            )
+            kind = "entry"
+        elif tag == "entry":
+            entry = FeedEntry(
+                url=_atom_link(element),
+                guid=_child_text(element, "id"),
+                lastmod=_child_text(element, "updated", "published"),
+            )
+            kind = "entry"
+        elif tag == "url" and parent_tag == "urlset":
+            entry = FeedEntry(
+                url=_child_text(element, "loc"),
+                lastmod=_child_text(element, "lastmod"),
+            )
+            kind = "entry"
+        elif tag == "sitemap" and parent_tag == "sitemapindex":
+            entry = FeedEntry(url=_child_text(element, "loc"))
+            kind = "sitemap"
+        else:
+            return None
+
+        if not entry.url.startswith(("http://", "https://")):
+            return None
+        return kind, entry
+
+
+class IngestState:
+    """SQLite record of what was last ingested for each article
+
+    Besides the feed's change marker and the content hash it keeps the
+    generation cache keys of the posts, so a run can tell whether they
+    are still cached without fetching the article.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ingested (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                marker TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                ingested_at REAL NOT NULL,
+                cache_keys TEXT NOT NULL DEFAULT ''
+            )"""
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(ingested)")}
+        if "cache_keys" not in columns:
+            # State files from before cache keys were recorded
+            self._conn.execute(
+                "ALTER TABLE ingested ADD COLUMN cache_keys TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, str, List[str]]]:
+        """(marker, content_hash, generation cache keys) recorded for an article"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT marker, content_hash, cache_keys FROM ingested WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], [k for k in row[2].split(",") if k]
+
+    def save(
+        self, key: str, url: str, marker: str, content_hash: str, cache_keys: List[str]
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingested "
+                "(key, url, marker, content_hash, ingested_at, cache_keys) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, marker, content_hash, time.time(), ",".join(cache_keys)),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ingested").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def content_hash(blog: BlogContent) -> str:
+    """Hash of the extracted article, independent of the URL it was fetched from"""
+    digest = hashlib.sha256()
+    digest.update(blog.title.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(blog.content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FeedIngestor:
+    """Pre-generate posts for new or changed articles of feeds and sitemaps.
+
+    Entries whose GUID/lastmod match the state store, and whose posts are
+    all still cached, are skipped without a request. Others are fetched
+    (revalidating the blog cache) and hashed; posts are only generated when
+    the content changed or its cached posts have expired (or do not have
+    every variant the generation cache keeps yet). Results land in the processor's blog and generation
+    caches, so a server sharing those caches answers from them.
+    """
+
+    def __init__(
+        self,
+        processor: PostProcessor,
+        state: IngestState,
+        concurrency: int = 8,
+        force: bool = False,
+        dry_run: bool = False,
+    ):
+        self.processor = processor
+        self.state = state
+        self.concurrency = concurrency
+        self.force = force
+        self.dry_run = dry_run
+        self.counts: Counter = Counter()
+        self._seen: Set[str] = set()
+
+    async def ingest(self, feed_url: str):
+        """Stream a feed or sitemap and process its entries as they are parsed"""
+        queue: "asyncio.Queue[Optional[FeedEntry]]" = asyncio.Queue(
+            maxsize=self.concurrency * 2
+        )
+        workers = [
+            asyncio.create_task(self._work(queue)) for _ in range(self.concurrency)
+        ]
+        try:
+            await self._read_feed(feed_url, queue)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    async def _read_feed(
+        self, feed_url: str, queue: "asyncio.Queue[Optional[FeedEntry]]", depth: int = 0
+    ):
+        logger.info("Reading feed", extra={"url": feed_url})
+        parser = FeedParser()
+        sitemaps: List[str] = []
+
+        async def handle(parsed: Iterator[Tuple[str, FeedEntry]]):
+            for kind, entry in parsed:
+                if kind == "sitemap":
+                    sitemaps.append(entry.url)
+                else:
+                    self.counts["entries"] += 1
+                    await queue.put(entry)
+
+        try:
+            async with self.processor.http.stream(
+                "GET", feed_url, headers={"Accept": FEED_ACCEPT}, follow_redirects=True
+            ) as response:
+                response.raise_for_status()
+                async for chunk in self._read_body(response):
+                    await handle(parser.feed(chunk))
+            await handle(parser.close())
+        except (httpx.HTTPError, etree.XMLSyntaxError, zlib.error) as e:
+            self.counts["feed_errors"] += 1
+            logger.warning(
+                "Failed to read feed", extra={"url": feed_url, "error": str(e)}
+            )
+
+        for sitemap in sitemaps:
+            if depth >= MAX_SITEMAP_DEPTH:
+                logger.warning("Sitemap nesting too deep, skipping", extra={"url": sitemap})
+                continue
+            await self._read_feed(sitemap, queue, depth + 1)
+
+    async def _read_body(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        """Response bytes, un-gzipping .xml.gz sitemaps served without Content-Encoding"""
+        decompressor = None
+        first = True
+        async for chunk in response.aiter_bytes():
+            if first:
+                first = False
+                if chunk.startswith(GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            yield decompressor.decompress(chunk) if decompressor else chunk
+        if decompressor:
+            yield decompressor.flush()
+
+    async def _work(self, queue: "asyncio.Queue[Optional[FeedEntry]]"):
+        while True:
+            entry = await queue.get()
+            if entry is None:
+                return
+            try:
+                await self._ingest_entry(entry)
+            except Exception as e:
+                self.counts["failed"] += 1
+                logger.warning(
+                    "Ingestion failed", extra={"url": entry.url, "error": str(e)}
+                )
+
+    async def _ingest_entry(self, entry: FeedEntry):
+        key = normalize_url(entry.url)
+        if key in self._seen:
+            # Listed by more than one feed or sitemap in this run
+            self.counts["duplicates"] += 1
+            return
+        self._seen.add(key)
+
+        previous = None if self.force else self.state.get(key)
+        generator = self.processor.generator
+
+        if (
+            previous
+            and entry.marker
+            and previous[0] == entry.marker
+            and previous[2]
+            and all(generator.is_cached_key(k) for k in previous[2])
+        ):
+            self.counts["unchanged"] += 1
+            return
+
+        if self.dry_run:
+            self.counts["pending"] += 1
+            logger.info("Pending", extra={"url": entry.url})
+            return
+
+        blog = await self.processor.extractor.extract(entry.url, revalidate=True)
+        digest = content_hash(blog)
+        blog = await self.processor.condense(blog)
+
+        cache_keys = generator.cache_keys(blog)
+
+        def warm() -> bool:
+            return all(generator.is_cached_key(k) for k in cache_keys)
+
+        if previous and previous[1] == digest and warm():
+            self.state.save(key, entry.url, entry.marker, digest, cache_keys)
+            self.counts["content_unchanged"] += 1
+            return
+
+        # Each call adds one variant until the cache holds all it keeps
+        for _ in range(generator.cache_variants):
+            if warm():
+                break
+            await generator.generate_posts(blog, settings.DEFAULT_PLATFORMS)
+        if not warm():
+            # Leave the state untouched so the next run tries again
+            self.counts["failed"] += 1
+            logger.warning("Generation failed", extra={"url": entry.url})
+            return
+
+        self.state.save(key, entry.url, entry.marker, digest, cache_keys)
+        self.counts["generated"] += 1
+        logger.info("Generated", extra={"url": entry.url})
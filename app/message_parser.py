@@ -1,8 +1,11 @@
 import re
-from typing import List, Optional
+from typing import Iterator, List
 
 from app.models import Message
 
+URL_PATTERN = re.compile(r'https?://[^\s<>"]+')
+ASSIST_PATTERN = re.compile("assist you", re.IGNORECASE)
+
 
 class MessageParser:
     """Parse message from telex a2a and extract blog URL.
@@ -14,50 +17,77 @@ class MessageParser:
     def extract_blog_url_and_platforms(cls, message: Message):
         """Extract blog URL from message and return fixed platforms.
         
+        Parts are scanned in order and scanning stops at the first URL, so
+        long conversation histories after it are never looked at.
+
         Args:
             message: Message object containing blog URL
             
         Returns:
             Tuple of (blog_url, ["linkedin", "twitter"])
         """
-        text_parts: List[str] = []
+        url = None
+        for text in cls._texts(message):
+            match = URL_PATTERN.search(text)
+            if match:
+                url = match.group()
+                break
+        if not url:
+            raise ValueError("No valid blog URL found in the message")
+
+        platforms = ["linkedin", "twitter"]
+        return url, platforms
+
+    @classmethod
+    def extract_blog_urls(cls, message: Message) -> List[str]:
+        """Extract every blog URL in a message, in order of appearance.
+
+        Args:
+            message: Message object containing one or more blog URLs
+
+        Returns:
+            List of URLs, possibly with repeats
+        """
+        urls = [
+            url for text in cls._texts(message) for url in URL_PATTERN.findall(text)
+        ]
+        if not urls:
+            raise ValueError("No valid blog URL found in the message")
+        return urls
+
+    @classmethod
+    def _texts(cls, message: Message) -> Iterator[str]:
+        """
+        Yield the user-written text parts that may hold a URL, including
+        those inside data parts
+
+        Markup (text starting with "<"), the agent's own "assist you"
+        prompts and texts without "://" are skipped; only texts that pass
+        the cheap substring check are checked for "assist you".
 
+        Raises:
+            ValueError: If the message has no text parts at all
+        """
+        found = False
         for part in message.parts:
             part_dict = part if isinstance(part, dict) else part.model_dump()
             kind = part_dict.get("kind")
-            
+
             if kind == "text":
                 text = part_dict.get("text", "")
-                if not text.startswith("<") and "assist you" not in text.lower():
-                    text_parts.append(text)
+                if not text.startswith("<"):
+                    found = True
+                    if "://" in text and not ASSIST_PATTERN.search(text):
+                        yield text
             elif kind == "data":
                 # Handle data parts that contain text content
-                data_items = part_dict.get("data", [])
-                for item in data_items:
+                for item in part_dict.get("data", []):
                     if isinstance(item, dict) and item.get("kind") == "text":
                         text = item.get("text", "")
-                        if not text.startswith("<") and "assist you" not in text.lower():
-                            text_parts.append(text)
+                        if not text.startswith("<"):
+                            found = True
+                            if "://" in text and not ASSIST_PATTERN.search(text):
+                                yield text
 
-        if not text_parts:
+        if not found:
             raise ValueError("No text parts found in the message")
-
-        full_text = " ".join(text_parts)
-        url = cls._extract_blog_url(full_text)
-        if not url:
-            raise ValueError("No valid blog URL found in the message")
-
-        platforms = ["linkedin", "twitter"]
-        return url, platforms
-
-    @classmethod
-    def _extract_blog_url(cls, text: str) -> Optional[str]:
-        url_pattern = r'https?://[^\s<>"]+'
-        matches = re.findall(url_pattern, text)
-
-        if matches:
-            return matches[0]
-
-        return None
-
-
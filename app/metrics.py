@@ -0,0 +1,395 @@
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from app.config import settings
+from app.telemetry import LATENCY_BUCKETS, Histogram, stage_timings
+
+if TYPE_CHECKING:
+    from app.processor import PostProcessor
+
+Labels = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    # Every worker process keeps its own values, so each series carries the
+    # worker's pid; sum over `worker` in queries for service-wide numbers
+    pairs = [f'worker="{os.getpid()}"']
+    pairs.extend(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _histogram_lines(
+    name: str, names: Sequence[str], values: Sequence[str], histogram: Histogram
+) -> Iterator[str]:
+    cumulative = 0
+    bounds = [*histogram.buckets, float("inf")]
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        labels = _labels([*names, "le"], [*values, _number(bound)])
+        yield f"{name}_bucket{labels} {cumulative}"
+    labels = _labels(names, values)
+    yield f"{name}_sum{labels} {_number(histogram.sum)}"
+    yield f"{name}_count{labels} {histogram.count}"
+
+
+class Metric:
+    """A metric family in the Prometheus text exposition format.
+
+    Values are plain dicts keyed by label tuples. Like the stage
+    histograms they are only updated from the event loop thread, so
+    recording takes no lock. Values are per process: every sample is
+    labelled with the worker's pid.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class LabeledHistogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Labels, Histogram] = {}
+
+    def observe(self, value: float, *labels: str):
+        histogram = self.histograms.get(labels)
+        if histogram is None:
+            histogram = self.histograms[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for labels, histogram in sorted(self.histograms.items()):
+            yield from _histogram_lines(self.name, self.labelnames, labels, histogram)
+
+
+class StageDurations(Metric):
+    """The pipeline stage histograms recorded by `telemetry.span`"""
+
+    kind = "histogram"
+
+    def __init__(self):
+        super().__init__(
+            "postcraft_stage_duration_seconds",
+            "Duration of pipeline stages",
+            ("stage",),
+        )
+
+    def samples(self) -> Iterator[str]:
+        for stage, histogram in sorted(stage_timings.histograms.items()):
+            yield from _histogram_lines(self.name, self.labelnames, (stage,), histogram)
+
+
+class Collected(Metric):
+    """Values read from live objects at scrape time, costing nothing to record"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+    ):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.collect():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for m in self.metrics for line in m.render()) + "\n"
+
+
+registry = Registry()
+
+rpc_requests: Counter = registry.register(
+    Counter(
+        "postcraft_rpc_requests_total",
+        "JSON-RPC requests by method and outcome",
+        ("method", "outcome"),
+    )
+)
+rpc_duration: LabeledHistogram = registry.register(
+    LabeledHistogram(
+        "postcraft_rpc_request_duration_seconds",
+        "Time to answer a JSON-RPC request, to the end of the stream when streaming",
+        ("method",),
+    )
+)
+rpc_in_flight: Gauge = registry.register(
+    Gauge("postcraft_rpc_requests_in_flight", "JSON-RPC requests being answered")
+)
+# Host label for fetches from domains outside METRICS_FETCH_HOSTS
+OTHER_HOST = "other"
+
+
+def host_label(host: str) -> str:
+    """
+    Bounded host label for the fetch metrics
+
+    Hosts come from user-supplied URLs, so only allowlisted domains (and
+    their subdomains, labelled with the domain) get their own series.
+    """
+    host = host.lower().rstrip(".")
+    for domain in settings.METRICS_FETCH_HOSTS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return OTHER_HOST
+
+
+fetch_duration: LabeledHistogram = registry.register(
+    LabeledHistogram(
+        "postcraft_fetch_duration_seconds", "Blog fetch latency by host", ("host",)
+    )
+)
+fetch_bytes: Counter = registry.register(
+    Counter("postcraft_fetch_bytes_total", "Blog bytes downloaded by host", ("host",))
+)
+fetches: Counter = registry.register(
+    Counter(
+        "postcraft_fetches_total",
+        "Blog fetches by host and HTTP status (or error)",
+        ("host", "status"),
+    )
+)
+llm_duration: LabeledHistogram = registry.register(
+    LabeledHistogram(
+        "postcraft_llm_call_duration_seconds",
+        "Model call latency by provider and platform, excluding scheduler queueing",
+        ("provider", "platform"),
+    )
+)
+llm_calls: Counter = registry.register(
+    Counter(
+        "postcraft_llm_calls_total",
+        "Model calls by provider, platform and outcome",
+        ("provider", "platform", "outcome"),
+    )
+)
+llm_tokens: Counter = registry.register(
+    Counter(
+        "postcraft_llm_tokens_total",
+        "Tokens reported by the providers' usage metadata",
+        ("provider", "model", "kind"),
+    )
+)
+errors: Counter = registry.register(
+    Counter("postcraft_errors_total", "Errors by stage and class", ("stage", "error"))
+)
+registry.register(StageDurations())
+
+
+class RequestTimer:
+    """Records one JSON-RPC request once its response, or stream, is done"""
+
+    def __init__(self):
+        self.method = "invalid"
+        self.started = time.perf_counter()
+        self.finished = False
+        rpc_in_flight.inc()
+
+    def finish(self, outcome: str):
+        if self.finished:
+            return
+        self.finished = True
+        rpc_in_flight.dec()
+        rpc_requests.inc(self.method, outcome)
+        rpc_duration.observe(time.perf_counter() - self.started, self.method)
+
+    async def wrap_stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        outcome = "cancelled"
+        try:
+            async for chunk in chunks:
+                yield chunk
+            outcome = "ok"
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            self.finish(outcome)
+
+
+def watch_processor(processor: "PostProcessor"):
+    """Register scrape-time gauges and counters for a processor's components"""
+
+    def caches():
+        for name, stats in (
+            ("blog", processor.extractor.cache_stats),
+            ("generation", processor.generator.cache_stats),
+        ):
+            for result, value in stats.as_dict().items():
+                yield (name, result), value
+
+    def repairs(prefix: str, *keys: str):
+        """Collect repair_stats entries, labelled by key without `prefix`"""
+
+        def collect():
+            stats = processor.generator.repair_stats.as_dict()
+            return [((key[len(prefix) :],), stats[key]) for key in keys]
+
+        return collect
+
+    def pool():
+        stats = processor.http.stats()
+        yield ("open",), stats["connections"]
+        yield ("idle",), stats["idle_connections"]
+
+    def scheduler(key: str):
+        return lambda: [((), processor.scheduler.stats()[key])]
+
+    def coalescing():
+        stats = processor.inflight.stats()
+        yield ("started",), stats["calls"]
+        yield ("coalesced",), stats["coalesced"]
+
+    for metric in (
+        Collected(
+            "postcraft_llm_in_flight",
+            "Model calls holding a scheduler slot",
+            "gauge",
+            (),
+            scheduler("in_flight"),
+        ),
+        Collected(
+            "postcraft_llm_queued",
+            "Model calls waiting for a scheduler slot",
+            "gauge",
+            (),
+            scheduler("queue_depth"),
+        ),
+        Collected(
+            "postcraft_llm_rejected_total",
+            "Model calls refused because the scheduler queue was full",
+            "counter",
+            (),
+            scheduler("rejected"),
+        ),
+        Collected(
+            "postcraft_background_jobs_queued",
+            "Background conversions waiting for a worker",
+            "gauge",
+            (),
+            lambda: [((), processor.workers.pending)],
+        ),
+        Collected(
+            "postcraft_coalesced_in_flight",
+            "Distinct conversions currently shared by coalesced requests",
+            "gauge",
+            (),
+            lambda: [((), processor.inflight.stats()["in_flight"])],
+        ),
+        Collected(
+            "postcraft_coalescing_requests_total",
+            "Conversions started, or joined while an identical one was in flight",
+            "counter",
+            ("result",),
+            coalescing,
+        ),
+        Collected(
+            "postcraft_cache_requests_total",
+            "Cache lookups by cache and result",
+            "counter",
+            ("cache", "result"),
+            caches,
+        ),
+        Collected(
+            "postcraft_post_checks_total",
+            "Generated posts validated, by outcome",
+            "counter",
+            ("result",),
+            repairs("", "checked", "flagged", "repaired", "regenerated"),
+        ),
+        Collected(
+            "postcraft_repair_tokens_total",
+            "Estimated tokens spent on targeted repairs and saved against full retries",
+            "counter",
+            ("kind",),
+            repairs("tokens_", "tokens_used", "tokens_saved"),
+        ),
+        Collected(
+            "postcraft_http_connections",
+            "Blog fetch connections by state",
+            "gauge",
+            ("state",),
+            pool,
+        ),
+    ):
+        registry.register(metric)
@@ -24,6 +24,7 @@ class Message(BaseModel):
 class TaskStatus(BaseModel):
     state: Literal["submitted", "working", "completed", "failed", "canceled"]
     timestamp: Optional[str] = None
+    message: Optional[Message] = None
 
 
 class Artifact(BaseModel):
@@ -42,6 +43,34 @@ class Task(BaseModel):
     metadata: Dict[str, Any] = {}
 
 
+class TaskStatusUpdateEvent(BaseModel):
+    """Streamed task status change"""
+
+    taskId: str
+    contextId: Optional[str] = None
+    status: TaskStatus
+    final: bool = False
+    kind: Literal["status-update"] = "status-update"
+
+
+class TaskArtifactUpdateEvent(BaseModel):
+    """Streamed artifact chunk"""
+
+    taskId: str
+    contextId: Optional[str] = None
+    artifact: Artifact
+    append: bool = False
+    lastChunk: bool = False
+    kind: Literal["artifact-update"] = "artifact-update"
+
+
+class BatchResult(BaseModel):
+    """One task per distinct URL of a batch conversion"""
+
+    tasks: List[Task]
+    kind: Literal["batch"] = "batch"
+
+
 class JSONRPCRequest(BaseModel):
     jsonrpc: Literal["2.0"] = "2.0"
     method: str
@@ -52,7 +81,9 @@ class JSONRPCRequest(BaseModel):
 class JSONRPCResponse(BaseModel):
     jsonrpc: Literal["2.0"] = "2.0"
     id: Union[str, int, None]
-    result: Optional[Task] = None
+    result: Optional[
+        Union[Task, TaskStatusUpdateEvent, TaskArtifactUpdateEvent, BatchResult]
+    ] = None
     error: Optional[Dict[str, Any]] = None
 
 
@@ -63,6 +94,8 @@ class BlogContent(BaseModel):
     title: str
     content: str
     excerpt: str
+    # Lines of `content` that are h1-h6 headings in the page
+    headings: List[str] = []
 
 
 class SocialPost(BaseModel):
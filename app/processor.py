@@ -1,23 +1,46 @@
+import asyncio
+import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+from app import metrics
+from app.cache import create_cache_backend, normalize_url
+from app.condenser import ContentCondenser
+from app.config import settings
 from app.extractor import BlogExtractor
 from app.generator import AIGenerator
+from app.http_pool import HTTPPool
 from app.message_parser import MessageParser
 from app.models import (
     Artifact,
+    BatchResult,
     JSONRPCRequest,
     JSONRPCResponse,
     Message,
     ProcessingRequest,
     Task,
+    TaskArtifactUpdateEvent,
     TaskStatus,
+    TaskStatusUpdateEvent,
     TextPart,
 )
+from app.scheduler import LLMScheduler
+from app.singleflight import SingleFlight
+from app.tasks import WorkerPool, create_task_store
+from app.telemetry import span, task_id_var
 
 from .models import BlogContent, SocialPost
 
+logger = logging.getLogger(__name__)
+
+# Reported for conversions cut short by a shutdown or a disconnected client
+INTERRUPTED_ERROR = "The conversion was interrupted, please try again"
+FINAL_STATES = ("completed", "failed", "canceled")
+
+WARMUP_URL = "https://example.com/warmup"
+
 
 class PostProcessor:
     """Main processor for blog to social media conversion.
@@ -27,10 +50,64 @@ class PostProcessor:
     """
 
     def __init__(self):
-        self.extractor = BlogExtractor()
-        self.generator = AIGenerator()
+        # Provider quotas are per account, so each worker process gets its share
+        workers = settings.worker_count()
+        self.scheduler = LLMScheduler(
+            max_concurrency=max(1, settings.LLM_MAX_CONCURRENCY // workers),
+            max_queue=settings.LLM_MAX_QUEUE,
+            rpm=max(1, settings.LLM_RPM // workers) if settings.LLM_RPM else 0,
+            tpm=max(1, settings.LLM_TPM // workers) if settings.LLM_TPM else 0,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+        self.http = HTTPPool(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            per_host_limit=settings.HTTP_PER_HOST_LIMIT,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.HTTP_READ_TIMEOUT,
+            http2=settings.HTTP2,
+            dns_ttl=settings.DNS_CACHE_TTL,
+        )
+        self.extractor = BlogExtractor(
+            cache=create_cache_backend(
+                settings.BLOG_CACHE_BACKEND,
+                namespace="blog",
+                max_entries=settings.BLOG_CACHE_MAX_ENTRIES,
+                path=settings.CACHE_DB_PATH,
+            ),
+            cache_ttl=settings.BLOG_CACHE_TTL,
+            engine=settings.EXTRACTION_ENGINE,
+            max_bytes=settings.FETCH_MAX_BYTES,
+            http=self.http,
+        )
+        self.generator = AIGenerator(
+            cache=create_cache_backend(
+                settings.GENERATION_CACHE_BACKEND,
+                namespace="generation",
+                max_entries=settings.GENERATION_CACHE_MAX_ENTRIES,
+                path=settings.CACHE_DB_PATH,
+            ),
+            cache_ttl=settings.GENERATION_CACHE_TTL,
+            cache_variants=settings.GENERATION_CACHE_VARIANTS,
+            scheduler=self.scheduler,
+        )
+        self.condenser = ContentCondenser(max_tokens=settings.PROMPT_TOKEN_BUDGET)
+        self.inflight = SingleFlight()
+        self.tasks = create_task_store(
+            settings.TASK_STORE_BACKEND,
+            max_tasks=settings.TASK_STORE_MAX_TASKS,
+            path=settings.TASK_DB_PATH,
+        )
+        self.workers = WorkerPool(
+            workers=settings.TASK_WORKERS, max_pending=settings.TASK_QUEUE_SIZE
+        )
+        # "starting" until start() (and warmup, when enabled) finishes,
+        # "ready" while serving, "stopping" once shutdown begins
+        self.state = "starting"
+        self._warmup: Optional[asyncio.Task] = None
 
-    def process(self, request: ProcessingRequest) -> List[SocialPost]:
+    async def process(self, request: ProcessingRequest) -> List[SocialPost]:
         """
         Process blog URL and generate social media posts for LinkedIn and Twitter.
 
@@ -40,44 +117,135 @@ class PostProcessor:
         Returns:
             List of generated social posts (Twitter thread and LinkedIn post)
         """
-        print(f"📝 Processing blog: {request.blog_url}")
-        print("🎯 Generating for: LinkedIn and Twitter (always)")
-
-        print("📥 Extracting blog content...")
-        blog: BlogContent = self.extractor.extract(request.blog_url)
-        print(f"✅ Extracted: {blog.title}")
+        # Concurrent requests for the same article share one conversion
+        key = (normalize_url(request.blog_url), tuple(sorted(request.platforms)))
+        posts = await self.inflight.do(key, lambda: self._process(request))
+        return list(posts)
 
-        print("🤖 Generating social media posts...")
-        posts: List[SocialPost] = self.generator.generate_posts(
-            blog, request.platforms
+    async def _process(self, request: ProcessingRequest) -> List[SocialPost]:
+        """Extract and generate without deduplication"""
+        blog: BlogContent = await self.extractor.extract(request.blog_url)
+        logger.info(
+            "Extracted blog",
+            extra={"url": request.blog_url, "title": blog.title, "chars": len(blog.content)},
         )
-        print(f"✅ Generated {len(posts)} posts")
+
+        blog = await self.condense(blog)
+
+        with span("generate"):
+            posts: List[SocialPost] = await self.generator.generate_posts(
+                blog, request.platforms
+            )
+        logger.info("Generated posts", extra={"posts": len(posts)})
 
         return posts
 
+    async def condense(self, blog: BlogContent) -> BlogContent:
+        """Cap the article at the prompt token budget before generation"""
+        if not self.condenser.needs_condensing(blog):
+            return blog
+        with span("condense", chars=len(blog.content)):
+            condensed = await asyncio.to_thread(self.condenser.condense, blog)
+        logger.info(
+            "Condensed content",
+            extra={"chars": len(blog.content), "condensed_chars": len(condensed.content)},
+        )
+        return condensed
+
+    async def start(self):
+        """
+        Open long-lived resources before the first request arrives
+
+        With WARMUP on, warmup() runs in the background so the server can
+        answer liveness checks meanwhile; the processor is ready after it.
+        """
+        await self.http.start()
+        if settings.WARMUP:
+            self._warmup = asyncio.create_task(self.warmup())
+        else:
+            self.state = "ready"
+
+    async def warmup(self):
+        """
+        Prime the parsers and open provider connections
+
+        Model clients and rarely used libraries are loaded on first use;
+        this pays for them, and for the first TLS handshakes, before any
+        request has to.
+        """
+        started = time.perf_counter()
+        try:
+            with span("warmup"):
+                self.extractor.warmup()
+                MessageParser.extract_blog_url_and_platforms(
+                    Message(role="user", parts=[{"kind": "text", "text": WARMUP_URL}])
+                )
+                await self.generator.router.warmup()
+        except Exception:
+            # A cold start is slower, not broken
+            logger.exception("Warmup failed")
+        if self.state == "starting":
+            self.state = "ready"
+        logger.info(
+            "Warmup finished",
+            extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)},
+        )
+
+    async def aclose(self):
+        """Stop background workers and release resources held by the processor"""
+        self.state = "stopping"
+        if self._warmup is not None and not self._warmup.done():
+            self._warmup.cancel()
+        await self.workers.stop(timeout=settings.GRACEFUL_SHUTDOWN_TIMEOUT)
+        await self.extractor.aclose()
+        await self.http.aclose()
+        await self.generator.aclose()
+        self.tasks.close()
+
+    PLATFORM_EMOJIS = {
+        "twitter": "🐦",
+        "linkedin": "💼",
+        "facebook": "👥",
+        "instagram": "📸",
+    }
+
     def format_response(self, posts: List[SocialPost]) -> str:
         """Format posts into response text"""
-        lines: List[str] = ["# 🎉 Social Media Posts Generated\n"]
+        lines: List[str] = [self.format_header()]
+        lines.extend(self.format_post(post) for post in posts)
+        return "\n".join(lines)
 
-        platform_emojis = {
-            "twitter": "🐦",
-            "linkedin": "💼",
-            "facebook": "👥",
-            "instagram": "📸",
-        }
+    def format_header(self) -> str:
+        """Heading that opens the response text"""
+        return "# 🎉 Social Media Posts Generated\n"
 
-        for post in posts:
-            emoji = platform_emojis.get(post.platform, "📱")
-            lines.append(f"## {emoji} {post.platform.title()}\n")
-            lines.append(f"{post.content}\n")
-            lines.append("---\n")
+    def format_post_header(self, platform: str) -> str:
+        """Section heading for one platform"""
+        emoji = self.PLATFORM_EMOJIS.get(platform, "📱")
+        return f"## {emoji} {platform.title()}\n"
 
-        return "\n".join(lines)
+    def format_post_footer(self) -> str:
+        """Separator closing one platform section"""
+        return "---\n"
+
+    def format_post(self, post: SocialPost) -> str:
+        """Format a single platform section"""
+        return "\n".join(
+            [
+                self.format_post_header(post.platform),
+                f"{post.content}\n",
+                self.format_post_footer(),
+            ]
+        )
 
     async def handle_message_send(self, rpc_request: JSONRPCRequest):
         """
         Process incoming A2A messages
 
+        In blocking mode the conversion runs before responding. Otherwise a
+        `submitted` task is returned right away and the conversion runs in
+        the background worker pool; clients poll it with `tasks/get`.
+
         Args:
             rpc_request: JSON-RPC request
 
@@ -85,81 +253,469 @@ class PostProcessor:
             JSON-RPC response dict
         """
         params = rpc_request.params
+        duplicate = await self._duplicate_task(rpc_request)
+        if duplicate is not None:
+            return duplicate.model_dump(exclude_none=True)
+
         task_id = params.get("id", str(uuid4()))
+        task = Task(
+            id=task_id, contextId=str(uuid4()), status=TaskStatus(state="submitted")
+        )
 
         try:
-            message_data = params.get("message", {})
-            user_message = Message(**message_data)
+            user_message, request = self._parse_request(params, task_id)
+        except Exception as e:
+            self._fail_task(task, e)
+            return JSONRPCResponse(id=rpc_request.id, result=task).model_dump(
+                exclude_none=True
+            )
 
-            print("=" * 60)
-            print(f"📨 New request - Task ID: {task_id}")
+        task.history = [user_message]
+        history_length = self._history_length(params)
 
-            blog_url, platforms = MessageParser.extract_blog_url_and_platforms(
-                user_message
-            )
+        if self._is_blocking(params):
+            await self.run_task(task, request)
+        else:
+            self._set_status(task, "submitted")
+            try:
+                self.workers.submit(
+                    lambda: self.run_task(task, request),
+                    on_drop=lambda: self._fail_task(task, INTERRUPTED_ERROR),
+                )
+            except asyncio.QueueFull:
+                self._fail_task(task, "Server is busy, please try again later")
+
+        result = self._with_history(task, history_length)
+        return JSONRPCResponse(id=rpc_request.id, result=result).model_dump(
+            exclude_none=True
+        )
 
-            print(f"🔗 Blog URL: {blog_url}")
-            print("🎯 Platforms: LinkedIn and Twitter (always generated)")
+    async def handle_message_stream(
+        self, rpc_request: JSONRPCRequest
+    ) -> AsyncIterator[str]:
+        """
+        Process an A2A message, streaming progress as Server-Sent Events
 
-            # Process
-            request = ProcessingRequest(
-                blog_url=blog_url, platforms=platforms, task_id=task_id
+        Emits status updates as the task moves through extraction and
+        generation, then one artifact per platform whose chunks arrive as
+        the model produces them.
+
+        Args:
+            rpc_request: JSON-RPC request
+
+        Yields:
+            SSE `data:` frames, each holding a JSON-RPC response
+        """
+        params = rpc_request.params
+        duplicate = await self._duplicate_task(rpc_request)
+        if duplicate is not None:
+            yield f"data: {duplicate.model_dump_json(exclude_none=True)}\n\n"
+            return
+
+        task_id = params.get("id", str(uuid4()))
+        task = Task(
+            id=task_id, contextId=str(uuid4()), status=TaskStatus(state="submitted")
+        )
+
+        def event(result) -> str:
+            response = JSONRPCResponse(id=rpc_request.id, result=result)
+            return f"data: {response.model_dump_json(exclude_none=True)}\n\n"
+
+        def status_event(final: bool = False) -> str:
+            return event(
+                TaskStatusUpdateEvent(
+                    taskId=task.id,
+                    contextId=task.contextId,
+                    status=task.status,
+                    final=final,
+                )
             )
 
-            posts = self.process(request)
-            response_text = self.format_response(posts)
+        def failed_events(error) -> List[str]:
+            self._fail_task(task, error)
+            artifact = TaskArtifactUpdateEvent(
+                taskId=task.id,
+                contextId=task.contextId,
+                artifact=task.artifacts[0],
+                lastChunk=True,
+            )
+            return [event(artifact), status_event(final=True)]
 
-            print("✅ Processing completed")
-            print("=" * 60)
+        # A client that disconnects closes this generator at a yield; the
+        # stored task must not stay "working"
+        try:
+            try:
+                user_message, request = self._parse_request(params, task_id)
+            except Exception as e:
+                for frame in failed_events(e):
+                    yield frame
+                return
 
-            task = Task(
-                id=task_id,
-                contextId=str(uuid4()),
-                status=TaskStatus(
-                    state="completed", timestamp=datetime.utcnow().isoformat() + "Z"
-                ),
-                artifacts=[
-                    Artifact(
-                        name="social_media_posts",
-                        parts=[TextPart(text=response_text)],
+            task.history = [user_message]
+            self._set_status(task, "submitted")
+            yield status_event()
+
+            try:
+                self._set_status(task, "working", "Extracting blog content...")
+                yield status_event()
+                blog: BlogContent = await self.extractor.extract(request.blog_url)
+                blog = await self.condense(blog)
+
+                self._set_status(task, "working", "Generating social media posts...")
+                yield status_event()
+
+                chunks: Dict[str, List[str]] = {}
+                artifact_ids: Dict[str, str] = {}
+                async for platform, chunk, done in self.generator.stream_posts(
+                    blog, request.platforms
+                ):
+                    # Frames concatenate to exactly format_post() for the platform
+                    if platform not in chunks:
+                        chunks[platform] = []
+                        artifact_ids[platform] = str(uuid4())
+                        text = self.format_post_header(platform) + "\n" + chunk
+                        append = False
+                    else:
+                        text = chunk
+                        append = True
+                    if done:
+                        text += "\n\n" + self.format_post_footer()
+                    chunks[platform].append(chunk)
+
+                    yield event(
+                        TaskArtifactUpdateEvent(
+                            taskId=task.id,
+                            contextId=task.contextId,
+                            artifact=Artifact(
+                                artifactId=artifact_ids[platform],
+                                name=f"{platform}_post",
+                                parts=[TextPart(text=text)],
+                            ),
+                            append=append,
+                            lastChunk=done,
+                        )
                     )
-                ],
-                history=[
-                    user_message,
-                    Message(
-                        role="agent",
-                        parts=[{"kind": "text", "text": response_text}],
-                        messageId=str(uuid4()),
-                    ),
-                ],
+            except Exception as e:
+                for frame in failed_events(e):
+                    yield frame
+                return
+
+            posts = [
+                SocialPost(platform=platform, content="".join(chunks[platform]).strip())
+                for platform in settings.DEFAULT_PLATFORMS
+                if platform in chunks
+            ]
+            self._complete_task(task, self.format_response(posts))
+            yield status_event(final=True)
+        finally:
+            if task.status.state not in FINAL_STATES:
+                self._fail_task(task, INTERRUPTED_ERROR)
+
+    async def handle_batch_send(self, rpc_request: JSONRPCRequest):
+        """
+        Convert many blog URLs in one call
+
+        URLs come from `params.urls` and from every URL in `params.message`.
+        Repeated URLs are converted once. Each URL gets its own task in the
+        task store; a failed URL fails only its own task. Blocking requests
+        wait for every task, otherwise the submitted tasks are returned right
+        away and can be polled with `tasks/get`.
+
+        Args:
+            rpc_request: JSON-RPC request
+
+        Returns:
+            JSON-RPC response dict with a batch of tasks
+        """
+        params = rpc_request.params
+        try:
+            jobs = self._create_batch_jobs(params)
+        except Exception as e:
+            return JSONRPCResponse(
+                id=rpc_request.id, error={"code": -32602, "message": str(e)}
+            ).model_dump(exclude_none=True)
+
+        if self._is_blocking(params):
+            await self.run_batch(jobs)
+        else:
+
+            def dropped():
+                for task, _ in jobs:
+                    self._fail_task(task, INTERRUPTED_ERROR)
+
+            try:
+                self.workers.submit(lambda: self.run_batch(jobs), on_drop=dropped)
+            except asyncio.QueueFull:
+                for task, _ in jobs:
+                    self._fail_task(task, "Server is busy, please try again later")
+
+        history_length = self._history_length(params)
+        result = BatchResult(
+            tasks=[self._with_history(task, history_length) for task, _ in jobs]
+        )
+        return JSONRPCResponse(id=rpc_request.id, result=result).model_dump(
+            exclude_none=True
+        )
+
+    async def handle_batch_stream(
+        self, rpc_request: JSONRPCRequest
+    ) -> AsyncIterator[str]:
+        """
+        Convert many blog URLs, streaming each task as Server-Sent Events
+
+        The first frame lists every submitted task; after that each task is
+        sent again, completed or failed, as soon as its conversion finishes.
+
+        Args:
+            rpc_request: JSON-RPC request
+
+        Yields:
+            SSE `data:` frames, each holding a JSON-RPC response
+        """
+
+        def event(response: JSONRPCResponse) -> str:
+            return f"data: {response.model_dump_json(exclude_none=True)}\n\n"
+
+        try:
+            jobs = self._create_batch_jobs(rpc_request.params)
+        except Exception as e:
+            yield event(
+                JSONRPCResponse(
+                    id=rpc_request.id, error={"code": -32602, "message": str(e)}
+                )
             )
+            return
 
-            return JSONRPCResponse(id=rpc_request.id, result=task).dict(
-                exclude_none=True
+        yield event(
+            JSONRPCResponse(
+                id=rpc_request.id, result=BatchResult(tasks=[task for task, _ in jobs])
             )
+        )
+        async for task in self.iter_batch(jobs):
+            yield event(JSONRPCResponse(id=rpc_request.id, result=task))
+
+    async def run_batch(self, jobs: List[Tuple[Task, ProcessingRequest]]):
+        """Run every conversion of a batch to completion"""
+        async for _ in self.iter_batch(jobs):
+            pass
+
+    async def iter_batch(
+        self, jobs: List[Tuple[Task, ProcessingRequest]]
+    ) -> AsyncIterator[Task]:
+        """Run a batch with bounded parallelism, yielding tasks as they finish"""
+        slots = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
 
+        async def run(task: Task, request: ProcessingRequest) -> Task:
+            async with slots:
+                await self.run_task(task, request)
+            return task
+
+        for finished in asyncio.as_completed([run(*job) for job in jobs]):
+            yield await finished
+
+    async def run_task(self, task: Task, request: ProcessingRequest):
+        """Run a conversion, recording each status transition in the task store"""
+        task_id_var.set(task.id)
+        self._set_status(task, "working")
+
+        try:
+            posts = await self.process(request)
+            with span("format"):
+                response_text = self.format_response(posts)
+        except asyncio.CancelledError:
+            self._fail_task(task, INTERRUPTED_ERROR)
+            raise
         except Exception as e:
-            print("=" * 60)
-            print(f"❌ Error processing request: {e}")
-            print("=" * 60)
+            self._fail_task(task, e)
+            return
+
+        self._complete_task(task, response_text)
+
+    async def _duplicate_task(
+        self, rpc_request: JSONRPCRequest
+    ) -> Optional[JSONRPCResponse]:
+        """Error response if the client chose the id of an existing task"""
+        task_id = rpc_request.params.get("id")
+        if task_id is None:
+            return None
+        # The SQLite store reads from disk
+        if await asyncio.to_thread(self.tasks.get, str(task_id)) is None:
+            return None
+        return JSONRPCResponse(
+            id=rpc_request.id,
+            error={"code": -32602, "message": f"Task {task_id} already exists"},
+        )
+
+    async def handle_tasks_get(self, rpc_request: JSONRPCRequest):
+        """
+        Return the current state of a task
+
+        Args:
+            rpc_request: JSON-RPC request with `id` and optional `historyLength`
+
+        Returns:
+            JSON-RPC response dict
+        """
+        params = rpc_request.params
+        # The SQLite store reads from disk
+        task = await asyncio.to_thread(self.tasks.get, str(params.get("id", "")))
+
+        if task is None:
+            return JSONRPCResponse(
+                id=rpc_request.id,
+                error={"code": -32001, "message": "Task not found"},
+            ).model_dump(exclude_none=True)
+
+        task = self._with_history(task, params.get("historyLength"))
+        return JSONRPCResponse(id=rpc_request.id, result=task).model_dump(
+            exclude_none=True
+        )
+
+    def _parse_request(self, params: dict, task_id: str):
+        """
+        Build the user message and processing request from JSON-RPC params
+
+        Raises:
+            ValueError: If the message has no usable blog URL
+        """
+        task_id_var.set(task_id)
+        with span("parse_message"):
+            message_data = params.get("message", {})
+            user_message = Message(**message_data)
+            blog_url, platforms = MessageParser.extract_blog_url_and_platforms(
+                user_message
+            )
+
+        logger.info("New request", extra={"url": blog_url})
+
+        request = ProcessingRequest(
+            blog_url=blog_url, platforms=platforms, task_id=task_id
+        )
+        return user_message, request
+
+    def _create_batch_jobs(
+        self, params: dict
+    ) -> List[Tuple[Task, ProcessingRequest]]:
+        """
+        Build one submitted task per distinct URL of a batch request
 
-            # Create failed task response
-            error_text = f"Failed to process blog post: {str(e)}"
+        Raises:
+            ValueError: If the batch has no URLs or too many of them
+        """
+        urls = [str(url) for url in params.get("urls") or []]
+        user_message = None
+        if params.get("message"):
+            user_message = Message(**params["message"])
+            try:
+                urls.extend(MessageParser.extract_blog_urls(user_message))
+            except ValueError:
+                if not urls:
+                    raise
+
+        unique: Dict[str, str] = {}
+        for url in urls:
+            unique.setdefault(normalize_url(url), url)
+
+        if not unique:
+            raise ValueError("No valid blog URLs found in the request")
+        if len(unique) > settings.BATCH_MAX_URLS:
+            raise ValueError(
+                f"Too many URLs in one batch: {len(unique)} (max {settings.BATCH_MAX_URLS})"
+            )
+
+        logger.info(
+            "New batch",
+            extra={"urls": len(unique), "duplicates": len(urls) - len(unique)},
+        )
 
+        context_id = str(uuid4())
+        jobs = []
+        for url in unique.values():
+            task_id = str(uuid4())
             task = Task(
                 id=task_id,
-                contextId=str(uuid4()),
-                status=TaskStatus(
-                    state="failed", timestamp=datetime.utcnow().isoformat() + "Z"
-                ),
-                artifacts=[
-                    Artifact(
-                        name="error_response", parts=[TextPart(text=error_text)]
-                    )
-                ],
-                history=[],
+                contextId=context_id,
+                status=TaskStatus(state="submitted"),
+                history=[user_message] if user_message else [],
+                metadata={"blogUrl": url},
             )
+            request = ProcessingRequest(
+                blog_url=url,
+                platforms=list(settings.DEFAULT_PLATFORMS),
+                task_id=task_id,
+            )
+            self._set_status(task, "submitted")
+            jobs.append((task, request))
+        return jobs
 
-            return JSONRPCResponse(id=rpc_request.id, result=task).dict(
-                exclude_none=True
+    def _is_blocking(self, params: dict) -> bool:
+        """Per-request `configuration.blocking` wins over the configured mode"""
+        blocking = (params.get("configuration") or {}).get("blocking")
+        if blocking is None:
+            return settings.TASK_MODE != "async"
+        return bool(blocking)
+
+    def _history_length(self, params: dict) -> Optional[int]:
+        """Per-request `configuration.historyLength`; compact mode defaults to none"""
+        history_length = (params.get("configuration") or {}).get("historyLength")
+        if history_length is None and settings.RESPONSE_MODE == "compact":
+            return 0
+        return history_length
+
+    @staticmethod
+    def _with_history(task: Task, history_length: Optional[int]) -> Task:
+        """A copy of the task keeping only the last `history_length` messages"""
+        if history_length is None:
+            return task
+        history = task.history[-history_length:] if history_length else []
+        return task.model_copy(update={"history": history})
+
+    def _set_status(self, task: Task, state: str, text: Optional[str] = None):
+        """Move a task to a new state, with an optional progress note, and persist it"""
+        task.status = TaskStatus(
+            state=state,
+            timestamp=datetime.utcnow().isoformat() + "Z",
+            message=(
+                Message(role="agent", parts=[{"kind": "text", "text": text}])
+                if text
+                else None
+            ),
+        )
+        task.metadata.setdefault("statusHistory", []).append(task.status.model_dump())
+        self.tasks.save(task)
+
+    def _complete_task(self, task: Task, response_text: str):
+        """Attach the generated posts to a task and mark it completed"""
+        logger.info("Task completed", extra={"task_id": task.id})
+
+        task.artifacts = [
+            Artifact(
+                name="social_media_posts",
+                parts=[TextPart(text=response_text)],
+            )
+        ]
+        # Compact mode keeps the posts only in the artifact instead of
+        # repeating them as an agent message
+        if settings.RESPONSE_MODE != "compact":
+            task.history.append(
+                Message(
+                    role="agent",
+                    parts=[{"kind": "text", "text": response_text}],
+                    messageId=str(uuid4()),
+                )
             )
+        self._set_status(task, "completed")
+
+    def _fail_task(self, task: Task, error):
+        """Mark a task failed with an error artifact"""
+        logger.warning("Task failed", extra={"task_id": task.id, "error": str(error)})
+        if isinstance(error, BaseException):
+            metrics.errors.inc("task", type(error).__name__)
+        else:
+            metrics.errors.inc("task", "Rejected")
+
+        error_text = f"Failed to process blog post: {str(error)}"
+        task.artifacts = [
+            Artifact(name="error_response", parts=[TextPart(text=error_text)])
+        ]
+        self._set_status(task, "failed")
@@ -0,0 +1,923 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from contextlib import AsyncExitStack
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import httpx
+
+from app import metrics
+from app.config import settings
+from app.context_cache import ContextCache
+from app.scheduler import LLMScheduler, SchedulerFull
+
+if TYPE_CHECKING:
+    from google.genai import Client, types
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class Provider:
+    """Interface for a text generation backend"""
+
+    name: str = ""
+    model: str = ""
+    # Set by providers that cache shared prompt prefixes on their side
+    context_cache: Optional[ContextCache] = None
+
+    async def generate(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict[str, Any]] = None,
+        prefix: str = "",
+    ) -> str:
+        """
+        Generate a complete response.
+
+        Args:
+            prompt: Prompt text
+            max_output_tokens: Output token limit
+            temperature: Sampling temperature
+            json_schema: Ask for JSON matching this (Gemini-style) schema
+            prefix: Start of the prompt shared with related calls (the
+                article); referenced from the context cache where the
+                provider has one, otherwise sent in front of `prompt`
+
+        Raises:
+            Exception: If the provider returns no usable text
+        """
+        raise NotImplementedError
+
+    async def open_stream(
+        self, prompt: str, max_output_tokens: int, temperature: float, prefix: str = ""
+    ) -> AsyncIterator[str]:
+        """Start a streamed response; errors opening it are raised here"""
+        raise NotImplementedError
+
+    async def warmup(self):
+        """
+        Create the client and open a connection ahead of the first call
+
+        Clients are otherwise built on first use. Errors are raised for the
+        caller to log; a failed warmup does not stop the provider working.
+        """
+
+    async def aclose(self):
+        """Release any resources held by the provider"""
+
+    def record_usage(
+        self,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        cached_tokens: Optional[int] = None,
+    ):
+        """Count the token usage a response reported (cached is part of prompt)"""
+        for kind, tokens in (
+            ("prompt", prompt_tokens),
+            ("completion", completion_tokens),
+            ("cached", cached_tokens),
+        ):
+            if tokens:
+                metrics.llm_tokens.inc(self.name, self.model, kind, amount=tokens)
+
+
+# Gemini answers a reference to an unknown or expired cache with one of these
+CACHE_MISSING_CODES = (403, 404)
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str = "",
+        context_cache_ttl: float = 0,
+        context_cache_min_tokens: int = 1024,
+    ):
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self._client: Optional["Client"] = None
+        self._client_lock = asyncio.Lock()
+        self.context_cache = ContextCache(
+            self._create_cache,
+            self._delete_cache,
+            ttl=context_cache_ttl,
+            min_tokens=context_cache_min_tokens,
+            model=self.model,
+        )
+
+    async def _get_client(self) -> "Client":
+        # google.genai takes about a second to import, so it is loaded on the
+        # first call (or warmup), in a thread to keep the event loop serving
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await asyncio.to_thread(self._build_client)
+        return self._client
+
+    def _build_client(self) -> "Client":
+        from google.genai import Client, types
+
+        http_options = None
+        if self.base_url:
+            http_options = types.HttpOptions(base_url=self.base_url)
+        return Client(api_key=self.api_key, http_options=http_options)
+
+    def _config(
+        self,
+        max_output_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict[str, Any]] = None,
+        cached_content: Optional[str] = None,
+    ) -> "types.GenerateContentConfig":
+        from google.genai import types
+
+        extra: Dict[str, Any] = {}
+        if json_schema is not None:
+            extra = {"response_mime_type": "application/json", "response_schema": json_schema}
+        if cached_content is not None:
+            extra["cached_content"] = cached_content
+        return types.GenerateContentConfig(
+            temperature=temperature, max_output_tokens=max_output_tokens, **extra
+        )
+
+    async def _create_cache(self, prefix: str, ttl: float) -> str:
+        from google.genai import types
+
+        client = await self._get_client()
+        cache = await client.aio.caches.create(
+            model=self.model,
+            config=types.CreateCachedContentConfig(
+                contents=[prefix], ttl=f"{int(ttl)}s", display_name="postcraft-article"
+            ),
+        )
+        return cache.name
+
+    async def _delete_cache(self, name: str):
+        client = await self._get_client()
+        await client.aio.caches.delete(name=name)
+
+    async def _with_context_cache(
+        self,
+        prompt: str,
+        prefix: str,
+        call: Callable[[str, Optional[str]], Awaitable[T]],
+    ) -> T:
+        """Run `call(contents, cache_name)`, referencing the prefix's cache if any"""
+        cache_name = await self.context_cache.get(prefix) if prefix else None
+        if cache_name is None:
+            return await call(prefix + prompt, None)
+        try:
+            return await call(prompt, cache_name)
+        except Exception as e:
+            if getattr(e, "code", None) not in CACHE_MISSING_CODES:
+                raise
+            # Deleted or expired early: forget it and send the prompt in full
+            self.context_cache.forget(cache_name)
+            return await call(prefix + prompt, None)
+
+    async def generate(
+        self, prompt, max_output_tokens, temperature, json_schema=None, prefix=""
+    ):
+        client = await self._get_client()
+        response = await self._with_context_cache(
+            prompt,
+            prefix,
+            lambda contents, cache_name: client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=self._config(
+                    max_output_tokens, temperature, json_schema, cache_name
+                ),
+            ),
+        )
+        if response is None or not response.text:
+            raise Exception("No response from Gemini API")
+        self._record_usage(response)
+        return response.text.strip()
+
+    async def open_stream(self, prompt, max_output_tokens, temperature, prefix=""):
+        client = await self._get_client()
+        cache_name = await self.context_cache.get(prefix) if prefix else None
+        stream = await client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt if cache_name else prefix + prompt,
+            config=self._config(
+                max_output_tokens, temperature, cached_content=cache_name
+            ),
+        )
+
+        async def chunks() -> AsyncIterator[str]:
+            last = None
+            try:
+                async for chunk in stream:
+                    last = chunk
+                    if chunk.text:
+                        yield chunk.text
+            except Exception as e:
+                # The request is only sent on the first read, so a cache
+                # that vanished shows up here; the next call recreates it
+                if cache_name and getattr(e, "code", None) in CACHE_MISSING_CODES:
+                    self.context_cache.forget(cache_name)
+                raise
+            finally:
+                # Usage is cumulative; the last chunk carries the totals
+                if last is not None:
+                    self._record_usage(last)
+
+        return chunks()
+
+    def _record_usage(self, response: "types.GenerateContentResponse"):
+        usage = response.usage_metadata
+        if usage is not None:
+            self.record_usage(
+                usage.prompt_token_count,
+                usage.candidates_token_count,
+                usage.cached_content_token_count,
+            )
+
+    async def warmup(self):
+        # Looking up the model is free and leaves a pooled connection behind
+        client = await self._get_client()
+        await client.aio.models.get(model=self.model)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self.context_cache.aclose()
+            await self._client.aio.aclose()
+
+
+class GroqProvider(Provider):
+    """Groq through its OpenAI-compatible chat completions API"""
+
+    name = "groq"
+
+    def __init__(self, api_key: str, model: str, base_url: str, timeout: float = 60):
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Built on first use: creating its TLS context is not free
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=self.timeout,
+            )
+        return self._client
+
+    def _payload(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_output_tokens,
+            "stream": stream,
+        }
+        if json_schema is not None:
+            # The prompt already describes the keys; JSON mode keeps it parseable
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    async def generate(
+        self, prompt, max_output_tokens, temperature, json_schema=None, prefix=""
+    ):
+        response = await self.client.post(
+            "/chat/completions",
+            json=self._payload(
+                prefix + prompt, max_output_tokens, temperature, json_schema
+            ),
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._record_usage(data)
+        choices = data.get("choices") or []
+        text = choices[0]["message"].get("content") if choices else None
+        if not text:
+            raise Exception("No response from Groq API")
+        return text.strip()
+
+    async def open_stream(self, prompt, max_output_tokens, temperature, prefix=""):
+        request = self.client.build_request(
+            "POST",
+            "/chat/completions",
+            json=self._payload(
+                prefix + prompt, max_output_tokens, temperature, stream=True
+            ),
+        )
+        response = await self.client.send(request, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+
+        async def chunks() -> AsyncIterator[str]:
+            try:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    self._record_usage(event)
+                    choices = event.get("choices") or []
+                    text = choices[0].get("delta", {}).get("content") if choices else None
+                    if text:
+                        yield text
+            finally:
+                await response.aclose()
+
+        return chunks()
+
+    def _record_usage(self, data: Dict[str, Any]):
+        # Groq reports stream usage under x_groq on the final chunk
+        usage = data.get("usage") or (data.get("x_groq") or {}).get("usage")
+        if usage:
+            # Prompts start with the article, so automatic prefix caching
+            # can hit too; it is reported OpenAI-style
+            details = usage.get("prompt_tokens_details") or {}
+            self.record_usage(
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens"),
+                details.get("cached_tokens"),
+            )
+
+    async def warmup(self):
+        response = await self.client.get("/models")
+        response.raise_for_status()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+
+class FakeProvider(Provider):
+    """Local provider with configurable latency and failures for tests and benchmarks"""
+
+    TITLE = re.compile(r"Blog Title: (.*)")
+    URL = re.compile(r"Blog URL: (\S+)")
+
+    def __init__(
+        self,
+        name: str = "fake",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        context_cache_ttl: float = 0,
+        context_cache_min_tokens: int = 1024,
+    ):
+        self.name = name
+        self.model = f"{name}-model"
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        # Simulated provider-side caches: name -> prefix
+        self.caches: Dict[str, str] = {}
+        self.context_cache = ContextCache(
+            self._create_cache,
+            self._delete_cache,
+            ttl=context_cache_ttl,
+            min_tokens=context_cache_min_tokens,
+            model=self.model,
+        )
+
+    async def _wait(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.failure_rate:
+            raise Exception(f"{self.name}: simulated failure")
+
+    def _post(self, prompt: str, platform: str = "") -> str:
+        match = self.TITLE.search(prompt)
+        title = match.group(1).strip() if match else "this article"
+        if platform == "linkedin" or (not platform and "LinkedIn post" in prompt):
+            return self._linkedin_post(prompt, title)
+        return (
+            f"1/3 {platform} post about {title}\n\n"
+            f"2/3 The key points of {title}.\n\n"
+            f"3/3 Read more. #{self.name}"
+        ).replace("  ", " ")
+
+    def _linkedin_post(self, prompt: str, title: str) -> str:
+        """A post that passes the LinkedIn checks: 300+ words, URL, 3 hashtags"""
+        match = self.URL.search(prompt)
+        url = match.group(1) if match else ""
+        sentence = f"One of the key points of {title} deserves a closer look."
+        words_per_sentence = len(sentence.split())
+        paragraph = " ".join([sentence] * (110 // words_per_sentence + 1))
+        return (
+            f"What can we learn from {title}?\n\n"
+            + "\n\n".join([paragraph] * 3)
+            + f"\n\nRead more: {url}\n\nWhat do you think?\n\n"
+            f"#{self.name} #blogging #writing"
+        )
+
+    async def _create_cache(self, prefix: str, ttl: float) -> str:
+        name = f"cachedContents/{self.name}-{len(self.caches) + 1}"
+        self.caches[name] = prefix
+        return name
+
+    async def _delete_cache(self, name: str):
+        self.caches.pop(name, None)
+
+    async def _prompt(self, prompt: str, prefix: str) -> Tuple[str, Optional[int]]:
+        """The full prompt and how many of its tokens a cache would serve"""
+        cache_name = await self.context_cache.get(prefix) if prefix else None
+        return prefix + prompt, len(prefix) // 4 if cache_name else None
+
+    def _record(self, prompt: str, text: str, cached_tokens: Optional[int]):
+        # Roughly 4 characters per token, as the scheduler estimates
+        self.record_usage(len(prompt) // 4, len(text) // 4, cached_tokens)
+
+    async def generate(
+        self, prompt, max_output_tokens, temperature, json_schema=None, prefix=""
+    ):
+        await self._wait()
+        prompt, cached_tokens = await self._prompt(prompt, prefix)
+        if json_schema is not None:
+            text = json.dumps(
+                {key: self._post(prompt, key) for key in json_schema.get("properties", {})}
+            )
+        else:
+            text = self._post(prompt)
+        self._record(prompt, text, cached_tokens)
+        return text
+
+    async def open_stream(self, prompt, max_output_tokens, temperature, prefix=""):
+        await self._wait()
+        prompt, cached_tokens = await self._prompt(prompt, prefix)
+        text = self._post(prompt)
+        self._record(prompt, text, cached_tokens)
+        words = text.split(" ")
+
+        async def chunks() -> AsyncIterator[str]:
+            for index in range(0, len(words), 4):
+                await asyncio.sleep(0)
+                yield " ".join(words[index : index + 4]) + " "
+
+        return chunks()
+
+    async def aclose(self):
+        await self.context_cache.aclose()
+
+
+class ProviderStats:
+    """Rolling latency and error rate of recent calls to one provider"""
+
+    def __init__(self, window: int = 100):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.last_failure = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool):
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.failures += 1
+            self.last_failure = time.monotonic()
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "error_rate": self.error_rate,
+            "p50_seconds": self.percentile(0.5),
+            "p95_seconds": self.percentile(0.95),
+        }
+
+
+class ProviderRouter:
+    """Route model calls to the fastest healthy provider.
+
+    Providers are ranked by rolling p50 latency; ones whose recent error
+    rate exceeds `max_error_rate` drop to the back until `cooldown`
+    seconds after their last failure. A failed call falls over to the next
+    provider. With hedging, a call still running past the provider's p95
+    (counted from when it got a scheduler slot) gets a duplicate on the
+    next provider if a slot is free; the first success wins and the other
+    call is cancelled. Every call runs under the LLM scheduler.
+
+    Latency is kept per provider and call kind (the `platform` label:
+    a platform, "combined" or "<platform>_repair"), since a long LinkedIn
+    post and a short repair call take very different times. Error rates
+    are kept per provider.
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        scheduler: LLMScheduler,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        window: int = 100,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30,
+    ):
+        self.providers = providers
+        self.scheduler = scheduler
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.window = window
+        self.stats_by_provider = {p.name: ProviderStats(window) for p in providers}
+        self.stats_by_call: Dict[Tuple[str, str], ProviderStats] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def signature(self) -> str:
+        """Identifies the configured models, for cache keys"""
+        return ",".join(f"{p.name}:{p.model}" for p in self.providers)
+
+    def _healthy(self, provider: Provider) -> bool:
+        stats = self.stats_by_provider[provider.name]
+        if stats.error_rate <= self.max_error_rate:
+            return True
+        return time.monotonic() - stats.last_failure > self.cooldown
+
+    def _call_stats(self, provider: Provider, platform: str) -> ProviderStats:
+        key = (provider.name, platform)
+        stats = self.stats_by_call.get(key)
+        if stats is None:
+            stats = self.stats_by_call[key] = ProviderStats(self.window)
+        return stats
+
+    def ranked(self, platform: str = "") -> List[Provider]:
+        """Providers in the order calls of this kind should be tried"""
+
+        def key(indexed: Tuple[int, Provider]):
+            index, provider = indexed
+            p50 = self._call_stats(provider, platform).percentile(0.5)
+            # Untried providers keep their configured order at the front
+            return (not self._healthy(provider), p50 or 0.0, index)
+
+        return [p for _, p in sorted(enumerate(self.providers), key=key)]
+
+    async def generate(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict[str, Any]] = None,
+        tokens: int = 0,
+        platform: str = "",
+        prefix: str = "",
+    ) -> str:
+        """
+        Generate with failover (and hedging, if enabled) across providers
+
+        `platform` only labels the call's metrics; `prefix` is the shared
+        start of the prompt (see Provider.generate).
+        """
+
+        def call(provider: Provider, running: asyncio.Event) -> Awaitable[str]:
+            # Timed inside the scheduler slot so queueing does not count
+            # against the provider; each retry attempt is recorded
+            async def attempt() -> str:
+                running.set()
+                return await self._timed(
+                    provider,
+                    platform,
+                    lambda: provider.generate(
+                        prompt, max_output_tokens, temperature, json_schema, prefix
+                    ),
+                )
+
+            return self.scheduler.run(attempt, tokens=tokens)
+
+        remaining = self.ranked(platform)
+        if not remaining:
+            raise Exception("No AI client available for content generation")
+
+        last_error: Optional[Exception] = None
+        while remaining:
+            primary = remaining.pop(0)
+            backup = remaining[0] if self.hedge and remaining else None
+            try:
+                return await self._hedged(primary, backup, call, platform)
+            except SchedulerFull:
+                raise
+            except Exception as e:
+                last_error = e
+                if remaining:
+                    logger.warning(
+                        "Provider failed, failing over",
+                        extra={
+                            "provider": primary.name,
+                            "next_provider": remaining[0].name,
+                            "error": str(e),
+                        },
+                    )
+        raise last_error
+
+    async def stream(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        tokens: int = 0,
+        platform: str = "",
+        prefix: str = "",
+    ) -> AsyncIterator[str]:
+        """
+        Stream from the best provider, failing over until one starts streaming
+
+        Streams are not hedged: once chunks reach the client the call
+        cannot be swapped for another provider's.
+        """
+        remaining = self.ranked(platform)
+        if not remaining:
+            raise Exception("No AI client available for content generation")
+
+        last_error: Optional[Exception] = None
+        for index, provider in enumerate(remaining):
+
+            async def open_in_slot() -> Tuple[AsyncExitStack, float, AsyncIterator[str]]:
+                # The slot is kept for the whole stream once it opens, but
+                # released before each retry's backoff
+                slot = AsyncExitStack()
+                await slot.enter_async_context(self.scheduler.slot(tokens))
+                started = time.monotonic()
+                try:
+                    chunks = await provider.open_stream(
+                        prompt, max_output_tokens, temperature, prefix
+                    )
+                except BaseException as e:
+                    if isinstance(e, Exception):
+                        self._record(provider, platform, started, e)
+                    await slot.aclose()
+                    raise
+                return slot, started, chunks
+
+            try:
+                # Only opening the stream is retried; a broken stream
+                # mid-way has already delivered chunks to the client
+                slot, started, chunks = await self.scheduler.retry(open_in_slot)
+            except SchedulerFull:
+                raise
+            except Exception as e:
+                last_error = e
+                if index + 1 < len(remaining):
+                    logger.warning(
+                        "Provider failed, failing over",
+                        extra={
+                            "provider": provider.name,
+                            "next_provider": remaining[index + 1].name,
+                            "error": str(e),
+                        },
+                    )
+                continue
+
+            async with slot:
+                try:
+                    async for chunk in chunks:
+                        yield chunk
+                except Exception as e:
+                    self._record(provider, platform, started, e)
+                    raise
+                self._record(provider, platform, started)
+                return
+        raise last_error
+
+    async def _timed(
+        self, provider: Provider, platform: str, fn: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Run one provider call, recording its latency and outcome"""
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except Exception as e:
+            self._record(provider, platform, started, e)
+            raise
+        self._record(provider, platform, started)
+        return result
+
+    def _record(
+        self,
+        provider: Provider,
+        platform: str,
+        started: float,
+        error: Optional[Exception] = None,
+    ):
+        """Feed a finished call into the routing stats and the metrics"""
+        elapsed = time.monotonic() - started
+        self.stats_by_provider[provider.name].record(elapsed, ok=error is None)
+        self._call_stats(provider, platform).record(elapsed, ok=error is None)
+        metrics.llm_calls.inc(provider.name, platform, "error" if error else "ok")
+        if error is None:
+            metrics.llm_duration.observe(elapsed, provider.name, platform)
+        else:
+            metrics.errors.inc("llm", type(error).__name__)
+
+    async def _hedged(
+        self,
+        primary: Provider,
+        backup: Optional[Provider],
+        call: Callable[[Provider, asyncio.Event], Awaitable[T]],
+        platform: str = "",
+    ) -> T:
+        """
+        Call `primary`, adding a duplicate on `backup` once it passes its p95
+        for this kind of call
+
+        `call` sets the event once the call holds a scheduler slot. The p95
+        is measured inside the slot, so the hedge delay only starts then,
+        and no duplicate is sent while the scheduler has no spare slot:
+        it would only add load to a saturated queue.
+        """
+        delay = None
+        stats = self._call_stats(primary, platform)
+        if backup is not None and len(stats.latencies) >= self.hedge_min_samples:
+            delay = stats.percentile(0.95)
+
+        running = asyncio.Event()
+        first = asyncio.ensure_future(call(primary, running))
+        pending = {first}
+        try:
+            if delay is None:
+                return await first
+
+            started = asyncio.ensure_future(running.wait())
+            try:
+                await asyncio.wait({first, started}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                started.cancel()
+            if not first.done():
+                await asyncio.wait(pending, timeout=delay)
+            if first.done() or self.scheduler.saturated:
+                return await first
+
+            self.hedged += 1
+            second = asyncio.ensure_future(call(backup, asyncio.Event()))
+            pending.add(second)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing (or abandoned) call is cancelled
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        providers = {}
+        for provider in self.providers:
+            stats = self.stats_by_provider[provider.name].as_dict()
+            stats["latency_by_call"] = {
+                platform: {
+                    "samples": len(call_stats.latencies),
+                    "p50_seconds": call_stats.percentile(0.5),
+                    "p95_seconds": call_stats.percentile(0.95),
+                }
+                for (name, platform), call_stats in sorted(self.stats_by_call.items())
+                if name == provider.name and call_stats.latencies
+            }
+            if provider.context_cache is not None:
+                stats["context_cache"] = provider.context_cache.stats()
+            providers[provider.name] = stats
+        return {
+            "order": [p.name for p in self.ranked()],
+            "hedging": self.hedge,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "providers": providers,
+        }
+
+    async def warmup(self):
+        """Warm every provider at once; failures are logged and ignored"""
+
+        async def warm(provider: Provider):
+            started = time.perf_counter()
+            try:
+                await provider.warmup()
+            except Exception as e:
+                logger.warning(
+                    "Provider warmup failed",
+                    extra={"provider": provider.name, "error": str(e)},
+                )
+            else:
+                logger.info(
+                    "Provider warmed up",
+                    extra={
+                        "provider": provider.name,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                    },
+                )
+
+        await asyncio.gather(*(warm(provider) for provider in self.providers))
+
+    async def aclose(self):
+        for provider in self.providers:
+            await provider.aclose()
+
+
+def create_providers(names: List[str]) -> List[Provider]:
+    """
+    Build the configured providers, skipping ones without credentials.
+
+    Args:
+        names: Provider names in preference order ("gemini", "groq", "fake")
+
+    Returns:
+        Providers ready for routing
+    """
+    providers: List[Provider] = []
+    for name in names:
+        if name == "gemini":
+            if not settings.GEMINI_API_KEY:
+                continue
+            try:
+                providers.append(
+                    GeminiProvider(
+                        settings.GEMINI_API_KEY,
+                        settings.GEMINI_MODEL,
+                        settings.GEMINI_BASE_URL,
+                        context_cache_ttl=settings.CONTEXT_CACHE_TTL,
+                        context_cache_min_tokens=settings.CONTEXT_CACHE_MIN_TOKENS,
+                    )
+                )
+            except Exception as e:
+                logger.error("Failed to initialize Gemini", extra={"error": str(e)})
+        elif name == "groq":
+            if settings.GROQ_API_KEY:
+                providers.append(
+                    GroqProvider(
+                        settings.GROQ_API_KEY,
+                        settings.GROQ_MODEL,
+                        settings.GROQ_BASE_URL,
+                        timeout=settings.PLATFORM_TIMEOUT,
+                    )
+                )
+        elif name == "fake":
+            providers.append(
+                FakeProvider(
+                    latency=settings.FAKE_LLM_LATENCY,
+                    context_cache_ttl=settings.CONTEXT_CACHE_TTL,
+                    context_cache_min_tokens=settings.CONTEXT_CACHE_MIN_TOKENS,
+                )
+            )
+        else:
+            raise ValueError(f"Unknown LLM provider: {name}")
+    return providers
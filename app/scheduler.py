@@ -0,0 +1,192 @@
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, TypeVar
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+T = TypeVar("T")
+
+
+class SchedulerFull(Exception):
+    """Raised when the LLM queue is at capacity and new work is rejected"""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute.
+
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        if not self.capacity:
+            return
+        amount = min(amount, self.capacity)
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits and server errors are worth retrying, client errors are not"""
+    status = None
+    # google.genai is imported on first use; if it is not loaded yet the
+    # error cannot be one of its exceptions
+    genai_errors = sys.modules.get("google.genai.errors")
+    if genai_errors is not None and isinstance(error, genai_errors.APIError):
+        status = error.code
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    elif isinstance(error, httpx.TransportError):
+        return True
+    return status is not None and (status == 429 or status >= 500)
+
+
+class LLMScheduler:
+    """Admission control, concurrency limit, rate limiting and retries for model calls.
+
+    Calls wait for one of `max_concurrency` slots. At most `max_queue`
+    callers may wait at once; beyond that new work is rejected with
+    SchedulerFull instead of piling up. Once a slot is free, request and
+    token buckets sized to the provider's RPM/TPM quotas pace the call.
+    429/5xx failures are retried with jittered exponential backoff, outside
+    the slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_retries: int = 3,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+
+        self.queued = 0
+        self.in_flight = 0
+        self.rejected = 0
+        self.retries = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def check_admission(self):
+        """
+        Reject new work early when the queue is already full
+
+        Raises:
+            SchedulerFull: If no more callers may queue
+        """
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerFull("Too many pending generation requests")
+
+    @property
+    def saturated(self) -> bool:
+        """Whether new work would have to wait: callers queued or no free slot"""
+        return self.queued > 0 or self.in_flight >= self.max_concurrency
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold a concurrency slot, paced by the rate limits, for one model call"""
+        self.check_admission()
+
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        try:
+            await self._requests.acquire(1)
+            await self._tokens.acquire(tokens)
+
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+        finally:
+            self._slots.release()
+
+    async def retry(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Call `fn`, retrying rate-limit and server errors with backoff"""
+        retrying = AsyncRetrying(
+            retry=retry_if_exception(is_retryable),
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=wait_random_exponential(multiplier=0.5, max=20),
+            before_sleep=self._count_retry,
+            reraise=True,
+        )
+        # Awaited here rather than handed to tenacity: it only awaits
+        # callables it recognises as coroutine functions, not lambdas
+        async for attempt in retrying:
+            with attempt:
+                return await fn()
+
+    def _count_retry(self, retry_state):
+        self.retries += 1
+
+    async def run(self, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run one model call under the scheduler's limits
+
+        Each attempt takes its own slot, so the backoff between retries
+        does not hold one.
+        """
+
+        async def attempt() -> T:
+            async with self.slot(tokens):
+                return await fn()
+
+        return await self.retry(attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "wait_seconds_avg": (
+                self.wait_seconds_total / self.completed if self.completed else 0.0
+            ),
+            "wait_seconds_max": self.wait_seconds_max,
+        }
@@ -0,0 +1,65 @@
+import logging
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a connection shared between threads, in WAL mode"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL stays consistent without an fsync per commit; a crash can only
+    # lose the last few writes
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteWriter:
+    """Connections for an SQLite-backed store that keeps writes off the event loop.
+
+    Reads use `conn` under `lock`. Writes are queued with submit() and run
+    in order on a single writer thread with its own connection, each in
+    one transaction. A failed write is rolled back and logged; the store's
+    write function decides what happens to the data it was writing.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.conn = connect(path)
+        self._write_conn = connect(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def submit(self, write: Callable[[sqlite3.Connection], None]) -> Future:
+        """Queue `write(connection)` on the writer thread"""
+        future = self._executor.submit(self._run, write)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _run(self, write: Callable[[sqlite3.Connection], None]) -> None:
+        try:
+            write(self._write_conn)
+            self._write_conn.commit()
+        except BaseException:
+            self._write_conn.rollback()
+            raise
+
+    def _log_failure(self, future: Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(
+                "SQLite write failed",
+                extra={"store": self.name, "error": str(error) or type(error).__name__},
+            )
+
+    def close(self) -> None:
+        """Finish queued writes, then close both connections"""
+        self._executor.shutdown(wait=True)
+        self._write_conn.close()
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.models import Task
+from app.sqlite_writer import SQLiteWriter
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+QueuedJob = Tuple[Job, Optional[Callable[[], None]], contextvars.Context]
+
+
+class TaskStore:
+    """Interface for persisting A2A tasks between status transitions"""
+
+    def get(self, task_id: str) -> Optional[Task]:
+        raise NotImplementedError
+
+    def save(self, task: Task) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+
+
+class MemoryTaskStore(TaskStore):
+    """In-process task store that evicts the least recently updated tasks"""
+
+    def __init__(self, max_tasks: int = 1000):
+        self.max_tasks = max_tasks
+        self._tasks: "OrderedDict[str, Task]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def save(self, task: Task) -> None:
+        with self._lock:
+            self._tasks[task.id] = task
+            self._tasks.move_to_end(task.id)
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+class SQLiteTaskStore(TaskStore):
+    """On-disk task store shared across restarts and workers.
+
+    Writes happen off the event loop on a single writer thread with its
+    own connection, in the order they were saved. Saves that pile up while
+    it is busy go into one transaction, keeping only the latest state of
+    each task. Until a save is written get() returns it from memory, so
+    this process always reads its own writes. A failed write is retried
+    up to WRITE_ATTEMPTS times, then its saves are dropped and logged.
+
+    get() reads the database and should be called off the event loop.
+    len() is the row count as of this process's last write.
+    """
+
+    WRITE_ATTEMPTS = 3
+
+    def __init__(self, path: str, max_tasks: int = 100_000):
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._db = SQLiteWriter(path, name="task-store")
+        with self._db.lock:
+            self._db.conn.execute(
+                """CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL DEFAULT (julianday('now'))
+                )"""
+            )
+            self._db.conn.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_updated ON tasks (updated_at)"
+            )
+            self._db.conn.commit()
+            self._count = self._db.conn.execute(
+                "SELECT COUNT(*) FROM tasks"
+            ).fetchone()[0]
+
+    def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            data = self._pending.get(task_id)
+        if data is None:
+            with self._db.lock:
+                row = self._db.conn.execute(
+                    "SELECT data FROM tasks WHERE id = ?", (task_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            data = row[0]
+        return Task.model_validate_json(data)
+
+    def save(self, task: Task) -> None:
+        # Serialized now: the caller keeps changing the task
+        data = task.model_dump_json(exclude_none=True)
+        with self._lock:
+            self._pending[task.id] = data
+        self._queue_write()
+
+    def _queue_write(self, attempt: int = 1) -> None:
+        batch: Dict[str, str] = {}
+
+        def write(conn: sqlite3.Connection) -> None:
+            """Write every pending save in one transaction (writer thread)"""
+            with self._lock:
+                batch.update(self._pending)
+            if not batch:
+                return
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, data, updated_at) "
+                "VALUES (?, ?, julianday('now'))",
+                list(batch.items()),
+            )
+            conn.execute(
+                """DELETE FROM tasks WHERE id IN (
+                    SELECT id FROM tasks ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_tasks,),
+            )
+            self._count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+        def written(future: Future) -> None:
+            # Runs on the writer thread once the transaction is done
+            if future.cancelled():
+                return
+            if future.exception() is not None and attempt < self.WRITE_ATTEMPTS:
+                try:
+                    self._queue_write(attempt + 1)
+                    return
+                except RuntimeError:
+                    # The store is closing
+                    pass
+            with self._lock:
+                for task_id, data in batch.items():
+                    # Keep saves that arrived while this batch was being written
+                    if self._pending.get(task_id) == data:
+                        del self._pending[task_id]
+            if future.exception() is not None and batch:
+                logger.error(
+                    "Dropped unsaved tasks",
+                    extra={"tasks": len(batch), "attempts": attempt},
+                )
+
+        self._db.submit(write).add_done_callback(written)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        # Pending saves are written before the connections close
+        self._db.close()
+
+
+def create_task_store(backend: str, max_tasks: int, path: str = "") -> TaskStore:
+    """
+    Build a task store from configuration.
+
+    Args:
+        backend: "memory" or "sqlite"
+        max_tasks: Number of tasks kept before the oldest are evicted
+        path: SQLite database path
+
+    Returns:
+        Task store
+    """
+    if backend == "memory":
+        return MemoryTaskStore(max_tasks=max_tasks)
+    if backend == "sqlite":
+        return SQLiteTaskStore(path, max_tasks=max_tasks)
+    raise ValueError(f"Unknown task store backend: {backend}")
+
+
+class WorkerPool:
+    """Bounded pool of background workers draining a bounded job queue"""
+
+    def __init__(self, workers: int = 4, max_pending: int = 100):
+        self.workers = workers
+        self._queue: "asyncio.Queue[QueuedJob]" = asyncio.Queue(maxsize=max_pending)
+        self._workers: List["asyncio.Task"] = []
+        self._closed = False
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+
+    def submit(self, job: Job, on_drop: Optional[Callable[[], None]] = None):
+        """
+        Queue a job for background execution.
+
+        The job runs in a copy of the caller's context, so request and
+        task IDs set for logging carry over to the worker.
+
+        Args:
+            job: Coroutine function to run
+            on_drop: Called instead if the pool stops before the job starts
+
+        Raises:
+            asyncio.QueueFull: If the pending queue is at capacity or the
+                pool is shutting down
+        """
+        if self._closed:
+            raise asyncio.QueueFull("Worker pool is shutting down")
+        self.start()
+        self._queue.put_nowait((job, on_drop, contextvars.copy_context()))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def _work(self):
+        while True:
+            job, _, context = await self._queue.get()
+            try:
+                await asyncio.create_task(job(), context=context)
+            except Exception:
+                logger.exception("Background task failed")
+            finally:
+                self._queue.task_done()
+
+    async def stop(self, timeout: float = 0):
+        """
+        Stop accepting jobs and shut the workers down.
+
+        Queued and running jobs get up to `timeout` seconds to finish.
+        After that running jobs are cancelled and queued ones dropped,
+        calling their `on_drop`.
+        """
+        self._closed = True
+        if timeout > 0 and self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Background jobs still running after drain timeout",
+                    extra={"queued": self.pending, "timeout": timeout},
+                )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while not self._queue.empty():
+            _, on_drop, context = self._queue.get_nowait()
+            if on_drop is not None:
+                context.run(on_drop)
@@ -0,0 +1,221 @@
+import asyncio
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+task_id_var: ContextVar[Optional[str]] = ContextVar("task_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+span_logger = logging.getLogger("app.spans")
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the current request and task IDs.
+
+    Runs on the emitting side of the queue, where the context variables
+    are still set.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, "task_id", None) is None:
+            record.task_id = task_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the record's extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(
+            f"{key}={value}"
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and value is not None
+        )
+        return f"{line} {fields}" if fields else line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hand records to the listener thread without formatting on the event loop"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str = "INFO", fmt: str = "json"):
+    """
+    Send the app's logs through a queue to a background writer thread.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    Args:
+        level: Log level name for the "app" loggers
+        fmt: "json" for one JSON object per line, "text" for plain lines
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger("app")
+    root.setLevel(level.upper())
+    root.addHandler(handler)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Upper bounds in seconds, from fast in-process stages to slow model calls
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram.
+
+    Only updated from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given quantile"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[min(index, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_seconds": self.sum / self.count if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+class StageTimings:
+    """Duration histograms per pipeline stage"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: h.as_dict() for stage, h in sorted(self.histograms.items())}
+
+
+stage_timings = StageTimings()
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a pipeline stage.
+
+    The duration goes into the stage's histogram and, at DEBUG level, a
+    span log record carrying `fields`. Fields added to the yielded dict
+    inside the block are logged too.
+    """
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield fields
+    except BaseException as e:
+        cancelled = isinstance(e, (asyncio.CancelledError, GeneratorExit))
+        status = "cancelled" if cancelled else "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_timings.observe(stage, elapsed)
+        if span_logger.isEnabledFor(logging.DEBUG):
+            span_logger.debug(
+                "span",
+                extra={
+                    "stage": stage,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "status": status,
+                    **fields,
+                },
+            )
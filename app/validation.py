@@ -0,0 +1,237 @@
+"""Checks for generated posts.
+
+validate_post lists what is wrong with a post: thread and tweet length,
+tweet numbering, hashtag count, a missing blog URL and output cut off at
+the token limit. Each Issue points at the tweet it concerns, so the
+generator can repair just that part instead of regenerating the post.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.models import SocialPost
+
+TWEET_MAX_CHARS = 280
+# Twitter counts every link as this many characters (t.co wrapping)
+TWEET_URL_CHARS = 23
+THREAD_TWEETS = (3, 5)
+LINKEDIN_WORDS = (300, 800)
+# (min, max) hashtags; Twitter's belong in the final tweet
+HASHTAGS: Dict[str, Tuple[int, Optional[int]]] = {
+    "twitter": (1, None),
+    "linkedin": (3, 5),
+}
+# Output this close to the token limit that does not end cleanly was cut off
+TRUNCATION_THRESHOLD = 0.95
+
+# "1/5", "Tweet 1/5:" or "**Tweet 1/5:**" at the start of a line; models
+# sometimes copy the prompt's "1/n" literally
+TWEET_MARKER = re.compile(
+    r"^[ \t]*\**(Tweet[ \t]+)?(\d+)[ \t]*/[ \t]*(\d+|n)\b[ \t]*:?\**:?[ \t]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+HASHTAG = re.compile(r"#\w+")
+# A closing line made of hashtags only
+HASHTAG_LINE = re.compile(r"\n[ \t]*((?:#\w+[ \t]*)+)\s*$")
+URL = re.compile(r"https?://\S+")
+
+
+@dataclass
+class Issue:
+    """One problem with a post"""
+
+    # "format", "truncated", "thread_length", "numbering", "tweet_length",
+    # "hashtags", "missing_url" or "length"
+    kind: str
+    message: str
+    # 1-based position of the offending tweet
+    tweet: Optional[int] = None
+
+
+@dataclass
+class Tweet:
+    index: int
+    # 0 when the total was written as a literal "n"
+    total: int
+    text: str
+
+
+@dataclass
+class Thread:
+    """A Twitter thread split at its "k/n" markers"""
+
+    tweets: List[Tweet]
+    # Markers were written "Tweet k/n:" rather than "k/n"
+    labelled: bool = False
+
+    def render(self) -> str:
+        """The thread with its tweets numbered 1/n to n/n"""
+        return "\n\n".join(
+            f"{self.marker(position)} {tweet.text}"
+            for position, tweet in enumerate(self.tweets, 1)
+        )
+
+    def marker(self, position: int) -> str:
+        numbering = f"{position}/{len(self.tweets)}"
+        return f"Tweet {numbering}:" if self.labelled else numbering
+
+
+def parse_thread(content: str) -> Thread:
+    """Split a thread into tweets; text before the first marker is dropped"""
+    matches = list(TWEET_MARKER.finditer(content))
+    ends = [match.start() for match in matches[1:]] + [len(content)]
+    tweets = [
+        Tweet(
+            int(match.group(2)),
+            int(match.group(3)) if match.group(3).isdigit() else 0,
+            content[match.end() : end].strip(),
+        )
+        for match, end in zip(matches, ends)
+    ]
+    return Thread(tweets, labelled=bool(matches) and bool(matches[0].group(1)))
+
+
+def tweet_length(text: str, position: int, total: int) -> int:
+    """Characters Twitter counts for a tweet posted as "k/n text" """
+    text = URL.sub("x" * TWEET_URL_CHARS, text)
+    return len(f"{position}/{total} {text}")
+
+
+def hashtags(text: str) -> List[str]:
+    """Hashtags in text, skipping "#" inside words such as C# or URL fragments"""
+    found = []
+    for match in HASHTAG.finditer(text):
+        start = match.start()
+        if start and (text[start - 1].isalnum() or text[start - 1] in "_#/"):
+            continue
+        found.append(match.group())
+    return found
+
+
+def ends_cleanly(content: str) -> bool:
+    """Whether text ends the way finished posts do, not mid-sentence"""
+    words = content.split()
+    if not words:
+        return False
+    last = words[-1]
+    if last.startswith(("#", "http://", "https://")):
+        return True
+    # Sentence punctuation, closing brackets and quotes, emoji
+    return not last[-1].isalnum() and last[-1] not in ",;:-"
+
+
+def split_hashtag_line(text: str) -> Tuple[str, List[str]]:
+    """Split off a closing line of hashtags: (text before it, its hashtags)"""
+    match = HASHTAG_LINE.search(text)
+    if match is None:
+        return text, []
+    return text[: match.start()].rstrip(), hashtags(match.group(1))
+
+
+def looks_truncated(content: str, max_output_tokens: int) -> bool:
+    """Whether output ran into its token limit (~4 characters per token)"""
+    if not max_output_tokens:
+        return False
+    near_limit = len(content) // 4 >= max_output_tokens * TRUNCATION_THRESHOLD
+    return near_limit and not ends_cleanly(content)
+
+
+def validate_post(
+    post: SocialPost, url: str = "", max_output_tokens: int = 0
+) -> List[Issue]:
+    """
+    Check a generated post against its platform's requirements
+
+    Args:
+        post: The post
+        url: Blog URL the post must include (LinkedIn)
+        max_output_tokens: Token limit it was generated with, for
+            truncation detection (0 skips the check)
+
+    Returns:
+        The issues found; empty when the post is fine
+    """
+    content = post.content.strip()
+    if not content:
+        return [Issue("format", "Post is empty")]
+    if post.platform == "twitter":
+        return _validate_thread(content, max_output_tokens)
+    if post.platform == "linkedin":
+        return _validate_linkedin(content, url, max_output_tokens)
+    return []
+
+
+def _validate_thread(content: str, max_output_tokens: int) -> List[Issue]:
+    thread = parse_thread(content)
+    count = len(thread.tweets)
+    if not count:
+        return [Issue("format", "No numbered tweets")]
+
+    issues: List[Issue] = []
+    last = thread.tweets[-1]
+    if last.index < last.total or looks_truncated(content, max_output_tokens):
+        issues.append(Issue("truncated", f"Thread stops at tweet {last.index}/{last.total}"))
+    elif not THREAD_TWEETS[0] <= count <= THREAD_TWEETS[1]:
+        issues.append(Issue("thread_length", f"Thread has {count} tweets"))
+
+    numbering = [(tweet.index, tweet.total) for tweet in thread.tweets]
+    if numbering != [(position, count) for position in range(1, count + 1)]:
+        issues.append(Issue("numbering", "Tweets are not numbered 1/n to n/n"))
+
+    for position, tweet in enumerate(thread.tweets, 1):
+        length = tweet_length(tweet.text, position, count)
+        if length > TWEET_MAX_CHARS:
+            issues.append(
+                Issue("tweet_length", f"Tweet {position} has {length} characters", position)
+            )
+
+    if not any(issue.kind == "truncated" for issue in issues):
+        issues.extend(_hashtag_issues("twitter", last.text, tweet=count))
+    return issues
+
+
+def _validate_linkedin(content: str, url: str, max_output_tokens: int) -> List[Issue]:
+    if looks_truncated(content, max_output_tokens):
+        # Hashtags and the URL usually come last; check them after the rest
+        return [Issue("truncated", "Post stops mid-sentence at the token limit")]
+
+    issues = _hashtag_issues("linkedin", content)
+    if url and url.rstrip("/") not in content:
+        issues.append(Issue("missing_url", "Blog URL is missing"))
+    words = len(content.split())
+    if not LINKEDIN_WORDS[0] <= words <= LINKEDIN_WORDS[1]:
+        issues.append(Issue("length", f"Post has {words} words"))
+    return issues
+
+
+def _hashtag_issues(platform: str, text: str, tweet: Optional[int] = None) -> List[Issue]:
+    low, high = HASHTAGS[platform]
+    count = len(hashtags(text))
+    if count < low or (high is not None and count > high):
+        return [Issue("hashtags", f"{count} hashtags", tweet)]
+    return []
+
+
+class RepairStats:
+    """Counters for validated posts and the cost of repairing them"""
+
+    def __init__(self):
+        self.checked = 0
+        self.flagged = 0
+        self.repaired = 0
+        self.regenerated = 0
+        self.repair_calls = 0
+        self.tokens_used = 0
+        self.tokens_saved = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "checked": self.checked,
+            "flagged": self.flagged,
+            "repaired": self.repaired,
+            "regenerated": self.regenerated,
+            "repair_calls": self.repair_calls,
+            "tokens_used": self.tokens_used,
+            "tokens_saved": self.tokens_saved,
+        }
@@ -0,0 +1,166 @@
+"""Concurrent message/send load benchmark.
+
+Fires N concurrent ``message/send`` requests at the app in-process. Blog
+fetches and model calls are replaced by local stand-ins with a configurable
+latency, so the numbers reflect how well the pipeline overlaps I/O rather
+than network or provider speed.
+
+With a fully async pipeline the wall time should be close to the slowest
+single request, not the sum of all of them.
+
+Usage:
+    python benchmarks/concurrent_requests.py --requests 20 --fetch-latency 0.5 --llm-latency 1.0
+    python benchmarks/concurrent_requests.py --requests 20 --same-url
+    python benchmarks/concurrent_requests.py --requests 100 --batch   # one batch/send call
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.api import app, processor  # noqa: E402
+from app.http_pool import HTTPPool  # noqa: E402
+
+BLOG_HTML = """
+<html>
+  <head><title>Benchmark Post</title></head>
+  <body>
+    <article>
+      <h1>Benchmark Post</h1>
+      <p>Async pipelines let one slow article wait without blocking the others.</p>
+      <p>Every request here sleeps on the fake network instead of the event loop.</p>
+    </article>
+  </body>
+</html>
+"""
+
+
+def install_stand_ins(fetch_latency: float, llm_latency: float, jitter: float):
+    """Swap network and model calls for local, latency-controlled fakes"""
+
+    async def blog_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(fetch_latency + random.uniform(0, jitter))
+        return httpx.Response(200, text=BLOG_HTML, headers={"content-type": "text/html"})
+
+    async def fake_generate(blog_content, platform):
+        await asyncio.sleep(llm_latency + random.uniform(0, jitter))
+        return f"[{platform}] {blog_content.title}"
+
+    pool = HTTPPool(transport=httpx.MockTransport(blog_handler))
+    processor.http = processor.extractor.http = pool
+    processor.generator._generate_platform_content = fake_generate
+
+
+def build_payload(index: int, same_url: bool = False) -> dict:
+    url = "https://blog.example.com/post"
+    if not same_url:
+        url = f"{url}-{index}"
+    return {
+        "jsonrpc": "2.0",
+        "id": index,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": url}],
+            }
+        },
+    }
+
+
+async def run(num_requests: int, same_url: bool = False) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(index: int) -> float:
+            started = time.perf_counter()
+            response = await client.post("/", json=build_payload(index, same_url))
+            response.raise_for_status()
+            state = response.json()["result"]["status"]["state"]
+            if state != "completed":
+                raise RuntimeError(f"request {index} ended in state {state}")
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(num_requests)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": num_requests,
+        "wall_seconds": wall,
+        "slowest_seconds": max(latencies),
+        "sum_seconds": sum(latencies),
+        "coalescing": processor.inflight.stats(),
+    }
+
+
+async def run_batch(num_urls: int) -> dict:
+    """Send every URL in a single batch/send call"""
+    urls = [f"https://blog.example.com/post-{index}" for index in range(num_urls)]
+    payload = {
+        "jsonrpc": "2.0",
+        "id": "batch",
+        "method": "batch/send",
+        "params": {"urls": urls, "configuration": {"blocking": True}},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        started = time.perf_counter()
+        response = await client.post("/", json=payload)
+        wall = time.perf_counter() - started
+        response.raise_for_status()
+
+    tasks = response.json()["result"]["tasks"]
+    completed = sum(1 for task in tasks if task["status"]["state"] == "completed")
+    return {"requests": num_urls, "wall_seconds": wall, "completed": completed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--fetch-latency", type=float, default=0.5)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument(
+        "--same-url",
+        action="store_true",
+        help="send every request for one URL to exercise request coalescing",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="send all URLs in one batch/send call (BATCH_CONCURRENCY at a time)",
+    )
+    args = parser.parse_args()
+
+    install_stand_ins(args.fetch_latency, args.llm_latency, args.jitter)
+
+    if args.batch:
+        result = asyncio.run(run_batch(args.requests))
+        print(f"URLs:            {result['requests']}")
+        print(f"Completed:       {result['completed']}")
+        print(f"Wall time:       {result['wall_seconds']:.2f}s")
+        print(f"Per URL:         {result['wall_seconds'] / result['requests']:.3f}s")
+        return
+
+    result = asyncio.run(run(args.requests, args.same_url))
+
+    print(f"Requests:        {result['requests']}")
+    print(f"Wall time:       {result['wall_seconds']:.2f}s")
+    print(f"Slowest request: {result['slowest_seconds']:.2f}s")
+    print(f"Sum of requests: {result['sum_seconds']:.2f}s")
+    print(f"Coalesced:       {result['coalescing']['coalesced']} of {result['requests']}")
+    print(f"Overlap ratio:   {result['wall_seconds'] / result['slowest_seconds']:.2f}x slowest")
+
+
+if __name__ == "__main__":
+    main()
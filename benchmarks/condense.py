@@ -0,0 +1,89 @@
+"""Content condensation benchmark.
+
+Builds synthetic articles of 1k/10k/100k words and reports how much the
+condensation stage shrinks the prompt content and how long it takes. Runs
+entirely offline.
+
+Usage:
+    python benchmarks/condense.py --budget 4000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.condenser import ContentCondenser  # noqa: E402
+from app.models import BlogContent  # noqa: E402
+
+VOCABULARY = (
+    "async python latency throughput cache request model prompt token budget "
+    "article content server client queue worker database index query schema "
+    "deploy container scale memory thread event loop benchmark profile metric"
+).split()
+FILLER = "the a of to and in is that for with on as it by this be are".split()
+
+
+def build_article(words: int, seed: int = 0) -> BlogContent:
+    """Synthetic article with headings, a lead paragraph and body paragraphs"""
+    rng = random.Random(seed)
+    lines = []
+    headings = []
+    written = 0
+    section = 0
+    while written < words:
+        if written % 800 == 0:
+            section += 1
+            headings.append(f"Section {section} {rng.choice(VOCABULARY).title()} Notes")
+            lines.append(headings[-1])
+        sentence_count = rng.randint(3, 6)
+        sentences = []
+        for _ in range(sentence_count):
+            length = rng.randint(8, 20)
+            tokens = [
+                rng.choice(VOCABULARY) if rng.random() < 0.4 else rng.choice(FILLER)
+                for _ in range(length)
+            ]
+            sentences.append(" ".join(tokens).capitalize() + ".")
+            written += length
+        lines.append(" ".join(sentences))
+    content = "\n".join(lines)
+    return BlogContent(
+        url="https://blog.example.com/benchmark",
+        title="Python async latency and cache tuning",
+        content=content,
+        excerpt=lines[1][:200],
+        headings=headings,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=4000, help="token budget")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    condenser = ContentCondenser(max_tokens=args.budget)
+    chars_per_token = ContentCondenser.CHARS_PER_TOKEN
+
+    print(f"{'words':>8} {'tokens in':>10} {'tokens out':>10} {'reduction':>10} {'ms':>8}")
+    for words in (1_000, 10_000, 100_000):
+        blog = build_article(words)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            condensed = condenser.condense(blog)
+        elapsed_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        tokens_in = len(blog.content) // chars_per_token
+        tokens_out = len(condensed.content) // chars_per_token
+        reduction = 1 - tokens_out / tokens_in
+        print(
+            f"{words:>8} {tokens_in:>10} {tokens_out:>10} {reduction:>9.1%} {elapsed_ms:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
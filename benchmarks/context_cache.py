@@ -0,0 +1,138 @@
+"""Billed input tokens and latency with and without context caching.
+
+Runs AIGenerator.generate_posts against the Gemini stand-in, through the
+real google-genai client, for a long synthetic article: `--rounds` times in
+a row with the post cache off, so the later rounds are regenerations of the
+same article. The stand-in charges `--prefill` seconds per 1000 prompt
+tokens it has to read, so creating a cache costs what it later saves.
+
+For CONTEXT_CACHE_TTL off and on, in per_platform and combined mode, it
+reports per article:
+
+    prompt     prompt tokens the stand-in read, cached ones included
+    cached     of which served from a context cache
+    created    tokens written into caches (billed once, at the input rate)
+    billed     prompt - cached + created + cached * --cached-rate
+    p50_ms     median generate_posts latency
+
+Cache storage (billed per hour on Gemini) is not included.
+
+Usage:
+    python benchmarks/context_cache.py --words 3000 --rounds 4 --prefill 0.05
+    python benchmarks/context_cache.py --compare benchmarks/results/context_cache-abc123-....json
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.generator import AIGenerator  # noqa: E402
+from app.providers import GeminiProvider, ProviderRouter  # noqa: E402
+from app.scheduler import LLMScheduler  # noqa: E402
+from condense import build_article  # noqa: E402
+from reporting import compare, save  # noqa: E402
+from stand_ins import FakeGeminiServer  # noqa: E402
+
+
+async def scenario(
+    gemini: FakeGeminiServer, mode: str, ttl: float, args
+) -> Dict[str, float]:
+    settings.GENERATION_MODE = mode
+    provider = GeminiProvider(
+        "bench",
+        settings.GEMINI_MODEL,
+        gemini.url,
+        context_cache_ttl=ttl,
+        context_cache_min_tokens=args.min_tokens,
+    )
+    generator = AIGenerator(router=ProviderRouter([provider], LLMScheduler()))
+    blog = build_article(args.words)
+    before = (gemini.prompt_tokens, gemini.cached_tokens, gemini.cache_creates)
+
+    latencies = []
+    try:
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            posts = await generator.generate_posts(blog, settings.DEFAULT_PLATFORMS)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if any(post.content.startswith("Failed to generate") for post in posts):
+                raise RuntimeError(f"generation failed: {posts}")
+    finally:
+        await generator.aclose()
+
+    prompt = gemini.prompt_tokens - before[0]
+    cached = gemini.cached_tokens - before[1]
+    creates = gemini.cache_creates - before[2]
+    created = creates * len(generator._prompt_prefix(blog)) // 4
+    billed = prompt - cached + created + cached * args.cached_rate
+    return {
+        "prompt_tokens": prompt,
+        "cached_tokens": cached,
+        "created_tokens": created,
+        "billed_tokens": round(billed),
+        "p50_ms": statistics.median(latencies),
+        "first_ms": latencies[0],
+    }
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    # Imported up front so the first scenario does not pay for it
+    import google.genai  # noqa: F401
+
+    gemini = FakeGeminiServer(args.llm_latency, prefill=args.prefill).start()
+    results = {}
+    try:
+        for mode in ("per_platform", "combined"):
+            for ttl in (0, args.ttl):
+                name = f"{mode}-{'cached' if ttl else 'uncached'}"
+                results[name] = await scenario(gemini, mode, ttl, args)
+    finally:
+        gemini.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=3000, help="article length")
+    parser.add_argument("--rounds", type=int, default=4, help="generations per article")
+    parser.add_argument("--ttl", type=float, default=300, help="CONTEXT_CACHE_TTL")
+    parser.add_argument("--min-tokens", type=int, default=1024)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument(
+        "--prefill", type=float, default=0.05, help="stand-in seconds per 1k prompt tokens"
+    )
+    parser.add_argument(
+        "--cached-rate", type=float, default=0.25, help="price of a cached token"
+    )
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{args.words} words, {args.rounds} rounds per scenario\n")
+    print(
+        f"{'scenario':<24} {'prompt':>8} {'cached':>8} {'created':>8} "
+        f"{'billed':>8} {'p50_ms':>8} {'first_ms':>9}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<24} {result['prompt_tokens']:>8} {result['cached_tokens']:>8} "
+            f"{result['created_tokens']:>8} {result['billed_tokens']:>8} "
+            f"{result['p50_ms']:>8.0f} {result['first_ms']:>9.0f}"
+        )
+
+    path = save("context_cache", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, ("billed_tokens", "p50_ms", "first_ms"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Extraction engine parity check and benchmark.
+
+Runs both BlogExtractor engines over the HTML corpus in benchmarks/corpus
+plus a generated multi-MB page with inline JSON. It first checks that the
+engines produce identical BlogContent, both from the raw page and after
+streaming it through the fetch reader in small chunks, then reports throughput and peak
+memory for each one. Peak RSS is measured in a fresh subprocess per engine
+so the two engines do not share allocator state.
+
+Usage:
+    python benchmarks/extraction_engines.py
+    python benchmarks/extraction_engines.py --check   # parity only, exit 1 on mismatch
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.extractor import BlogExtractor  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+STREAM_CHUNK_BYTES = 64
+
+
+def heavy_page(paragraphs: int = 4000, json_kb: int = 1500) -> str:
+    """Multi-MB page: big inline JSON state, deep chrome and a long article"""
+    state = json.dumps({"items": ["x" * 100] * (json_kb * 10)})
+    body = "\n".join(
+        f"<p>Paragraph {i} talks about <a href='/t/{i}'>topic {i}</a> and "
+        f"<em>latency</em> budgets in production systems.</p>"
+        for i in range(paragraphs)
+    )
+    nav = "".join(f"<li><a href='/c/{i}'>Category {i}</a></li>" for i in range(500))
+    return (
+        "<html><head><title>Heavy Page</title>"
+        f"<script>window.__STATE__ = {state};</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article><h1>Heavy Page</h1>{body}</article></main>"
+        "<footer>footer</footer></body></html>"
+    )
+
+
+def load_corpus() -> dict:
+    pages = {
+        path.name: path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.html"))
+    }
+    pages["generated_heavy.html"] = heavy_page()
+    return pages
+
+
+async def read_streamed(extractor: BlogExtractor, name: str, html: str) -> str:
+    """Feed a page through the fetch reader the way a chunked response would"""
+    body = html.encode("utf-8")
+
+    async def chunks():
+        for start in range(0, len(body), STREAM_CHUNK_BYTES):
+            yield body[start : start + STREAM_CHUNK_BYTES]
+
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/html; charset=utf-8"},
+        content=chunks(),
+        request=httpx.Request("GET", f"https://example.com/{name}"),
+    )
+    return await extractor._read_html(response)
+
+
+def check_parity(pages: dict) -> bool:
+    fast = BlogExtractor(engine="lxml")
+    reference = BlogExtractor(engine="bs4")
+    ok = True
+    for name, html in pages.items():
+        expected = reference._parse(name, html)
+        streamed = asyncio.run(read_streamed(fast, name, html))
+        for label, actual in (
+            ("lxml", fast._parse(name, html)),
+            ("stream", fast._parse(name, streamed)),
+        ):
+            if actual != expected:
+                ok = False
+                print(f"MISMATCH {name} ({label})")
+                print(f"  bs4:    title={expected.title!r} content={expected.content[:120]!r}")
+                print(f"  {label + ':':<7} title={actual.title!r} content={actual.content[:120]!r}")
+                break
+        else:
+            print(f"ok       {name}")
+    return ok
+
+
+def peak_rss_kb(reset: bool = False) -> int:
+    """Peak RSS of this process; on Linux the high-water mark can be reset"""
+    status = Path("/proc/self/status")
+    if not status.exists():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if reset:
+        try:
+            Path("/proc/self/clear_refs").write_text("5")
+        except OSError:
+            pass
+    for line in status.read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(engine: str, repeat: int) -> dict:
+    """Parse every page `repeat` times; run in a subprocess for clean RSS"""
+    pages = load_corpus()
+    extractor = BlogExtractor(engine=engine)
+    baseline_kb = peak_rss_kb(reset=True)
+
+    total_bytes = sum(len(html.encode("utf-8")) for html in pages.values()) * repeat
+    heavy = pages["generated_heavy.html"]
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, html in pages.items():
+            extractor._parse(name, html)
+    elapsed = time.perf_counter() - started
+
+    heavy_started = time.perf_counter()
+    extractor._parse("generated_heavy.html", heavy)
+    heavy_ms = (time.perf_counter() - heavy_started) * 1000
+
+    peak_kb = peak_rss_kb()
+    return {
+        "engine": engine,
+        "pages_per_second": len(pages) * repeat / elapsed,
+        "mb_per_second": total_bytes / elapsed / 1e6,
+        "heavy_page_ms": heavy_ms,
+        "heavy_page_mb": len(heavy.encode("utf-8")) / 1e6,
+        "peak_rss_delta_mb": (peak_kb - baseline_kb) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="only run the parity check")
+    parser.add_argument("--measure", choices=BlogExtractor.ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.repeat)))
+        return
+
+    ok = check_parity(load_corpus())
+    if args.check or not ok:
+        sys.exit(0 if ok else 1)
+
+    print()
+    heavy_mb = len(heavy_page().encode("utf-8")) / 1e6
+    print(f"Heavy page: {heavy_mb:.1f} MB")
+    print(f"{'engine':>6} {'pages/s':>9} {'MB/s':>7} {'heavy ms':>9} {'peak RSS Δ MB':>14}")
+    for engine in BlogExtractor.ENGINES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", engine, "--repeat", str(args.repeat)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{engine:>6} {result['pages_per_second']:>9.1f} {result['mb_per_second']:>7.1f} "
+            f"{result['heavy_page_ms']:>9.1f} {result['peak_rss_delta_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""End-to-end load test against a real server process.
+
+Starts the blog and Gemini stand-ins, launches the app with uvicorn
+pointed at them (GEMINI_BASE_URL, caches off so every request does the
+full pipeline), then fires message/send requests at POST / with a fixed
+concurrency. Reports throughput and p50/p95/p99 latency and saves the
+results as JSON for comparison with other commits.
+
+Usage:
+    python benchmarks/load_test.py --requests 500 --concurrency 50
+    python benchmarks/load_test.py --llm-latency 1.0 --llm-error-rate 0.05 --pages all
+    python benchmarks/load_test.py --compare benchmarks/results/load-abc123-....json
+    python benchmarks/load_test.py --target http://localhost:8000   # already running
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reporting import compare, percentile, save  # noqa: E402
+from stand_ins import BlogServer, FakeGeminiServer  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, gemini_url: str, extra_env: List[str]) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "bench",
+        "GEMINI_BASE_URL": gemini_url,
+        "LLM_PROVIDERS": "gemini",
+        "BLOG_CACHE_BACKEND": "none",
+        "GENERATION_CACHE_BACKEND": "none",
+        "LOG_LEVEL": "WARNING",
+    }
+    for item in extra_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.api:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+def payload(index: int, url: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": index,
+        "method": "message/send",
+        "params": {
+            "message": {"role": "user", "parts": [{"kind": "text", "text": url}]},
+            "configuration": {"blocking": True},
+        },
+    }
+
+
+async def load(base_url: str, urls: List[str], requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for index in range(requests):
+        queue.put_nowait(index)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            while not queue.empty():
+                index = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/", json=payload(index, urls[index % len(urls)]))
+                except httpx.HTTPError as e:
+                    outcomes[type(e).__name__] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    outcomes[f"http_{response.status_code}"] += 1
+                    continue
+                body = response.json()
+                if "error" in body:
+                    outcomes["rpc_error"] += 1
+                else:
+                    outcomes[body["result"]["status"]["state"]] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput_rps": requests / wall,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "outcomes": dict(outcomes),
+    }
+
+
+async def run(args) -> dict:
+    blogs = BlogServer(args.fetch_latency, args.jitter, args.fetch_error_rate).start()
+    gemini = FakeGeminiServer(args.llm_latency, args.jitter, args.llm_error_rate).start()
+    server: Optional[subprocess.Popen] = None
+    try:
+        base_url = args.target
+        if not base_url:
+            port = free_port()
+            server = start_server(port, gemini.url, args.env)
+            base_url = f"http://127.0.0.1:{port}"
+        await wait_ready(base_url)
+
+        urls = blogs.urls(realistic_only=args.pages == "realistic")
+        if args.warmup:
+            await load(base_url, urls, args.warmup, min(args.warmup, args.concurrency))
+        result = await load(base_url, urls, args.requests, args.concurrency)
+        result["llm_requests"] = gemini.requests
+        result["llm_injected_errors"] = gemini.errors
+        return result
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        blogs.stop()
+        gemini.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--fetch-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--fetch-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--pages",
+        choices=("realistic", "all"),
+        default="realistic",
+        help="'all' adds the huge and pathological pages to the mix",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra server setting, e.g. --env GENERATION_MODE=combined",
+    )
+    parser.add_argument("--target", help="existing server URL instead of starting one")
+    parser.add_argument("--name", default="load", help="results name")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    print(f"Requests:    {result['requests']} at concurrency {result['concurrency']}")
+    print(f"Wall time:   {result['wall_seconds']:.2f}s")
+    print(f"Throughput:  {result['throughput_rps']:.1f} req/s")
+    print(
+        f"Latency:     p50={result['p50_ms']:.0f}ms p95={result['p95_ms']:.0f}ms "
+        f"p99={result['p99_ms']:.0f}ms max={result['max_ms']:.0f}ms"
+    )
+    print(f"Outcomes:    {result['outcomes']}")
+
+    results = {args.name: result}
+    path = save("load", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(
+            args.compare, results, ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        )
+
+
+if __name__ == "__main__":
+    main()
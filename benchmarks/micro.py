@@ -0,0 +1,220 @@
+"""Micro-benchmarks for the CPU-bound helpers on the request path.
+
+Times BlogExtractor's text helpers over the pages the blog stand-in serves,
+request body decoding (against the json.loads + JSONRPCRequest(**body)
+path it replaced) and MessageParser on a plain message, Telex-style
+messages carrying short and long conversation histories and a message
+with many text parts, PostProcessor.format_response and validate_post.
+Reports the median time per call and saves the results as JSON for
+comparison with other commits.
+
+Usage:
+    python benchmarks/micro.py
+    python benchmarks/micro.py --filter excerpt --compare benchmarks/results/micro-abc123-....json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import rpc  # noqa: E402
+from app.extractor import BlogExtractor  # noqa: E402
+from app.message_parser import MessageParser  # noqa: E402
+from app.models import JSONRPCRequest, Message, SocialPost  # noqa: E402
+from app.processor import PostProcessor  # noqa: E402
+from app.validation import validate_post  # noqa: E402
+from reporting import compare, save  # noqa: E402
+from stand_ins import corpus_pages  # noqa: E402
+
+URL = "https://blog.example.com/2024/05/async-python-latency"
+
+
+def plain_message() -> Message:
+    return Message(role="user", parts=[{"kind": "text", "text": f"Convert {URL}"}])
+
+
+def telex_message(history: int = 200) -> Message:
+    """Telex sends earlier turns as data parts ahead of the new text"""
+    turns = [
+        {"kind": "text", "text": f"<p>Earlier message {i} with some chat text</p>"}
+        for i in range(history)
+    ]
+    return Message(
+        role="user",
+        parts=[
+            {"kind": "data", "data": turns},
+            {"kind": "text", "text": f"Please turn {URL} into posts"},
+        ],
+    )
+
+
+def multipart_message(parts: int = 500) -> Message:
+    """Many short text parts with the URL only in the last one"""
+    return Message(
+        role="user",
+        parts=[{"kind": "text", "text": f"Line {i} of a long note"} for i in range(parts)]
+        + [{"kind": "text", "text": f"Source: {URL}"}],
+    )
+
+
+def messages() -> Dict[str, Message]:
+    large = telex_message(history=5000)
+    return {
+        "plain": plain_message(),
+        "telex": telex_message(),
+        "telex_large": large,
+        # The same history sent after the new text, as some clients do
+        "telex_large_url_first": Message(role="user", parts=large.parts[::-1]),
+        "multipart": multipart_message(),
+    }
+
+
+def request_body(message: Message) -> bytes:
+    body = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "message/send",
+        "params": {"message": message.model_dump(), "configuration": {"blocking": True}},
+    }
+    return json.dumps(body).encode()
+
+
+def decode_legacy(raw: bytes) -> JSONRPCRequest:
+    """What handle_request did before: request.json(), then JSONRPCRequest(**body)"""
+    return JSONRPCRequest(**json.loads(raw))
+
+
+def posts() -> List[SocialPost]:
+    thread = "\n\n".join(f"{i}/5 Tweet number {i} about latency." for i in range(1, 6))
+    return [
+        SocialPost(platform="twitter", content=thread),
+        SocialPost(platform="linkedin", content="Insightful paragraph. " * 200),
+    ]
+
+
+def measure(fn: Callable[[], object], budget: float, rounds: int = 5) -> Dict[str, float]:
+    """Median seconds per call over `rounds`, each lasting about budget/rounds"""
+    started = time.perf_counter()
+    fn()
+    estimate = max(time.perf_counter() - started, 1e-7)
+    number = max(1, int(budget / rounds / estimate))
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "calls": number * rounds,
+    }
+
+
+def measure_destructive(
+    setup: Callable[[], object], fn: Callable[[object], object], budget: float
+) -> Dict[str, float]:
+    """Like measure() for functions that consume their input, built untimed"""
+    started = time.perf_counter()
+    fn(setup())
+    estimate = max(time.perf_counter() - started, 1e-7)
+    number = max(3, min(200, int(budget / estimate)))
+
+    inputs = [setup() for _ in range(number)]
+    samples = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        samples.append(time.perf_counter() - started)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "calls": number,
+    }
+
+
+def cases(budget: float) -> Dict[str, Callable[[], Dict[str, float]]]:
+    extractor = BlogExtractor()
+    processor = PostProcessor()
+    selected: Dict[str, Callable[[], Dict[str, float]]] = {}
+
+    for path, html in corpus_pages().items():
+        page = path.strip("/").replace("/", ".")
+        text = extractor._parse_with_lxml(html)[1]
+
+        selected[f"extract_content.{page}"] = lambda html=html: measure_destructive(
+            lambda: BeautifulSoup(html, "lxml"), extractor._extract_content, budget
+        )
+        selected[f"parse_lxml.{page}"] = lambda html=html: measure(
+            lambda: extractor._parse_with_lxml(html), budget
+        )
+        selected[f"clean_text.{page}"] = lambda text=text: measure(
+            lambda: extractor._clean_text(text), budget
+        )
+        selected[f"generate_excerpt.{page}"] = lambda text=text: measure(
+            lambda: extractor._generate_excerpt(text), budget
+        )
+
+    for name, message in messages().items():
+        raw = request_body(message)
+        selected[f"decode_request.{name}"] = lambda raw=raw: measure(
+            lambda: rpc.decode(raw), budget
+        )
+        selected[f"decode_request_legacy.{name}"] = lambda raw=raw: measure(
+            lambda: decode_legacy(raw), budget
+        )
+        data = message.model_dump()
+        selected[f"build_message.{name}"] = lambda data=data: measure(
+            lambda: Message(**data), budget
+        )
+        selected[f"extract_blog_url.{name}"] = lambda message=message: measure(
+            lambda: MessageParser.extract_blog_url_and_platforms(message), budget
+        )
+
+    generated = posts()
+    selected["format_response"] = lambda: measure(
+        lambda: processor.format_response(generated), budget
+    )
+    for post in generated:
+        selected[f"validate_post.{post.platform}"] = lambda post=post: measure(
+            lambda: validate_post(post, "https://blog.example.com/post", 1400), budget
+        )
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds per case")
+    parser.add_argument("--filter", default="", help="only cases containing this")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<48} {'median':>12} {'min':>12} {'calls':>8}")
+    for name, run in cases(args.budget).items():
+        if args.filter not in name:
+            continue
+        result = results[name] = run()
+        print(
+            f"{name:<48} {result['median_us']:>10.1f}us "
+            f"{result['min_us']:>10.1f}us {result['calls']:>8}"
+        )
+
+    path = save("micro", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, ("median_us",))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Tokens spent fixing flawed posts: targeted repair against a full retry.
+
+Drives AIGenerator with a fake provider whose first answer for a platform
+has one known flaw, and which answers repair requests (shortened tweet,
+hashtags, continuation) correctly. For each flaw it reports the repair
+requests made, the tokens they cost (~4 characters per token, prompt and
+response) and the tokens saved against regenerating the whole post, plus
+the issues found before and after. Runs offline.
+
+Post length is reported but not repaired (only a rewrite fixes it), so a
+LinkedIn post long enough to hit the token limit keeps that issue.
+
+Usage:
+    python benchmarks/post_repair.py
+    python benchmarks/post_repair.py --compare benchmarks/results/post_repair-abc123-....json
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from app.generator import AIGenerator  # noqa: E402
+from app.models import BlogContent, SocialPost  # noqa: E402
+from app.providers import FakeProvider, ProviderRouter  # noqa: E402
+from app.scheduler import LLMScheduler  # noqa: E402
+from app.validation import validate_post  # noqa: E402
+from condense import build_article  # noqa: E402
+from reporting import compare, save  # noqa: E402
+
+TWEET = "Latency budgets make every millisecond of an API call visible to the team."
+
+
+def thread(*tweets: str) -> str:
+    return "\n\n".join(f"Tweet {i}/{len(tweets)}: {t}" for i, t in enumerate(tweets, 1))
+
+
+def linkedin(fake: FakeProvider, blog: BlogContent) -> str:
+    return fake._linkedin_post(f"Blog URL: {blog.url}", blog.title)
+
+
+# Flawed first answers by name, built for the benchmark article
+FLAWS: Dict[str, Callable[[FakeProvider, BlogContent], SocialPost]] = {
+    "long_tweet": lambda fake, blog: SocialPost(
+        platform="twitter",
+        content=thread(TWEET, " ".join([TWEET] * 5), TWEET, f"{TWEET} #api"),
+    ),
+    "no_hashtags": lambda fake, blog: SocialPost(
+        platform="twitter", content=thread(TWEET, TWEET, TWEET, TWEET)
+    ),
+    "numbering": lambda fake, blog: SocialPost(
+        platform="twitter",
+        content=f"1/4 {TWEET}\n\n2/4 {TWEET}\n\n2/4 {TWEET}\n\n4/4 {TWEET} #api",
+    ),
+    "truncated_thread": lambda fake, blog: SocialPost(
+        platform="twitter", content=f"1/4 {TWEET}\n\n2/4 {TWEET}\n\n3/4 Latency budgets make"
+    ),
+    "missing_url": lambda fake, blog: SocialPost(
+        platform="linkedin", content=linkedin(fake, blog).replace(blog.url, "")
+    ),
+    "truncated_linkedin": lambda fake, blog: SocialPost(
+        platform="linkedin",
+        content=(linkedin(fake, blog).split("\n\nRead more")[0] + " ") * 3
+        + "and the last point is that",
+    ),
+}
+
+
+class FlawedProvider(FakeProvider):
+    """Answers the generation prompt with `post` and repair prompts sensibly"""
+
+    def __init__(self, post: SocialPost):
+        super().__init__(name="flawed")
+        self.post = post
+
+    def _post(self, prompt: str, platform: str = "") -> str:
+        if "is too long. Rewrite" in prompt:
+            return TWEET
+        if "Suggest" in prompt:
+            return "#latency #api #python"
+        if "Continue it" in prompt:
+            if "twitter" in prompt:
+                return f"budgets done right. #api\n\n4/4 {TWEET} #latency"
+            return "budgets pay off. What do you think?\n\n#latency #api #python"
+        return self.post.content
+
+
+async def one(name: str, args) -> Dict[str, float]:
+    blog = build_article(args.words)
+    post = FLAWS[name](FakeProvider(), blog)
+    provider = FlawedProvider(post)
+    generator = AIGenerator(router=ProviderRouter([provider], LLMScheduler()))
+    budget = generator._max_output_tokens(post.platform)
+    before = validate_post(post, blog.url, budget)
+
+    content = await generator._generate_platform_content(blog, post.platform)
+    repaired = await generator._checked_post(blog, post.platform, content)
+    after = validate_post(SocialPost(platform=post.platform, content=repaired), blog.url)
+    await generator.aclose()
+
+    stats = generator.repair_stats
+    return {
+        "issues_before": len(before),
+        "issues_after": len(after),
+        "repair_calls": stats.repair_calls,
+        "tokens_used": stats.tokens_used,
+        "tokens_saved": stats.tokens_saved,
+    }
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    settings.POST_REPAIR = True
+    return {name: await one(name, args) for name in FLAWS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=1500, help="article length")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(
+        f"{'flaw':<20} {'issues':>10} {'calls':>6} {'used':>8} {'saved':>8} {'saved%':>7}"
+    )
+    for name, result in results.items():
+        full = result["tokens_used"] + result["tokens_saved"]
+        share = result["tokens_saved"] / full * 100 if full else 0.0
+        print(
+            f"{name:<20} {result['issues_before']:>5} -> {result['issues_after']:<2} "
+            f"{result['repair_calls']:>6} {result['tokens_used']:>8} "
+            f"{result['tokens_saved']:>8} {share:>6.0f}%"
+        )
+
+    path = save("post_repair", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, ("tokens_used", "tokens_saved"))
+
+
+if __name__ == "__main__":
+    main()
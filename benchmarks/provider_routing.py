@@ -0,0 +1,122 @@
+"""Provider routing and hedging benchmark.
+
+Drives ProviderRouter with fake providers whose latency has a heavy tail
+(a fraction of calls are much slower than usual) and reports p50/p95/p99
+latency with and without hedged requests. A second scenario takes the
+preferred provider down mid-run to show failover.
+
+Usage:
+    python benchmarks/provider_routing.py --calls 400 --tail-rate 0.05 --tail-latency 1.0
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.providers import FakeProvider, ProviderRouter  # noqa: E402
+from app.scheduler import LLMScheduler  # noqa: E402
+
+
+class TailProvider(FakeProvider):
+    """Fake provider where `tail_rate` of calls take `tail_latency` seconds"""
+
+    def __init__(self, name: str, latency: float, tail_rate: float, tail_latency: float):
+        super().__init__(name=name, latency=latency, jitter=latency / 2)
+        self.base_latency = latency
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+
+    async def _wait(self):
+        slow = random.random() < self.tail_rate
+        self.latency = self.tail_latency if slow else self.base_latency
+        await super()._wait()
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def drive(router: ProviderRouter, calls: int, concurrency: int, on_call=None):
+    latencies = []
+    failures = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        nonlocal failures
+        if on_call:
+            on_call(index)
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await router.generate("Blog Title: Benchmark", 100, 0.7)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies, failures
+
+
+def report(label: str, latencies, failures: int, router: ProviderRouter):
+    print(
+        f"{label:<16} p50={percentile(latencies, 0.5) * 1000:7.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:7.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms "
+        f"mean={statistics.mean(latencies) * 1000:7.1f}ms "
+        f"failed={failures} hedged={router.hedged} hedge_wins={router.hedge_wins}"
+    )
+
+
+async def run(args):
+    for hedge in (False, True):
+        providers = [
+            TailProvider("primary", args.latency, args.tail_rate, args.tail_latency),
+            TailProvider("secondary", args.latency * 1.5, args.tail_rate, args.tail_latency),
+        ]
+        router = ProviderRouter(
+            providers,
+            LLMScheduler(max_concurrency=args.concurrency, max_queue=args.calls),
+            hedge=hedge,
+            hedge_min_samples=20,
+        )
+        latencies, failures = await drive(router, args.calls, args.concurrency)
+        report("hedged" if hedge else "no hedging", latencies, failures, router)
+
+    primary = FakeProvider("primary", latency=args.latency)
+    secondary = FakeProvider("secondary", latency=args.latency * 1.5)
+    router = ProviderRouter(
+        [primary, secondary],
+        LLMScheduler(max_concurrency=args.concurrency, max_queue=args.calls, max_retries=0),
+        window=20,
+    )
+
+    def outage(index: int):
+        if index == args.calls // 2:
+            primary.failure_rate = 1.0
+
+    latencies, failures = await drive(router, args.calls, args.concurrency, outage)
+    report("primary outage", latencies, failures, router)
+    print(f"{'':<16} routing order after outage: {router.stats()['order']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
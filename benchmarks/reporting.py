@@ -0,0 +1,81 @@
+"""Save benchmark results as JSON and compare runs across commits."""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def git_revision() -> str:
+    """Short commit hash, with "-dirty" for uncommitted changes"""
+    root = Path(__file__).resolve().parent.parent
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{revision}-dirty" if dirty else revision
+
+
+def save(kind: str, results: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """
+    Write results with run metadata.
+
+    Defaults to benchmarks/results/<kind>-<revision>-<timestamp>.json.
+    """
+    revision = git_revision()
+    document = {
+        "kind": kind,
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = RESULTS_DIR / f"{kind}-{revision}-{stamp}.json"
+    path.write_text(json.dumps(document, indent=2, sort_keys=True))
+    return path
+
+
+def compare(baseline_path: str, results: Dict[str, Dict[str, float]], keys: Iterable[str]):
+    """Print each metric next to the baseline run's value and the change"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nCompared with {baseline['revision']} ({baseline_path}):")
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if not previous:
+            continue
+        for key in keys:
+            if key not in current or key not in previous or not previous[key]:
+                continue
+            change = (current[key] - previous[key]) / previous[key] * 100
+            print(
+                f"  {name:<32} {key:<12} {previous[key]:>12.4g} -> "
+                f"{current[key]:>12.4g} ({change:+.1f}%)"
+            )
@@ -0,0 +1,125 @@
+"""Bytes on the wire and serialization time per message/send response.
+
+Builds the completed task a blocking message/send returns for a
+Telex-style request (conversation history in the user message) and an
+800-word LinkedIn post, then encodes it three ways:
+
+    legacy   full history, pydantic .dict() and FastAPI's JSON encoding
+    full     full history, model_dump() and app.responses (orjson if installed)
+    compact  RESPONSE_MODE=compact: no echoed history, posts only in the artifact
+
+For each it reports the raw, gzip and br (when brotli is installed) body
+sizes and the median time to encode and to compress one response.
+
+Usage:
+    python benchmarks/response_size.py
+    python benchmarks/response_size.py --compare benchmarks/results/responses-abc123-....json
+"""
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+from typing import Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import responses  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.models import JSONRPCResponse, SocialPost, Task, TaskStatus  # noqa: E402
+from app.processor import PostProcessor  # noqa: E402
+from micro import measure, telex_message  # noqa: E402
+from reporting import compare, save  # noqa: E402
+
+
+def generated_text(processor: PostProcessor) -> str:
+    thread = "\n\n".join(
+        f"{i}/6 Tweet number {i} about shaving milliseconds off API latency."
+        for i in range(1, 7)
+    )
+    linkedin = " ".join(f"word{i % 97}" for i in range(800))
+    return processor.format_response(
+        [
+            SocialPost(platform="twitter", content=thread),
+            SocialPost(platform="linkedin", content=linkedin),
+        ]
+    )
+
+
+def completed_task(processor: PostProcessor, mode: str, text: str) -> Task:
+    """The task message/send returns under RESPONSE_MODE=mode"""
+    settings.RESPONSE_MODE = mode
+    task = Task(id="task-1", contextId="ctx-1", status=TaskStatus(state="submitted"))
+    task.history = [telex_message(history=20)]
+    for state in ("submitted", "working", "working"):
+        processor._set_status(task, state)
+    processor._complete_task(task, text)
+    return processor._with_history(task, processor._history_length({}))
+
+
+def encoders(processor: PostProcessor, text: str) -> Dict[str, Callable[[], bytes]]:
+    legacy = completed_task(processor, "full", text)
+    full = completed_task(processor, "full", text)
+    compact = completed_task(processor, "compact", text)
+
+    def encode_legacy() -> bytes:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            content = JSONRPCResponse(id=1, result=legacy).dict(exclude_none=True)
+        return JSONResponse(content=jsonable_encoder(content)).body
+
+    def encode(task: Task) -> Callable[[], bytes]:
+        return lambda: responses.dumps(
+            JSONRPCResponse(id=1, result=task).model_dump(exclude_none=True)
+        )
+
+    return {"legacy": encode_legacy, "full": encode(full), "compact": encode(compact)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds per case")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    processor = PostProcessor()
+    text = generated_text(processor)
+    codings = ("gzip", "br") if responses.brotli is not None else ("gzip",)
+    print(f"JSON encoder: {'orjson' if responses.orjson is not None else 'json'}")
+    if responses.brotli is None:
+        print("brotli is not installed, skipping br")
+
+    results = {}
+    header = f"{'mode':<10} {'raw':>9} " + " ".join(f"{c:>9}" for c in codings)
+    print(f"\n{header} {'encode':>11} " + " ".join(f"{c:>11}" for c in codings))
+    for name, encode in encoders(processor, text).items():
+        body = encode()
+        result = {"raw_bytes": len(body), **measure(encode, args.budget)}
+        for coding in codings:
+            result[f"{coding}_bytes"] = len(responses.compress(body, coding))
+            timing = measure(lambda: responses.compress(body, coding), args.budget)
+            result[f"{coding}_us"] = timing["median_us"]
+        results[name] = result
+        print(
+            f"{name:<10} {result['raw_bytes']:>9} "
+            + " ".join(f"{result[f'{c}_bytes']:>9}" for c in codings)
+            + f" {result['median_us']:>9.1f}us "
+            + " ".join(f"{result[f'{c}_us']:>9.1f}us" for c in codings)
+        )
+
+    path = save("responses", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(
+            args.compare,
+            results,
+            ("raw_bytes", *(f"{c}_bytes" for c in codings), "median_us"),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""Local stand-ins for blog sites and the Gemini API.
+
+Both servers run in background threads on 127.0.0.1 so benchmarks need
+no network access and keep the event loop under test to themselves.
+
+BlogServer serves the HTML corpus in benchmarks/corpus plus generated
+small, huge and pathological pages. FakeGeminiServer answers the
+generateContent and streamGenerateContent calls the google-genai client
+makes, with configurable latency and injected errors; point the app at
+it with GEMINI_BASE_URL.
+
+Run on its own to keep both servers up for a manually started app:
+    python benchmarks/stand_ins.py --llm-latency 0.5 --llm-error-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.providers import FakeProvider  # noqa: E402
+from extraction_engines import CORPUS_DIR, heavy_page  # noqa: E402
+
+
+def small_page() -> str:
+    return (
+        "<html><head><title>Small Post</title></head><body><article>"
+        "<h1>Small Post</h1><p>Short articles should cost almost nothing to "
+        "extract. This one has two sentences.</p></article></body></html>"
+    )
+
+
+def deeply_nested_page(depth: int = 5000) -> str:
+    """Thousands of nested, partly unclosed elements around the article"""
+    return (
+        "<html><head><title>Nested Page</title></head><body>"
+        + "<div class='wrap'><span>" * depth
+        + "<div class='post-content'><p>Deep inside the markup is the actual "
+        "article text.<p>Another paragraph without a closing tag."
+        + "</div>" * (depth // 2)
+        + "</body></html>"
+    )
+
+
+def unbroken_page(chars: int = 2_000_000) -> str:
+    """One enormous text node with no whitespace or sentence breaks"""
+    return (
+        "<html><head><title>Unbroken Page</title></head><body><article>"
+        f"<p>{'a' * chars}</p></article></body></html>"
+    )
+
+
+def corpus_pages() -> Dict[str, str]:
+    """Every page the blog server serves, by path"""
+    pages = {
+        f"/posts/{path.stem}": path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.html"))
+    }
+    pages["/generated/small"] = small_page()
+    pages["/generated/huge"] = heavy_page()
+    pages["/pathological/deep-nesting"] = deeply_nested_page()
+    pages["/pathological/unbroken"] = unbroken_page()
+    return pages
+
+
+# Paths that are realistic articles, as opposed to stress cases
+REALISTIC_PREFIXES = ("/posts/", "/generated/small")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under load-test concurrency
+    request_queue_size = 512
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandIn:
+    """A threaded HTTP server with injected latency and errors"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type:
+        raise NotImplementedError
+
+    def _delay(self, fraction: float = 1.0):
+        time.sleep((self.latency + random.uniform(0, self.jitter)) * fraction)
+
+    def _fail(self) -> bool:
+        """Count a request and decide whether to inject an error"""
+        failed = random.random() < self.error_rate
+        with self._lock:
+            self.requests += 1
+            self.errors += failed
+        return failed
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class BlogServer(StandIn):
+    """Serves corpus_pages() as text/html; /status/<code> answers that status"""
+
+    def __init__(self, *args, **kwargs):
+        self.pages = {path: html.encode("utf-8") for path, html in corpus_pages().items()}
+        super().__init__(*args, **kwargs)
+
+    def urls(self, realistic_only: bool = False) -> List[str]:
+        return [
+            self.url + path
+            for path in self.pages
+            if not realistic_only or path.startswith(REALISTIC_PREFIXES)
+        ]
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                stand_in._delay()
+                path = urlsplit(self.path).path
+                if stand_in._fail():
+                    return self._send(503, b"unavailable", "text/plain")
+                if path.startswith("/status/"):
+                    return self._send(int(path.rsplit("/", 1)[1]), b"", "text/plain")
+                page = stand_in.pages.get(path)
+                if page is None:
+                    return self._send(404, b"not found", "text/plain")
+                self._send(200, page, "text/html; charset=utf-8")
+
+        return Handler
+
+
+class FakeGeminiServer(StandIn):
+    """Gemini API stand-in answering with FakeProvider-style posts.
+
+    Supports models/<model>:generateContent and :streamGenerateContent
+    (SSE), GET models/<model>, JSON-schema responses for combined generation, and
+    usageMetadata so token metrics have something to count. Injected
+    errors are returned as 503 UNAVAILABLE, which the client retries.
+
+    cachedContents can be created and deleted and referenced from
+    generateContent (an unknown name is a 404, like an expired cache).
+    `prefill` adds that many seconds per 1000 prompt tokens the "model"
+    has to read, so cache creation costs what it saves on later calls.
+    """
+
+    STREAM_CHUNKS = 4
+
+    def __init__(self, *args, prefill: float = 0.0, **kwargs):
+        self.fake = FakeProvider("fake-gemini")
+        self.prefill = prefill
+        self.caches: Dict[str, str] = {}
+        self.cache_creates = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _text(contents: list) -> str:
+        return " ".join(
+            part.get("text", "")
+            for content in contents
+            for part in content.get("parts", [])
+        )
+
+    def _prefill(self, tokens: int):
+        if self.prefill:
+            time.sleep(tokens / 1000 * self.prefill)
+
+    def create_cache(self, request: dict) -> dict:
+        """Store a cachedContents.create body; returns the CachedContent"""
+        text = self._text(request.get("contents", []))
+        self._prefill(len(text) // 4)
+        with self._lock:
+            self.cache_creates += 1
+            name = f"cachedContents/fake-{self.cache_creates}"
+            self.caches[name] = text
+        return {
+            "name": name,
+            "model": request.get("model", ""),
+            "usageMetadata": {"totalTokenCount": len(text) // 4},
+        }
+
+    def respond(self, request: dict) -> Tuple[str, dict]:
+        """
+        Response text and usage for a generateContent request body
+
+        Raises:
+            KeyError: If it references an unknown cachedContent
+        """
+        prompt = self._text(request.get("contents", []))
+        cached = ""
+        if request.get("cachedContent"):
+            cached = self.caches[request["cachedContent"]]
+            prompt = cached + prompt
+        self._prefill((len(prompt) - len(cached)) // 4)
+        config = request.get("generationConfig") or {}
+        schema = config.get("responseSchema") or config.get("responseJsonSchema")
+        if schema:
+            text = json.dumps(
+                {key: self.fake._post(prompt, key) for key in schema.get("properties", {})}
+            )
+        else:
+            text = self.fake._post(prompt)
+        usage = {
+            "promptTokenCount": len(prompt) // 4,
+            "candidatesTokenCount": len(text) // 4,
+            "totalTokenCount": (len(prompt) + len(text)) // 4,
+        }
+        if cached:
+            usage["cachedContentTokenCount"] = len(cached) // 4
+        with self._lock:
+            self.prompt_tokens += len(prompt) // 4
+            self.cached_tokens += len(cached) // 4
+        return text, usage
+
+    @staticmethod
+    def chunk(text: str, usage: Optional[dict] = None) -> dict:
+        body: dict = {
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+            ]
+        }
+        if usage is not None:
+            body["candidates"][0]["finishReason"] = "STOP"
+            body["usageMetadata"] = usage
+        return body
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                # models.get, which the app's warmup uses to open a connection
+                name = urlsplit(self.path).path.rsplit("/", 1)[-1]
+                body = json.dumps({"name": f"models/{name}"}).encode()
+                self._send(200, body, "application/json")
+
+            def do_DELETE(self):
+                path = urlsplit(self.path).path
+                name = "cachedContents/" + path.rsplit("/", 1)[-1]
+                with stand_in._lock:
+                    stand_in.caches.pop(name, None)
+                self._send(200, b"{}", "application/json")
+
+            def _error(self, code: int, message: str, status: str):
+                error = {"error": {"code": code, "message": message, "status": status}}
+                self._send(code, json.dumps(error).encode(), "application/json")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                path = urlsplit(self.path).path
+                stream = path.endswith(":streamGenerateContent")
+
+                if stand_in._fail():
+                    stand_in._delay(0.1)
+                    return self._error(503, "Injected failure", "UNAVAILABLE")
+
+                if path.endswith("/cachedContents"):
+                    body = json.dumps(stand_in.create_cache(request)).encode()
+                    return self._send(200, body, "application/json")
+
+                try:
+                    text, usage = stand_in.respond(request)
+                except KeyError:
+                    return self._error(404, "CachedContent not found", "NOT_FOUND")
+                if not stream:
+                    stand_in._delay()
+                    body = json.dumps(stand_in.chunk(text, usage)).encode()
+                    return self._send(200, body, "application/json")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = text.split(" ")
+                step = max(1, len(words) // stand_in.STREAM_CHUNKS)
+                for index in range(0, len(words), step):
+                    stand_in._delay(1 / stand_in.STREAM_CHUNKS)
+                    piece = " ".join(words[index : index + step])
+                    if index + step < len(words):
+                        piece += " "
+                    last = index + step >= len(words)
+                    event = stand_in.chunk(piece, usage if last else None)
+                    self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blog-port", type=int, default=8101)
+    parser.add_argument("--llm-port", type=int, default=8102)
+    parser.add_argument("--fetch-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--fetch-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    blogs = BlogServer(
+        args.fetch_latency, args.jitter, args.fetch_error_rate, args.blog_port
+    ).start()
+    gemini = FakeGeminiServer(
+        args.llm_latency, args.jitter, args.llm_error_rate, args.llm_port
+    ).start()
+
+    print("Run the app against the stand-ins with:")
+    print(f"  GEMINI_BASE_URL={gemini.url} GEMINI_API_KEY=bench LLM_PROVIDERS=gemini")
+    print("Blog pages:")
+    for url in blogs.urls():
+        print(f"  {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        blogs.stop()
+        gemini.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Cold start time: process exec to the first successful request.
+
+Starts the blog and Gemini stand-ins once, then launches the app with
+uvicorn several times (caches off, as in the load test) and measures,
+from the moment the process is spawned:
+
+    import_ms  `import app.api` alone, in a fresh interpreter
+    live_ms    first 200 from /health
+    ready_ms   first 200 from /ready (after warmup, with --warmup)
+    first_ms   first completed message/send, sent as soon as /health answers
+
+Reports the median over the runs and saves the results as JSON for
+comparison with other commits.
+
+Usage:
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --warmup --compare benchmarks/results/startup-abc123-....json
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_test import ROOT, free_port, payload, start_server  # noqa: E402
+from reporting import compare, save  # noqa: E402
+from stand_ins import BlogServer, FakeGeminiServer  # noqa: E402
+
+POLL_INTERVAL = 0.01
+
+
+def import_time(gemini_url: str) -> float:
+    """Milliseconds to import app.api in a fresh interpreter"""
+    code = (
+        "import time; started = time.perf_counter(); import app.api; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "bench",
+        "GEMINI_BASE_URL": gemini_url,
+        "LLM_PROVIDERS": "gemini",
+        "LOG_LEVEL": "WARNING",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+async def poll(client: httpx.AsyncClient, path: str, started: float, timeout: float) -> float:
+    """Milliseconds after `started` that `path` first answered 200
+
+    A 404 counts too, so commits from before /ready existed can be compared.
+    """
+    while time.perf_counter() - started < timeout:
+        try:
+            if (await client.get(path)).status_code in (200, 404):
+                return (time.perf_counter() - started) * 1000
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{path} did not answer within {timeout}s")
+
+
+async def one_run(gemini_url: str, url: str, extra_env: List[str]) -> Dict[str, float]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = start_server(port, gemini_url, extra_env)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            live = await poll(client, "/health", started, timeout=60)
+            first = asyncio.create_task(client.post("/", json=payload(0, url)))
+            ready = await poll(client, "/ready", started, timeout=60)
+            response = await first
+            body = response.json()
+            if "error" in body or body["result"]["status"]["state"] != "completed":
+                raise RuntimeError(f"first request failed: {body}")
+            first_ms = (time.perf_counter() - started) * 1000
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"live_ms": live, "ready_ms": ready, "first_ms": first_ms}
+
+
+async def run(args) -> Dict[str, float]:
+    blogs = BlogServer(args.fetch_latency).start()
+    gemini = FakeGeminiServer(args.llm_latency).start()
+    extra_env = [f"WARMUP={'true' if args.warmup else 'false'}", *args.env]
+    try:
+        url = blogs.urls(realistic_only=True)[0]
+        imports = [import_time(gemini.url) for _ in range(args.runs)]
+        runs = [await one_run(gemini.url, url, extra_env) for _ in range(args.runs)]
+    finally:
+        blogs.stop()
+        gemini.stop()
+
+    result = {"runs": args.runs, "import_ms": statistics.median(imports)}
+    for key in ("live_ms", "ready_ms", "first_ms"):
+        result[key] = statistics.median(run[key] for run in runs)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true", help="start with WARMUP=true")
+    parser.add_argument("--fetch-latency", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra server setting, e.g. --env EXTRACTION_ENGINE=bs4",
+    )
+    parser.add_argument("--name", help="results name (default cold or warmup)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(f"Runs:            {result['runs']} (medians)")
+    print(f"import app.api:  {result['import_ms']:.0f}ms")
+    print(f"/health:         {result['live_ms']:.0f}ms after exec")
+    print(f"/ready:          {result['ready_ms']:.0f}ms after exec")
+    print(f"First request:   {result['first_ms']:.0f}ms after exec")
+
+    results = {args.name or ("warmup" if args.warmup else "cold"): result}
+    path = save("startup", results, args.output)
+    print(f"\nSaved {path}")
+    if args.compare:
+        compare(args.compare, results, ("import_ms", "live_ms", "ready_ms", "first_ms"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Pre-generate posts for new or changed articles in RSS/Atom feeds and sitemaps.
+
+Results are written to the blog and generation caches, so run the server
+with the sqlite cache backends (sharing CACHE_DB_PATH) to serve them.
+
+Usage:
+    python ingest.py https://example.com/feed.xml https://example.com/sitemap.xml
+    python ingest.py --dry-run https://example.com/feed.xml
+"""
+
+import argparse
+import asyncio
+
+from app import settings
+from app.ingest import FeedIngestor, IngestState
+from app.processor import PostProcessor
+from app.telemetry import configure_logging
+
+
+async def run(args: argparse.Namespace):
+    processor = PostProcessor()
+    state = IngestState(settings.INGEST_DB_PATH)
+    ingestor = FeedIngestor(
+        processor,
+        state,
+        concurrency=args.concurrency,
+        force=args.force,
+        dry_run=args.dry_run,
+    )
+    try:
+        await processor.start()
+        for feed_url in args.feeds:
+            await ingestor.ingest(feed_url)
+    finally:
+        await processor.aclose()
+        state.close()
+
+    counts = ingestor.counts
+    print("=" * 60)
+    print(f"📰 Entries:           {counts['entries']}")
+    print(f"⏭️ Unchanged (feed):  {counts['unchanged']}")
+    if args.dry_run:
+        print(f"🆕 New or changed:    {counts['pending']}")
+    else:
+        print(f"⏭️ Unchanged (hash):  {counts['content_unchanged']}")
+        print(f"✅ Generated:         {counts['generated']}")
+        print(f"❌ Failed:            {counts['failed'] + counts['feed_errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("feeds", nargs="+", help="RSS/Atom feed or sitemap URLs")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.BATCH_CONCURRENCY,
+        help="articles processed at once",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="ignore the state store and regenerate"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only list new or changed entries"
+    )
+    args = parser.parse_args()
+
+    if not args.dry_run:
+        settings.validate()
+        if settings.GENERATION_CACHE_BACKEND != "sqlite":
+            parser.error(
+                "ingestion pre-generates into the generation cache; "
+                "set GENERATION_CACHE_BACKEND=sqlite (and BLOG_CACHE_BACKEND=sqlite)"
+            )
+
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
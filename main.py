@@ -5,11 +5,36 @@ settings.validate()
 if __name__ == "__main__":
     import uvicorn
 
+    production = settings.SERVER_MODE == "production"
+    workers = settings.worker_count()
+
     print("🚀 Starting POST CRAFT AGENT")
     print(f"📍 URL: {settings.AGENT_URL}")
     print(f"🔑 Gemini: {'✅' if settings.GEMINI_API_KEY else '❌'}")
     print(f"🔑 Groq: {'✅' if settings.GROQ_API_KEY else '❌'}")
     print(f"🎯 Default platforms: {', '.join(settings.DEFAULT_PLATFORMS)}")
+    print(f"⚙️ Mode: {settings.SERVER_MODE} ({workers} worker{'s' * (workers > 1)})")
+    if workers > 1 and "memory" in (
+        settings.BLOG_CACHE_BACKEND,
+        settings.GENERATION_CACHE_BACKEND,
+    ):
+        print(
+            "⚠️ In-memory caches are per worker; use the sqlite backends to "
+            "share them"
+        )
     print("=" * 60)
 
-    uvicorn.run("app.api:app", host="0.0.0.0", port=settings.PORT, reload=True)
+    if production:
+        # "auto" picks uvloop and httptools when installed (the "server" extra)
+        uvicorn.run(
+            "app.api:app",
+            host="0.0.0.0",
+            port=settings.PORT,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            access_log=False,
+            timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        )
+    else:
+        uvicorn.run("app.api:app", host="0.0.0.0", port=settings.PORT, reload=True)